@@ -1,5 +1,12 @@
 """Domain-specialized agents and orchestrator for the trading multi-agent system."""
 from .registry import AgentRegistry, get_registry
-from .orchestrator import OrchestratorAgent
 
 __all__ = ["AgentRegistry", "get_registry", "OrchestratorAgent"]
+
+
+def __getattr__(name: str):
+    # The orchestrator pulls in the tools and agent framework; load it on first use.
+    if name == "OrchestratorAgent":
+        from .orchestrator import OrchestratorAgent
+        return OrchestratorAgent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,125 @@
+"""Rule-based pre-classifier: ticker regex and keyword matching ahead of the LLM classifier.
+
+Handles clear-cut queries ("technical outlook for AAPL") locally and reports a
+confidence; the orchestrator falls back to the LLM classifier below its threshold.
+"""
+import re
+from typing import Optional, Tuple
+
+from schemas import AnalysisType, ClassifierOutput
+
+
+# Uppercase tokens that look like tickers but are not
+NON_TICKERS = {
+    "A", "I", "AN", "AND", "ARE", "AT", "BE", "BY", "FOR", "IF", "IN", "IS", "IT", "ME", "MY", "OF",
+    "ON", "OR", "SO", "THE", "TO", "UP", "VS", "WE", "US", "USA", "USD", "OK",
+    "BUY", "SELL", "HOLD", "LONG", "SHORT", "ETF", "IPO", "CEO", "CFO", "GDP", "CPI", "FED",
+    "RSI", "MACD", "SMA", "EMA", "EPS", "PE", "ROE", "ROI", "ATH", "YTD", "EOD", "AI", "Q1", "Q2", "Q3", "Q4",
+}
+
+# Common company names mapped to tickers, for lowercase queries ("should I buy apple?")
+COMPANY_TICKERS = {
+    "apple": "AAPL",
+    "microsoft": "MSFT",
+    "nvidia": "NVDA",
+    "amazon": "AMZN",
+    "alphabet": "GOOGL",
+    "google": "GOOGL",
+    "meta": "META",
+    "facebook": "META",
+    "tesla": "TSLA",
+    "netflix": "NFLX",
+}
+
+TECHNICAL_KEYWORDS = (
+    "technical", "chart", "price action", "volume", "trend", "moving average", "rsi", "macd", "support",
+    "resistance", "momentum", "breakout", "sma", "ema", "bollinger", "candlestick", "overbought", "oversold",
+)
+FUNDAMENTAL_KEYWORDS = (
+    "fundamental", "earnings", "revenue", "income statement", "balance sheet", "valuation", "p/e", "pe ratio",
+    "margin", "macro", "financials", "eps", "dividend", "cash flow", "profit", "debt", "guidance",
+)
+RISK_KEYWORDS = (
+    "risk", "volatility", "drawdown", "position limit", "position size", "exposure", "downside", "var",
+)
+STRATEGY_KEYWORDS = (
+    "strategy", "full analysis", "should i buy", "should i sell", "buy or sell", "worth buying", "invest in",
+)
+SECTORS = ("technology", "financials", "healthcare", "energy")
+TIME_HORIZONS = (
+    ("short_term", ("short term", "short-term", "day trade", "intraday", "this week", "swing")),
+    ("medium_term", ("medium term", "medium-term", "next quarter", "few months")),
+    ("long_term", ("long term", "long-term", "retirement", "years", "buy and hold")),
+)
+
+_TICKER_RE = re.compile(r"\$([A-Za-z]{1,5}(?:[.-][A-Za-z]{1,2})?)\b|\b([A-Z]{1,5}(?:[.-][A-Z]{1,2})?)\b")
+
+
+def normalize_query(query: str) -> str:
+    """Cache key for a query: lowercased, whitespace collapsed, trailing punctuation dropped."""
+    return " ".join(query.lower().split()).rstrip("?!. ")
+
+
+def _contains(text: str, keywords: Tuple[str, ...]) -> bool:
+    return any(re.search(r"\b" + re.escape(k) + r"\b", text) for k in keywords)
+
+
+def extract_tickers(query: str) -> list[str]:
+    """Tickers mentioned as $XYZ, as uppercase tokens, or by a known company name (in order, unique)."""
+    found: list[str] = []
+    for match in _TICKER_RE.finditer(query):
+        token = (match.group(1) or match.group(2)).upper()
+        if match.group(1) is None and token in NON_TICKERS:
+            continue
+        if token not in found:
+            found.append(token)
+    lowered = query.lower()
+    for name, ticker in COMPANY_TICKERS.items():
+        if re.search(r"\b" + name + r"\b", lowered) and ticker not in found:
+            found.append(ticker)
+    return found
+
+
+def fast_classify(query: str) -> Tuple[Optional[ClassifierOutput], float]:
+    """
+    Classify query with rules. Returns (output, confidence in [0, 1]);
+    output is None when the rules cannot decide at all.
+    """
+    text = " ".join(query.lower().split())
+    if not text:
+        return None, 0.0
+    tickers = extract_tickers(query)
+    technical = _contains(text, TECHNICAL_KEYWORDS)
+    fundamental = _contains(text, FUNDAMENTAL_KEYWORDS)
+    risk = _contains(text, RISK_KEYWORDS)
+    strategy = _contains(text, STRATEGY_KEYWORDS)
+
+    if strategy or (technical and fundamental):
+        analysis_type = AnalysisType.BOTH
+    elif technical:
+        analysis_type = AnalysisType.TECHNICAL
+    elif fundamental:
+        analysis_type = AnalysisType.FUNDAMENTAL
+    elif risk:
+        analysis_type = AnalysisType.RISK_ONLY
+    else:
+        return None, 0.0
+
+    # One clear ticker plus a keyword-determined path is the high-confidence case.
+    confidence = 0.9
+    if len(tickers) != 1:
+        confidence = 0.3
+    if risk and (technical or fundamental) and not strategy:
+        # Mixed risk + one analysis path is ambiguous; let the LLM decide.
+        confidence = min(confidence, 0.5)
+
+    sector = next((s for s in SECTORS if re.search(r"\b" + s + r"\b", text)), None)
+    time_horizon = next((h for h, phrases in TIME_HORIZONS if _contains(text, phrases)), None)
+    output = ClassifierOutput(
+        analysis_type=analysis_type,
+        security=tickers[0] if tickers else None,
+        sector=sector,
+        time_horizon=time_horizon,
+        raw_intent=" ".join(query.split())[:200],
+    )
+    return output, confidence
@@ -1,17 +1,31 @@
 """Central Orchestrator: NLU classifier, delegation, shared context, and strategy synthesis."""
 import asyncio
-from typing import List, Optional
-
-from agent_framework.azure import AzureOpenAIResponsesClient
+import os
+import re
+import time
+from typing import TYPE_CHECKING, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
 from schemas import (
     AnalysisType,
     ClassifierOutput,
     AnalystContext,
+    MarketDataBundle,
     SecuritiesTradingStrategy,
 )
+from tools.market_bundle import TECHNICAL_FIELDS, FUNDAMENTAL_FIELDS, build_market_data_bundle, fetch_macro
+from tools.risk_tools import compute_risk_report
+from tools.memo import tool_memo_scope
+from tools.singleflight import SingleFlight
+from tools.partial_json import PartialJSONObject
+from tools.tracing import agent_scope, emit, payload_bytes, sink_active, span, trace_scope, tracing_enabled
+from tools.ttl_cache import TTLCache
+from agents.session_memory import SessionHistoryStore
+from agents.fast_classifier import fast_classify, normalize_query
 from agents.registry import AgentRegistry, get_registry, TECHNICAL_ANALYST, FUNDAMENTAL_ANALYST, RISK_ANALYST
 
+if TYPE_CHECKING:
+    from agent_framework.azure import AzureOpenAIResponsesClient
+
 
 CLASSIFIER_INSTRUCTIONS = """You are an NLU classifier for a securities trading system.
 Given the user's message, classify it into exactly one of: technical, fundamental, both, risk_only, unknown.
@@ -23,9 +37,53 @@ Given the user's message, classify it into exactly one of: technical, fundamenta
 Extract: security (ticker/symbol if mentioned, e.g. AAPL), sector (if mentioned), time_horizon (short_term/medium_term/long_term if mentioned), and raw_intent (one-line summary).
 Respond with ONLY a valid JSON object with these exact keys: analysis_type, security, sector, time_horizon, raw_intent. Use null for missing optional fields."""
 
+# Label used when an analyst's findings are shared with downstream analysts
+FACT_LABELS = {
+    TECHNICAL_ANALYST: "Technical",
+    FUNDAMENTAL_ANALYST: "Fundamental",
+    RISK_ANALYST: "Risk",
+}
+
+DEFAULT_SESSION_ID = "default"
+
+# Prefetched MarketDataBundle fields each analyst receives
+ROLE_DATA_FIELDS = {
+    TECHNICAL_ANALYST: TECHNICAL_FIELDS,
+    FUNDAMENTAL_ANALYST: FUNDAMENTAL_FIELDS,
+}
+
+
+def _get_max_llm_calls() -> int:
+    """Max concurrent LLM calls per orchestrator (0 = unlimited)."""
+    return int(os.getenv("MAX_CONCURRENT_LLM_CALLS", "0"))
+
+
+def _get_analyst_coalesce_window() -> float:
+    """Seconds an analyst result is reused for identical AnalystContext inputs."""
+    return float(os.getenv("ANALYST_COALESCE_WINDOW_SECONDS", "15"))
+
+
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
+
+_POSITION_PCT_RE = re.compile(r"(\d+(?:\.\d+)?)\s*%\s*(?:of\s+(?:my\s+|the\s+)?portfolio|position)", re.IGNORECASE)
+
+
+def _parse_position_pct(text: str) -> Optional[float]:
+    """Proposed position size if the user stated one, e.g. "a 5% position" or "8% of my portfolio"."""
+    match = _POSITION_PCT_RE.search(text or "")
+    return float(match.group(1)) if match else None
+
+
+def _get_batch_concurrency() -> int:
+    """Default number of tickers in flight during run_batch."""
+    return int(os.getenv("BATCH_CONCURRENCY", "8"))
+
+
 SYNTHESIZER_INSTRUCTIONS = """You are the synthesis step of a multi-agent trading system.
 You receive findings from the Technical Analyst, Fundamental Analyst, and Risk Management Agent.
-Produce a single structured Securities Trading Strategy: direction (BUY/SELL/HOLD), confidence (LOW/MEDIUM/HIGH), technical_summary, fundamental_summary, risk_assessment, rationale, conditions, and warnings.
+Produce a single structured Securities Trading Strategy as a JSON object. Emit the fields in this order: direction (BUY/SELL/HOLD), confidence (LOW/MEDIUM/HIGH), technical_summary, fundamental_summary, risk_assessment, rationale, conditions, and warnings.
 Be concise and base the strategy strictly on the provided findings. Do not invent data."""
 
 
@@ -38,12 +96,29 @@ class OrchestratorAgent:
 
     def __init__(
         self,
-        client: AzureOpenAIResponsesClient,
+        client: "AzureOpenAIResponsesClient",
         registry: Optional[AgentRegistry] = None,
+        max_concurrent_llm_calls: Optional[int] = None,
     ) -> None:
         self._client = client
         self._registry = registry or get_registry()
-        self._conversation_history: List[dict] = []
+        # Per-session conversation memory (bounded, compacted, idle sessions evicted)
+        self._history = SessionHistoryStore()
+        llm_cap = max_concurrent_llm_calls if max_concurrent_llm_calls is not None else _get_max_llm_calls()
+        self._llm_slots: Optional[asyncio.Semaphore] = asyncio.Semaphore(llm_cap) if llm_cap > 0 else None
+        # Identical analyst runs (same role and context) share one result across concurrent workflows.
+        self._analyst_flights = SingleFlight(window=_get_analyst_coalesce_window())
+        self._classification_cache = TTLCache(
+            maxsize=int(os.getenv("CLASSIFICATION_CACHE_SIZE", "2048")),
+            ttl_seconds=float(os.getenv("CLASSIFICATION_CACHE_TTL_SECONDS", "3600")),
+        )
+        self._fast_classifier_min_confidence = float(os.getenv("FAST_CLASSIFIER_MIN_CONFIDENCE", "0.8"))
+        # Risk metrics are computed natively; the LLM only adds an optional narrative.
+        self._deterministic_risk = _env_flag("DETERMINISTIC_RISK", "1")
+        self._risk_narrative = _env_flag("RISK_LLM_NARRATIVE", "0")
+        self._prefetch_market_data = _env_flag("PREFETCH_MARKET_DATA", "1")
+        # Stream synthesizer tokens when a caller consumes trace events (strategy_partial events).
+        self._stream_synthesis = _env_flag("STREAM_SYNTHESIS", "1")
         # Lazy-built agents
         self._classifier_agent = None
         self._synthesizer_agent = None
@@ -102,10 +177,81 @@ class OrchestratorAgent:
             self._registry.register(RISK_ANALYST, self._risk_agent)
         return self._risk_agent
 
+    def build_agents(self) -> None:
+        """Build every agent up front so concurrent requests never race on lazy construction."""
+        self._get_classifier()
+        self._get_synthesizer()
+        self._get_technical_agent()
+        self._get_fundamental_agent()
+        self._get_risk_agent()
+
+    async def _run_agent(self, agent, message: str):
+        """Run an agent, holding an LLM slot when a concurrency cap is configured."""
+        with span("llm_start", "llm_end", model=getattr(agent, "name", None), prompt_bytes=payload_bytes(message)) as end:
+            if self._llm_slots is None:
+                result = await agent.run(message)
+            else:
+                queued = time.perf_counter()
+                async with self._llm_slots:
+                    end["queued_ms"] = round((time.perf_counter() - queued) * 1000, 2)
+                    result = await agent.run(message)
+            end.update(bytes=payload_bytes(result), cache_hit=False)
+            return result
+
+    async def _run_agent_streaming(self, agent, message: str, on_text: Callable[[str], None]) -> str:
+        """
+        Like _run_agent, but streams the response: on_text receives each text chunk
+        as it arrives. Returns the full text.
+        """
+        with span("llm_start", "llm_end", model=getattr(agent, "name", None), prompt_bytes=payload_bytes(message)) as end:
+            queued = time.perf_counter()
+            if self._llm_slots is not None:
+                await self._llm_slots.acquire()
+            try:
+                end["queued_ms"] = round((time.perf_counter() - queued) * 1000, 2)
+                started = time.perf_counter()
+                chunks: List[str] = []
+                async for update in agent.run_stream(message):
+                    text = getattr(update, "text", None)
+                    if not text:
+                        continue
+                    if not chunks:
+                        end["first_token_ms"] = round((time.perf_counter() - started) * 1000, 2)
+                    chunks.append(text)
+                    on_text(text)
+            finally:
+                if self._llm_slots is not None:
+                    self._llm_slots.release()
+            full = "".join(chunks)
+            end.update(bytes=payload_bytes(full), cache_hit=False)
+            return full
+
     async def _classify(self, user_query: str) -> ClassifierOutput:
-        """Run NLU classifier on user query."""
+        """
+        Classify the user query: cached result, else the rule-based fast path when
+        it is confident enough, else the LLM classifier.
+        """
+        with agent_scope("classifier"), span("stage_start", "stage_end", stage="classification") as end:
+            key = normalize_query(user_query)
+            cached = self._classification_cache.get(key)
+            if cached is not None:
+                end.update(source="cache", cache_hit=True)
+                return cached.model_copy()
+            output, confidence = fast_classify(user_query)
+            end.update(source="rules", cache_hit=False, confidence=confidence)
+            if output is None or confidence < self._fast_classifier_min_confidence:
+                end["source"] = "llm"
+                output = await self._classify_with_llm(user_query)
+                if output.analysis_type == AnalysisType.UNKNOWN and output.security is None:
+                    # Do not pin unparseable classifier output in the cache.
+                    return output
+            self._classification_cache.set(key, output)
+            return output.model_copy()
+
+    async def _classify_with_llm(self, user_query: str) -> ClassifierOutput:
+        """Run the LLM NLU classifier on user query."""
         classifier = self._get_classifier()
-        result = await classifier.run(user_query)
+        result = await self._run_agent(classifier, user_query)
         if hasattr(result, "value") and result.value is not None:
             return result.value
         text = getattr(result, "text", str(result)) or ""
@@ -133,10 +279,37 @@ class OrchestratorAgent:
             parts.append(f"Time horizon: {context.time_horizon}")
         if context.shared_facts:
             parts.append("Shared facts (reuse, do not re-fetch): " + "; ".join(context.shared_facts))
+        if context.market_data is not None:
+            data = context.market_data.compact()
+            if data:
+                parts.append(
+                    "Market data (prefetched; answer from it and call tools only for anything missing):\n" + data
+                )
         return "\n".join(parts)
 
     async def _run_analyst(self, role: str, context: AnalystContext) -> str:
-        """Run one domain analyst with context and return its text summary."""
+        """
+        Run one domain analyst with context and return its text summary.
+        Concurrent or recent runs with identical inputs share a single result.
+        """
+        key = (role, context.model_dump_json())
+        ran = []
+
+        def run():
+            ran.append(True)
+            return self._run_analyst_uncached(role, context)
+
+        with agent_scope(role), span("analyst_start", "analyst_end", instruction=context.orchestrator_instruction) as end:
+            out, metrics = await self._analyst_flights.do(key, run)
+            end.update(summary=out[:300], bytes=payload_bytes(out), cache_hit=not ran)
+            if metrics is not None:
+                end["metrics"] = metrics
+            return out
+
+    async def _run_analyst_uncached(self, role: str, context: AnalystContext) -> Tuple[str, Optional[dict]]:
+        """Findings text plus structured metrics when the analyst produces them (the risk engine)."""
+        if role == RISK_ANALYST and context.security and self._deterministic_risk:
+            return await self._run_risk_engine(context)
         agent = self._registry.get_agent(role)
         if agent is None:
             if role == TECHNICAL_ANALYST:
@@ -146,18 +319,241 @@ class OrchestratorAgent:
             elif role == RISK_ANALYST:
                 agent = self._get_risk_agent()
             else:
-                return f"Unknown analyst: {role}"
+                return f"Unknown analyst: {role}", None
         msg = self._build_context_message(context)
-        result = await agent.run(msg)
-        return getattr(result, "text", str(result))
+        result = await self._run_agent(agent, msg)
+        return getattr(result, "text", str(result)), None
+
+    async def _run_risk_engine(self, context: AnalystContext) -> Tuple[str, dict]:
+        """Deterministic risk path: native metrics, with the LLM used only for an optional narrative."""
+        report = await compute_risk_report(
+            context.security,
+            proposed_position_pct=_parse_position_pct(context.user_query or context.orchestrator_instruction),
+        )
+        out = report.summary() + "\nMetrics: " + report.model_dump_json()
+        if self._risk_narrative:
+            agent = self._registry.get_agent(RISK_ANALYST) or self._get_risk_agent()
+            msg = (
+                self._build_context_message(context)
+                + "\nRisk metrics are already computed; do not call tools. Explain them briefly:\n"
+                + report.model_dump_json()
+            )
+            result = await self._run_agent(agent, msg)
+            out += "\nNarrative: " + getattr(result, "text", str(result))
+        return out, report.model_dump(mode="json")
+
+    async def _prefetch_bundle(
+        self, security: str, fields: List[str], macro: Optional[List[str]] = None
+    ) -> MarketDataBundle:
+        with span("stage_start", "stage_end", stage="market_data", security=security) as end:
+            bundle = await build_market_data_bundle(security, fields, macro=macro)
+            if tracing_enabled():
+                end["bytes"] = payload_bytes(bundle)
+            return bundle
 
-    async def run_workflow(self, user_query: str) -> SecuritiesTradingStrategy:
+    async def _run_analysts(
+        self,
+        selected: List[str],
+        security: Optional[str],
+        sector: Optional[str],
+        time_horizon: Optional[str],
+        instruction: str,
+        base_facts: Optional[List[str]] = None,
+        market_data: Optional["asyncio.Future[MarketDataBundle]"] = None,
+        user_query: Optional[str] = None,
+    ) -> Dict[str, str]:
+        """
+        Run selected analysts concurrently, each starting as soon as the roles it
+        depends on (per the registry) have finished. Analysts that use market data
+        receive their slice of the prefetched bundle. Returns role -> findings.
+        """
+        graph = self._registry.plan(selected)
+        if RISK_ANALYST in graph and security and self._deterministic_risk and not self._risk_narrative:
+            # The native risk engine reads no analyst findings; only the narrative needs them.
+            graph[RISK_ANALYST] = []
+        outputs: Dict[str, str] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_role(role: str) -> str:
+            deps = graph[role]
+            if deps:
+                await asyncio.gather(*(tasks[d] for d in deps))
+            shared_facts = list(base_facts or []) + [
+                f"{FACT_LABELS.get(dep, dep)}: {outputs[dep][:300]}"
+                for dep in selected
+                if dep in deps
+            ]
+            bundle = None
+            if market_data is not None and role in ROLE_DATA_FIELDS:
+                try:
+                    bundle = (await market_data).subset(ROLE_DATA_FIELDS[role])
+                except Exception:
+                    bundle = None  # analysts fall back to their tools
+            context = AnalystContext(
+                security=security,
+                sector=sector,
+                time_horizon=time_horizon,
+                shared_facts=shared_facts,
+                market_data=bundle,
+                orchestrator_instruction=instruction,
+                # Only the risk step reads the verbatim query (a stated position size); the other
+                # analysts' contexts stay query-independent so identical intents still coalesce.
+                user_query=user_query if role == RISK_ANALYST else None,
+            )
+            out = await self._run_analyst(role, context)
+            outputs[role] = out
+            return out
+
+        for role in selected:
+            tasks[role] = asyncio.ensure_future(run_role(role))
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            for task in tasks.values():
+                task.cancel()
+        return outputs
+
+    async def run_workflow(
+        self,
+        user_query: str,
+        session_id: str = DEFAULT_SESSION_ID,
+        on_event: Optional[Callable[[dict], None]] = None,
+    ) -> SecuritiesTradingStrategy:
         """
         Classify query -> delegate to analysts with context -> synthesize strategy.
+        Turns are recorded in the conversation history of session_id.
+        on_event receives trace events (see tools.tracing) for every stage,
+        LLM call and tool call of this run.
         """
-        self._conversation_history.append({"role": "user", "content": user_query})
+        if on_event is not None:
+            with trace_scope(on_event):
+                return await self.run_workflow(user_query, session_id)
+        self._history.append(session_id, "user", user_query)
 
         classification = await self._classify(user_query)
+        emit({"type": "classification", "agent": "classifier", "payload": classification.model_dump(mode="json")})
+        with tool_memo_scope():
+            strategy = await self._run_classified(user_query, classification)
+        self._record_strategy(session_id, strategy)
+        return strategy
+
+    async def stream_workflow(self, user_query: str, session_id: str = DEFAULT_SESSION_ID) -> AsyncIterator[dict]:
+        """
+        run_workflow as an async generator of trace events, ending with
+        {"type": "strategy", "payload": ...}. Errors from the run are re-raised.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def sink(event: dict) -> None:
+            # Sync tools may run in worker threads.
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+        task = asyncio.ensure_future(self.run_workflow(user_query, session_id, on_event=sink))
+        task.add_done_callback(lambda _: loop.call_soon_threadsafe(queue.put_nowait, None))
+        try:
+            while True:
+                event = await queue.get()
+                if event is None:
+                    break
+                yield event
+            strategy = task.result()
+            yield {"type": "strategy", "agent": "orchestrator", "payload": strategy.model_dump()}
+        finally:
+            task.cancel()
+
+    def _record_strategy(self, session_id: str, strategy: SecuritiesTradingStrategy) -> None:
+        """Store the strategy turn; once it ages out only the compact record is kept."""
+        self._history.append(
+            session_id,
+            "assistant",
+            strategy.model_dump_json(),
+            summary={
+                "security": strategy.security,
+                "direction": strategy.direction,
+                "confidence": strategy.confidence,
+            },
+        )
+
+    def get_history(self, session_id: str = DEFAULT_SESSION_ID) -> List[dict]:
+        """Conversation turns for a session, oldest first."""
+        return self._history.get(session_id)
+
+    def cache_stats(self) -> Dict[str, dict]:
+        """Hit/miss counters for the orchestrator's own caches."""
+        flights = self._analyst_flights.stats()
+        return {
+            "classification": self._classification_cache.stats(),
+            "analyst": {"hits": flights["shared"] + flights["window_hits"], "misses": flights["calls"]},
+            "session_history": self._history.stats(),
+        }
+
+    async def run_batch(
+        self,
+        symbols: List[str],
+        analysis_type: AnalysisType = AnalysisType.BOTH,
+        max_concurrency: Optional[int] = None,
+    ) -> AsyncIterator[SecuritiesTradingStrategy]:
+        """
+        Run the workflow for many tickers with an already-structured intent.
+        Skips classification, fetches macro indicators once for the whole batch,
+        keeps at most max_concurrency tickers in flight, and yields each
+        strategy as soon as it completes (not in input order).
+        """
+        analysis_type = AnalysisType(analysis_type)
+        if analysis_type == AnalysisType.UNKNOWN:
+            analysis_type = AnalysisType.BOTH
+        symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+        if not symbols:
+            return
+        limit = asyncio.Semaphore(max_concurrency or _get_batch_concurrency())
+        # Macro readings are global; fetch them once and share them with every ticker.
+        macro = None
+        if analysis_type in (AnalysisType.FUNDAMENTAL, AnalysisType.BOTH):
+            macro = await fetch_macro()
+
+        async def run_one(symbol: str) -> SecuritiesTradingStrategy:
+            async with limit:
+                query = f"{analysis_type.value} analysis and trading strategy for {symbol}"
+                classification = ClassifierOutput(
+                    analysis_type=analysis_type,
+                    security=symbol,
+                    raw_intent=query,
+                )
+                try:
+                    with tool_memo_scope():
+                        return await self._run_classified(query, classification, macro=macro)
+                except Exception as e:
+                    return SecuritiesTradingStrategy(
+                        security=symbol,
+                        direction="HOLD",
+                        confidence="LOW",
+                        technical_summary="",
+                        fundamental_summary="",
+                        risk_assessment="",
+                        rationale=f"Batch run failed: {e}",
+                        conditions=[],
+                        warnings=["Workflow failed for this security; no strategy produced."],
+                    )
+
+        tasks = [asyncio.ensure_future(run_one(symbol)) for symbol in symbols]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _run_classified(
+        self,
+        user_query: str,
+        classification: ClassifierOutput,
+        macro: Optional[List[str]] = None,
+    ) -> SecuritiesTradingStrategy:
+        """
+        Delegate to analysts for an already-classified query and synthesize the strategy.
+        macro: macro readings fetched once by the caller (e.g. per batch) to reuse.
+        """
         security = classification.security
         sector = classification.sector
         time_horizon = classification.time_horizon
@@ -172,28 +568,31 @@ class OrchestratorAgent:
             sector=sector,
         )
 
-        shared_facts: List[str] = []
-        technical_summary = ""
-        fundamental_summary = ""
-        risk_assessment = ""
-
-        for role in selected:
-            context = AnalystContext(
+        # Start prefetching market data as soon as the security is known; analysts await their slice.
+        fields = [f for role in selected for f in ROLE_DATA_FIELDS.get(role, [])]
+        bundle_task = None
+        base_facts: List[str] = []
+        if security and fields and self._prefetch_market_data:
+            bundle_task = asyncio.ensure_future(self._prefetch_bundle(security, fields, macro=macro))
+        elif macro:
+            base_facts.append("Macro: " + "; ".join(macro))
+        try:
+            outputs = await self._run_analysts(
+                selected,
                 security=security,
                 sector=sector,
                 time_horizon=time_horizon,
-                shared_facts=shared_facts,
-                orchestrator_instruction=f"User objective: {classification.raw_intent}. Provide your analysis concisely.",
+                instruction=f"User objective: {classification.raw_intent}. Provide your analysis concisely.",
+                base_facts=base_facts,
+                market_data=bundle_task,
+                user_query=user_query,
             )
-            out = await self._run_analyst(role, context)
-            if role == TECHNICAL_ANALYST:
-                technical_summary = out
-                shared_facts.append("Technical: " + out[:300])
-            elif role == FUNDAMENTAL_ANALYST:
-                fundamental_summary = out
-                shared_facts.append("Fundamental: " + out[:300])
-            elif role == RISK_ANALYST:
-                risk_assessment = out
+        finally:
+            if bundle_task is not None and not bundle_task.done():
+                bundle_task.cancel()
+        technical_summary = outputs.get(TECHNICAL_ANALYST, "")
+        fundamental_summary = outputs.get(FUNDAMENTAL_ANALYST, "")
+        risk_assessment = outputs.get(RISK_ANALYST, "")
 
         if not technical_summary:
             technical_summary = "No technical analysis requested or available."
@@ -210,26 +609,37 @@ class OrchestratorAgent:
             "Produce the structured Securities Trading Strategy (direction, confidence, summaries, rationale, conditions, warnings)."
         )
 
-        synthesizer = self._get_synthesizer()
-        result = await synthesizer.run(synthesizer_input)
-        if hasattr(result, "value") and result.value is not None:
-            strategy = result.value
-        else:
-            text = getattr(result, "text", str(result))
-            try:
-                strategy = SecuritiesTradingStrategy.model_validate_json(text)
-            except Exception:
-                strategy = SecuritiesTradingStrategy(
-                    security=security,
-                    direction="HOLD",
-                    confidence="LOW",
-                    technical_summary=technical_summary[:500],
-                    fundamental_summary=fundamental_summary[:500],
-                    risk_assessment=risk_assessment[:500],
-                    rationale=text[:500] if text else "Synthesis failed.",
-                    conditions=[],
-                    warnings=["Structured parsing failed; review raw output."],
-                )
-        strategy.security = strategy.security or security
-        self._conversation_history.append({"role": "assistant", "content": strategy.model_dump_json()})
-        return strategy
+        with span("stage_start", "stage_end", stage="synthesis"):
+            synthesizer = self._get_synthesizer()
+            if self._stream_synthesis and sink_active() and hasattr(synthesizer, "run_stream"):
+                # Emit strategy fields (direction and confidence first) as soon as each one parses.
+                partial = PartialJSONObject()
+
+                def on_text(chunk: str) -> None:
+                    fields = partial.feed(chunk)
+                    if fields:
+                        emit({"type": "strategy_partial", "payload": fields})
+
+                result = await self._run_agent_streaming(synthesizer, synthesizer_input, on_text)
+            else:
+                result = await self._run_agent(synthesizer, synthesizer_input)
+            if hasattr(result, "value") and result.value is not None:
+                strategy = result.value
+            else:
+                text = result if isinstance(result, str) else getattr(result, "text", str(result))
+                try:
+                    strategy = SecuritiesTradingStrategy.model_validate_json(text)
+                except Exception:
+                    strategy = SecuritiesTradingStrategy(
+                        security=security,
+                        direction="HOLD",
+                        confidence="LOW",
+                        technical_summary=technical_summary[:500],
+                        fundamental_summary=fundamental_summary[:500],
+                        risk_assessment=risk_assessment[:500],
+                        rationale=text[:500] if text else "Synthesis failed.",
+                        conditions=[],
+                        warnings=["Structured parsing failed; review raw output."],
+                    )
+            strategy.security = strategy.security or security
+            return strategy
@@ -24,11 +24,48 @@ class AgentRegistry:
             "energy": [FUNDAMENTAL_ANALYST, TECHNICAL_ANALYST],
             "default": [TECHNICAL_ANALYST, FUNDAMENTAL_ANALYST],
         }
+        # Roles whose findings an analyst consumes; the orchestrator derives its schedule from these.
+        self._dependencies: dict[str, List[str]] = {
+            TECHNICAL_ANALYST: [],
+            FUNDAMENTAL_ANALYST: [],
+            RISK_ANALYST: [TECHNICAL_ANALYST, FUNDAMENTAL_ANALYST],
+        }
         self._agents: dict[str, object] = {}
 
-    def register(self, role: str, agent: object) -> None:
-        """Register an agent by role name."""
+    def register(self, role: str, agent: object, depends_on: Optional[List[str]] = None) -> None:
+        """Register an agent by role name, optionally declaring the roles it depends on."""
         self._agents[role] = agent
+        if depends_on is not None:
+            self._dependencies[role] = list(depends_on)
+
+    def get_dependencies(self, role: str) -> List[str]:
+        """Roles whose findings this role consumes."""
+        return list(self._dependencies.get(role, []))
+
+    def plan(self, roles: List[str]) -> dict[str, List[str]]:
+        """
+        Restrict declared dependencies to the selected roles.
+        Returns role -> roles it must wait for; raises ValueError on a cycle.
+        """
+        selected = set(roles)
+        graph = {role: [d for d in self.get_dependencies(role) if d in selected] for role in roles}
+        visiting: set[str] = set()
+        done: set[str] = set()
+
+        def visit(role: str) -> None:
+            if role in done:
+                return
+            if role in visiting:
+                raise ValueError(f"Dependency cycle involving {role}")
+            visiting.add(role)
+            for dep in graph[role]:
+                visit(dep)
+            visiting.discard(role)
+            done.add(role)
+
+        for role in roles:
+            visit(role)
+        return graph
 
     def get_agent(self, role: str) -> Optional[object]:
         """Get registered agent by role."""
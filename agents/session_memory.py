@@ -0,0 +1,147 @@
+"""Bounded, per-session conversation memory with compaction and idle eviction.
+
+Each session keeps a ring buffer of turns. Only the most recent turns keep their
+full content; older ones are compacted to small structured records (e.g. the
+strategy's security/direction/confidence instead of the full JSON). A session's
+total size is capped in bytes, idle sessions are evicted, and the number of live
+sessions is capped (least recently active first), so memory stays flat for a
+long-running server.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import List, Optional
+
+
+def _get_int(name: str, default: str) -> int:
+    return int(os.getenv(name, default))
+
+
+def _size(record: dict) -> int:
+    return len(json.dumps(record, default=str))
+
+
+class _Session:
+    __slots__ = ("turns", "nbytes", "last_active")
+
+    def __init__(self, max_turns: int) -> None:
+        self.turns: deque = deque(maxlen=max_turns)
+        self.nbytes = 0
+        self.last_active = time.monotonic()
+
+
+class SessionHistoryStore:
+    """Conversation turns per session id, bounded by turns, bytes, idle time and session count."""
+
+    def __init__(
+        self,
+        max_turns: Optional[int] = None,
+        keep_full: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        idle_ttl_seconds: Optional[float] = None,
+        max_sessions: Optional[int] = None,
+    ) -> None:
+        self._max_turns = max_turns or _get_int("SESSION_HISTORY_MAX_TURNS", "40")
+        self._keep_full = keep_full if keep_full is not None else _get_int("SESSION_HISTORY_KEEP_FULL", "4")
+        self._max_bytes = max_bytes or _get_int("SESSION_HISTORY_MAX_BYTES", str(64 * 1024))
+        self._idle_ttl = (
+            idle_ttl_seconds if idle_ttl_seconds is not None else float(os.getenv("SESSION_IDLE_TTL_SECONDS", "3600"))
+        )
+        self._max_sessions = max_sessions or _get_int("SESSION_MAX_SESSIONS", "10000")
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self.evicted_sessions = 0
+
+    def append(self, session_id: str, role: str, content: str, summary: Optional[dict] = None) -> None:
+        """
+        Record a turn. summary is the compact structured form kept once the turn
+        ages out of the full-content window (defaults to truncated content).
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._sweep(now)
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = _Session(self._max_turns)
+            self._sessions.move_to_end(session_id)
+            session.last_active = now
+
+            if len(session.turns) == session.turns.maxlen:
+                session.nbytes -= session.turns[0]["_bytes"]
+            record = {"role": role, "content": content, "summary": summary}
+            record["_bytes"] = _size(record)
+            session.turns.append(record)
+            session.nbytes += record["_bytes"]
+            self._compact(session)
+
+            while len(self._sessions) > self._max_sessions:
+                self._sessions.popitem(last=False)
+                self.evicted_sessions += 1
+
+    def get(self, session_id: str) -> List[dict]:
+        """Turns for a session, oldest first: full {role, content} or compacted {role, compact}."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return []
+            return [{k: v for k, v in t.items() if k != "_bytes" and v is not None} for t in session.turns]
+
+    def clear(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def evict_idle(self) -> int:
+        """Drop sessions idle longer than the TTL; returns how many were dropped."""
+        with self._lock:
+            return self._evict_idle(time.monotonic())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "turns": sum(len(s.turns) for s in self._sessions.values()),
+                "bytes": sum(s.nbytes for s in self._sessions.values()),
+                "evicted_sessions": self.evicted_sessions,
+            }
+
+    def _compact(self, session: _Session) -> None:
+        turns = session.turns
+        # Compact everything older than the full-content window.
+        for i in range(max(0, len(turns) - self._keep_full)):
+            self._compact_turn(session, turns[i])
+        # Then drop the oldest turns until the session fits its byte budget.
+        while session.nbytes > self._max_bytes and len(turns) > 1:
+            session.nbytes -= turns.popleft()["_bytes"]
+        if session.nbytes > self._max_bytes and turns:
+            self._compact_turn(session, turns[0])
+
+    @staticmethod
+    def _compact_turn(session: _Session, turn: dict) -> None:
+        if "content" not in turn:
+            return
+        content = turn.pop("content")
+        summary = turn.pop("summary", None)
+        turn["compact"] = summary if summary is not None else content[:200]
+        session.nbytes -= turn["_bytes"]
+        turn["_bytes"] = _size({k: v for k, v in turn.items() if k != "_bytes"})
+        session.nbytes += turn["_bytes"]
+
+    def _sweep(self, now: float) -> None:
+        # Idle eviction piggybacks on writes, at most once a minute.
+        if now - self._last_sweep >= 60:
+            self._last_sweep = now
+            self._evict_idle(now)
+
+    def _evict_idle(self, now: float) -> int:
+        dropped = 0
+        while self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            if now - session.last_active <= self._idle_ttl:
+                break
+            del self._sessions[session_id]
+            dropped += 1
+        self.evicted_sessions += dropped
+        return dropped
@@ -0,0 +1,204 @@
+"""
+Latency histograms and counters for the SSE server, fed by workflow trace events.
+The registry listens to tools.tracing, so every stage, analyst, LLM and tool call
+is timed without extra instrumentation. render() produces Prometheus text
+exposition format; percentiles() gives live p50/p95/p99 for /health.
+"""
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from tools.tracing import add_listener
+
+# Histogram bucket upper bounds, in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Samples kept per series for live percentiles
+RESERVOIR_SIZE = 2048
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(**labels) -> Labels:
+    return tuple(sorted((k, str(v).lower() if isinstance(v, bool) else str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    escaped = (k + '="' + v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"' for k, v in items)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class Histogram:
+    """Cumulative-bucket histogram plus a bounded reservoir of recent samples."""
+
+    __slots__ = ("buckets", "counts", "sum", "count", "recent")
+
+    def __init__(self, buckets: Iterable[float] = LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+        self.recent: deque = deque(maxlen=RESERVOIR_SIZE)
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+        self.recent.append(value)
+
+    def percentiles(self) -> dict:
+        values = sorted(self.recent)
+        return {
+            "count": self.count,
+            "p50_ms": round(_percentile(values, 0.50) * 1000, 2),
+            "p95_ms": round(_percentile(values, 0.95) * 1000, 2),
+            "p99_ms": round(_percentile(values, 0.99) * 1000, 2),
+        }
+
+
+class MetricsRegistry:
+    """Thread-safe histograms and counters keyed by metric name and labels."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._help: Dict[str, str] = {}
+        self._running: Dict[str, int] = {}
+        self._last_activity: Dict[str, float] = {}
+        self._last_latency_ms: Dict[str, float] = {}
+
+    def observe(self, name: str, seconds: float, help_text: str = "", **labels) -> None:
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            key = _labels(**labels)
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = Histogram()
+            hist.observe(seconds)
+            if help_text:
+                self._help.setdefault(name, help_text)
+
+    def inc(self, name: str, amount: float = 1.0, help_text: str = "", **labels) -> None:
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            key = _labels(**labels)
+            series[key] = series.get(key, 0.0) + amount
+            if help_text:
+                self._help.setdefault(name, help_text)
+
+    def on_event(self, event: dict) -> None:
+        """tools.tracing listener: turn *_end events into histogram samples and counters."""
+        kind = event.get("type")
+        agent = event.get("agent", "orchestrator")
+        if kind in ("analyst_start", "llm_start", "stage_start"):
+            with self._lock:
+                self._running[agent] = self._running.get(agent, 0) + 1
+                self._last_activity[agent] = time.time()
+            return
+        if "wall_ms" not in event:
+            return
+        seconds = event["wall_ms"] / 1000
+        if kind == "stage_end":
+            self.observe("stage_latency_seconds", seconds, "Workflow stage latency", stage=event.get("stage"))
+        elif kind == "analyst_end":
+            self.observe("analyst_latency_seconds", seconds, "Analyst run latency", role=agent)
+            self.inc("analyst_runs_total", help_text="Analyst runs", role=agent, cache_hit=bool(event.get("cache_hit")))
+        elif kind == "llm_end":
+            self.observe("llm_latency_seconds", seconds, "LLM call latency", agent=agent)
+            if event.get("queued_ms"):
+                self.observe("llm_queue_wait_seconds", event["queued_ms"] / 1000, "Wait for an LLM slot", agent=agent)
+            if event.get("error"):
+                self.inc("llm_errors_total", help_text="Failed LLM calls", agent=agent)
+        elif kind == "tool_result":
+            tool = event.get("tool")
+            self.observe("tool_latency_seconds", seconds, "Tool call latency", tool=tool)
+            self.inc("tool_calls_total", help_text="Tool calls", tool=tool, cache_hit=bool(event.get("cache_hit")))
+            if event.get("error") or str(event.get("result", "")).startswith("Error"):
+                self.inc("upstream_errors_total", help_text="Tool calls that failed upstream", tool=tool)
+        if kind in ("analyst_end", "llm_end", "stage_end"):
+            with self._lock:
+                self._running[agent] = max(0, self._running.get(agent, 0) - 1)
+                self._last_activity[agent] = time.time()
+                self._last_latency_ms[agent] = event["wall_ms"]
+
+    def observe_workflow(self, seconds: float, outcome: str) -> None:
+        self.observe("workflow_latency_seconds", seconds, "End-to-end workflow latency", outcome=outcome)
+        self.inc("workflows_total", help_text="Workflows by outcome", outcome=outcome)
+
+    def percentiles(self) -> dict:
+        """Live p50/p95/p99 (ms) per histogram series, e.g. {"stage_latency_seconds": {"classification": {...}}}."""
+        with self._lock:
+            return {
+                name: {",".join(v for _, v in key) or "all": hist.percentiles() for key, hist in series.items()}
+                for name, series in self._histograms.items()
+            }
+
+    def agent_status(self, agent: str) -> dict:
+        with self._lock:
+            last = self._last_activity.get(agent)
+            return {
+                "status": "running" if self._running.get(agent) else "idle",
+                "lastActivityAt": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(last)) if last else None,
+                "latencyMs": self._last_latency_ms.get(agent),
+            }
+
+    def render(self, gauges: Optional[Iterable[Tuple[str, dict, float]]] = None) -> str:
+        """Prometheus text exposition of all histograms, counters and gauges given as (name, labels, value)."""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# HELP {name} {self._help.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for key, hist in series.items():
+                    cumulative = 0
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(key, ('le', repr(bound)))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(key, ('le', '+Inf'))} {hist.count}")
+                    lines.append(f"{name}_sum{_format_labels(key)} {hist.sum:.6f}")
+                    lines.append(f"{name}_count{_format_labels(key)} {hist.count}")
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# HELP {name} {self._help.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{_format_labels(key)} {value:g}")
+        current = None
+        # Group by name: exposition format requires each family's samples to be contiguous.
+        for name, labels, value in sorted(gauges or (), key=lambda g: g[0]):
+            if name != current:
+                current = name
+                lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name}{_format_labels(_labels(**labels))} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+_metrics: Optional[MetricsRegistry] = None
+
+
+def get_metrics() -> MetricsRegistry:
+    """Process-wide registry, subscribed to trace events on first use."""
+    global _metrics
+    if _metrics is None:
+        _metrics = MetricsRegistry()
+        add_listener(_metrics.on_event)
+    return _metrics
+
+
+def hit_ratio(hits: float, misses: float) -> float:
+    total = hits + misses
+    return hits / total if total else 0.0
@@ -0,0 +1,119 @@
+"""
+Orchestrator pool for the SSE server.
+One OrchestratorAgent (client, built agents, caches) is shared; each request checks
+out a lightweight OrchestratorSession bound to its session id. Checkouts are capped
+at max_concurrent with a bounded wait queue, and queueing metrics are tracked.
+"""
+import asyncio
+import itertools
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Callable, Optional
+
+
+def _get_max_concurrent() -> int:
+    return int(os.getenv("ORCHESTRATOR_MAX_CONCURRENT", "16"))
+
+
+def _get_max_queue() -> int:
+    return int(os.getenv("ORCHESTRATOR_MAX_QUEUE", "64"))
+
+
+class PoolSaturatedError(RuntimeError):
+    """Raised when the wait queue is full; the server answers 503."""
+
+
+class OrchestratorSession:
+    """Per-request view of the shared orchestrator: session id plus request bookkeeping."""
+
+    __slots__ = ("orchestrator", "session_id", "request_id", "started_at", "waited_ms")
+
+    def __init__(self, orchestrator, session_id: str, request_id: int, waited_ms: float) -> None:
+        self.orchestrator = orchestrator
+        self.session_id = session_id
+        self.request_id = request_id
+        self.started_at = time.monotonic()
+        self.waited_ms = waited_ms
+
+    async def run_workflow(self, query: str):
+        return await self.orchestrator.run_workflow(query, session_id=self.session_id)
+
+    def stream_workflow(self, query: str):
+        return self.orchestrator.stream_workflow(query, session_id=self.session_id)
+
+
+class OrchestratorPool:
+    """Shares one orchestrator across requests and bounds how many run at once."""
+
+    def __init__(
+        self,
+        factory: Callable[[], object],
+        max_concurrent: Optional[int] = None,
+        max_queue: Optional[int] = None,
+    ) -> None:
+        self._factory = factory
+        self._orchestrator = None
+        self.max_concurrent = max_concurrent or _get_max_concurrent()
+        self.max_queue = max_queue if max_queue is not None else _get_max_queue()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._ids = itertools.count(1)
+        self.in_use = 0
+        self.waiting = 0
+        self.total_checkouts = 0
+        self.rejected = 0
+        self._wait_ms_total = 0.0
+        self.max_wait_ms = 0.0
+
+    @property
+    def orchestrator(self):
+        """The shared orchestrator, built (with all agents) on first use."""
+        if self._orchestrator is None:
+            orchestrator = self._factory()
+            build = getattr(orchestrator, "build_agents", None)
+            if build is not None:
+                build()
+            self._orchestrator = orchestrator
+        return self._orchestrator
+
+    def saturated(self) -> bool:
+        """True when a new request would be rejected."""
+        return self.in_use >= self.max_concurrent and self.waiting >= self.max_queue
+
+    @asynccontextmanager
+    async def checkout(self, session_id: str = "default"):
+        """Wait for a slot and yield an OrchestratorSession; raises PoolSaturatedError if the queue is full."""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrent)
+        if self.saturated():
+            self.rejected += 1
+            raise PoolSaturatedError("Orchestrator pool is saturated")
+        orchestrator = self.orchestrator
+        start = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        waited_ms = (time.perf_counter() - start) * 1000
+        self.in_use += 1
+        self.total_checkouts += 1
+        self._wait_ms_total += waited_ms
+        self.max_wait_ms = max(self.max_wait_ms, waited_ms)
+        try:
+            yield OrchestratorSession(orchestrator, session_id or "default", next(self._ids), waited_ms)
+        finally:
+            self.in_use -= 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        return {
+            "in_use": self.in_use,
+            "waiting": self.waiting,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "total_checkouts": self.total_checkouts,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self._wait_ms_total / self.total_checkouts, 2) if self.total_checkouts else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 2),
+        }
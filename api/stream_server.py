@@ -8,157 +8,254 @@ import asyncio
 import json
 import os
 import sys
+import time
+import uuid
 from contextlib import asynccontextmanager
+from typing import Optional
 
 # Add project root for imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+from api.metrics import get_metrics, hit_ratio
+from api.orchestrator_pool import OrchestratorPool, PoolSaturatedError
 
 # Lazy imports to avoid loading agent_framework if not used
-_orchestrator = None
+_pool = None
+_warmup_state: dict = {"status": "skipped"}
+
+
+def _get_warmup_on_startup() -> bool:
+    return os.getenv("WARMUP_ON_STARTUP", "1").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _get_warmup_symbols() -> list:
+    """Tickers whose price history is fetched during warmup (comma-separated)."""
+    return [s.strip().upper() for s in os.getenv("WARMUP_SYMBOLS", "").split(",") if s.strip()]
+
+
+def build_orchestrator():
+    from dotenv import load_dotenv
+    load_dotenv()
+    from agent_framework.azure import AzureOpenAIResponsesClient
+    from config import AZURE_OPENAI_ENDPOINT, AZURE_OPENAI_API_KEY, AZURE_OPENAI_DEPLOYMENT
+    from agents.orchestrator import OrchestratorAgent
+    client = AzureOpenAIResponsesClient(
+        endpoint=AZURE_OPENAI_ENDPOINT,
+        api_key=AZURE_OPENAI_API_KEY,
+        deployment_name=AZURE_OPENAI_DEPLOYMENT,
+    )
+    return OrchestratorAgent(client=client)
+
+
+def get_pool() -> OrchestratorPool:
+    """Process-wide pool: shared orchestrator, per-request sessions, bounded concurrency."""
+    global _pool
+    if _pool is None:
+        _pool = OrchestratorPool(build_orchestrator)
+    return _pool
+
+
+def set_pool(pool: OrchestratorPool) -> None:
+    """Replace the pool (e.g. with a stubbed orchestrator factory for load tests)."""
+    global _pool
+    _pool = pool
 
 
 def get_orchestrator():
-    global _orchestrator
-    if _orchestrator is None:
-        from dotenv import load_dotenv
-        load_dotenv()
-        from agent_framework.azure import AzureOpenAIResponsesClient
-        from config import AZURE_OPENAI_ENDPOINT, AZURE_OPENAI_API_KEY, AZURE_OPENAI_DEPLOYMENT
-        from agents.orchestrator import OrchestratorAgent
-        client = AzureOpenAIResponsesClient(
-            endpoint=AZURE_OPENAI_ENDPOINT,
-            api_key=AZURE_OPENAI_API_KEY,
-            deployment_name=AZURE_OPENAI_DEPLOYMENT,
-        )
-        _orchestrator = OrchestratorAgent(client=client)
-    return _orchestrator
+    return get_pool().orchestrator
 
 
 def sse_event(data: dict) -> str:
-    return f"data: {json.dumps(data)}\n\n"
+    return f"data: {json.dumps(data, default=str)}\n\n"
 
 
-async def run_workflow_with_stream(query: str):
-    """Yield SSE events while running the orchestrator workflow."""
-    from schemas import AnalystContext
-    from agents.registry import TECHNICAL_ANALYST, FUNDAMENTAL_ANALYST, RISK_ANALYST
-    from agents.orchestrator import OrchestratorAgent
+def new_session_id() -> str:
+    """Fresh session id for callers that did not send one, so their history is never shared."""
+    return uuid.uuid4().hex
+
+
+async def run_workflow_with_stream(query: str, session_id: Optional[str] = None):
+    """Yield SSE events while running the orchestrator workflow in a pooled session."""
+    session_id = session_id or new_session_id()
+    metrics = get_metrics()
+    start = time.perf_counter()
+    outcome = "cancelled"
+    try:
+        async with get_pool().checkout(session_id) as session:
+            async for event in _stream_session(session, query):
+                yield event
+        outcome = "ok"
+    except PoolSaturatedError:
+        outcome = "rejected"
+        yield sse_event({"type": "error", "message": "Server busy; retry shortly."})
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        metrics.observe_workflow(time.perf_counter() - start, outcome)
+
+
+def _score_from_report(report: dict) -> Optional[int]:
+    """
+    Risk score (0-100) from RiskReport numbers: volatility against its limit
+    (up to 60 points, 40 at the limit), drawdown depth (up to 30 at -40%) and
+    position compliance (10). A report that is not acceptable scores at least 60.
+    """
+    vol = report.get("annualized_volatility_pct")
+    max_vol = report.get("max_volatility_pct")
+    if vol is None or not max_vol:
+        return None
+    score = 60.0 * min(vol / max_vol, 1.5) / 1.5
+    drawdown = report.get("max_drawdown_pct")
+    if drawdown is not None:
+        score += 30.0 * min(abs(drawdown) / 40.0, 1.0)
+    if not report.get("position_compliant", True):
+        score += 10.0
+    if not report.get("acceptable", True):
+        score = max(score, 60.0)
+    return int(round(min(score, 100.0)))
+
+
+def risk_score_event(risk_assessment: str, report: Optional[dict] = None) -> dict:
+    """Risk score (0-100) from the risk engine's report, else a keyword heuristic on the findings text."""
+    risk_score = _score_from_report(report) if report else None
+    if risk_score is None:
+        risk_score = 35
+        if "EXCEEDS" in risk_assessment or "high" in risk_assessment.lower():
+            risk_score = 70
+        elif "WITHIN" in risk_assessment:
+            risk_score = 25
+    return {"type": "risk_score", "score": risk_score, "label": "Moderate" if risk_score < 60 else "High"}
+
+
+async def _stream_session(session, query: str):
+    """Forward the orchestrator's trace events, adding the risk score before synthesis."""
+    from agents.registry import RISK_ANALYST
 
-    orch = get_orchestrator()
-    classification = await orch._classify(query)
-    yield sse_event({
-        "type": "classification",
-        "payload": {
-            "analysis_type": classification.analysis_type.value,
-            "security": classification.security,
-            "sector": classification.sector,
-            "time_horizon": classification.time_horizon,
-            "raw_intent": classification.raw_intent,
-        },
-    })
-
-    security = classification.security
-    sector = classification.sector
-    time_horizon = classification.time_horizon
-    from schemas import AnalysisType
-    analysis_type = classification.analysis_type
-    if analysis_type == AnalysisType.UNKNOWN:
-        analysis_type = AnalysisType.BOTH
-    selected = orch._registry.select_analysts(analysis_type=analysis_type, security=security, sector=sector)
-
-    shared_facts = []
-    technical_summary = ""
-    fundamental_summary = ""
     risk_assessment = ""
+    risk_report = None
+    async for event in session.stream_workflow(query):
+        if event["type"] == "analyst_end" and event.get("agent") == RISK_ANALYST:
+            risk_assessment = event.get("summary", "")
+            risk_report = event.get("metrics")
+        elif event["type"] == "stage_start" and event.get("stage") == "synthesis":
+            yield sse_event(risk_score_event(risk_assessment, risk_report))
+        yield sse_event(event)
 
-    for role in selected:
-        yield sse_event({
-            "type": "analyst_start",
-            "agent": role,
-            "instruction": f"User objective: {classification.raw_intent}. Provide your analysis concisely.",
-        })
-        # Simulate tool calls (framework may not expose granular tool events; we emit placeholders)
-        if role == TECHNICAL_ANALYST and security:
-            yield sse_event({"type": "tool_call", "agent": role, "tool": "get_price_history", "args": {"symbol": security, "period": "1mo"}})
-            yield sse_event({"type": "tool_call", "agent": role, "tool": "get_volume_analysis", "args": {"symbol": security}})
-        elif role == FUNDAMENTAL_ANALYST and security:
-            yield sse_event({"type": "tool_call", "agent": role, "tool": "get_earnings_summary", "args": {"symbol": security}})
-        elif role == RISK_ANALYST and security:
-            yield sse_event({"type": "tool_call", "agent": role, "tool": "evaluate_volatility", "args": {"symbol": security}})
-
-        context = AnalystContext(
-            security=security,
-            sector=sector,
-            time_horizon=time_horizon,
-            shared_facts=shared_facts,
-            orchestrator_instruction=f"User objective: {classification.raw_intent}. Provide your analysis concisely.",
-        )
-        out = await orch._run_analyst(role, context)
-        yield sse_event({"type": "analyst_end", "agent": role, "summary": out[:300]})
-        if role == TECHNICAL_ANALYST:
-            technical_summary = out
-            shared_facts.append("Technical: " + out[:300])
-        elif role == FUNDAMENTAL_ANALYST:
-            fundamental_summary = out
-            shared_facts.append("Fundamental: " + out[:300])
-        elif role == RISK_ANALYST:
-            risk_assessment = out
-
-    if not technical_summary:
-        technical_summary = "No technical analysis requested or available."
-    if not fundamental_summary:
-        fundamental_summary = "No fundamental analysis requested or available."
-    if not risk_assessment:
-        risk_assessment = "No risk assessment requested or available."
-
-    # Simple risk score heuristic (0-100) from risk_assessment text
-    risk_score = 35
-    if "EXCEEDS" in risk_assessment or "high" in risk_assessment.lower():
-        risk_score = 70
-    elif "WITHIN" in risk_assessment:
-        risk_score = 25
-    yield sse_event({"type": "risk_score", "score": risk_score, "label": "Moderate" if risk_score < 60 else "High"})
-
-    synthesizer_input = (
-        f"User query: {query}\n\n"
-        f"Technical Analyst findings:\n{technical_summary}\n\n"
-        f"Fundamental Analyst findings:\n{fundamental_summary}\n\n"
-        f"Risk Management findings:\n{risk_assessment}\n\n"
-        "Produce the structured Securities Trading Strategy (direction, confidence, summaries, rationale, conditions, warnings)."
-    )
-    synthesizer = orch._get_synthesizer()
-    result = await synthesizer.run(synthesizer_input)
-    from schemas import SecuritiesTradingStrategy
-    if hasattr(result, "value") and result.value is not None:
-        strategy = result.value
-    else:
-        text = getattr(result, "text", str(result))
-        try:
-            strategy = SecuritiesTradingStrategy.model_validate_json(text)
-        except Exception:
-            strategy = SecuritiesTradingStrategy(
-                security=security,
-                direction="HOLD",
-                confidence="LOW",
-                technical_summary=technical_summary[:500],
-                fundamental_summary=fundamental_summary[:500],
-                risk_assessment=risk_assessment[:500],
-                rationale=text[:500] if text else "Synthesis failed.",
-                conditions=[],
-                warnings=["Structured parsing failed."],
-            )
-    strategy.security = strategy.security or security
-    yield sse_event({"type": "strategy", "payload": strategy.model_dump()})
+
+def collect_gauges():
+    """Point-in-time gauges for /metrics: pool occupancy, queue depth and cache hit ratios."""
+    from tools.encoding import encoding_stats
+    from tools.fundamentals_store import get_fundamentals_store, open_error_stats
+    from tools.history_cache import get_history_cache
+    from tools.macro_snapshot import get_macro_snapshot
+    from tools.market_data import get_market_data
+    from tools.memo import memo_stats
+    from tools.watchlist import get_watchlist_warmer
+
+    pool = get_pool()
+    stats = pool.stats()
+    gauges = [
+        ("workflows_in_flight", {}, stats["in_use"]),
+        ("workflow_queue_depth", {}, stats["waiting"]),
+        ("workflow_queue_wait_max_ms", {}, stats["max_wait_ms"]),
+        ("workflow_pool_rejected", {}, stats["rejected"]),
+        ("market_data_inflight", {}, get_market_data().flights.stats()["inflight"]),
+    ]
+    watchlist = get_watchlist_warmer().stats()
+    if watchlist["symbols"]:
+        gauges.append(("watchlist_symbols", {}, watchlist["symbols"]))
+        gauges.append(("watchlist_warm", {"data": "history"}, watchlist["history_warm"]))
+        gauges.append(("watchlist_warm", {"data": "fundamentals"}, watchlist["fundamentals_warm"]))
+        gauges.append(("watchlist_throttled_fetches", {}, watchlist["throttled_fetches"]))
+        gauges.append(("watchlist_fundamentals_pending", {}, watchlist["fundamentals_pending"]))
+    macro_age = get_macro_snapshot().age_seconds()
+    if macro_age is not None:
+        gauges.append(("macro_snapshot_age_seconds", {}, round(macro_age, 1)))
+    caches = {"history": get_history_cache().stats(), "tool_memo": memo_stats()}
+    store = get_fundamentals_store()
+    if store is not None:
+        caches["fundamentals"] = store.stats()
+        gauges.append(("fundamentals_store_errors", {}, caches["fundamentals"]["errors"]))
+    elif open_error_stats()["errors"]:
+        gauges.append(("fundamentals_store_errors", {}, open_error_stats()["errors"]))
+    try:
+        orch_caches = pool.orchestrator.cache_stats()
+        caches["classification"] = orch_caches["classification"]
+        caches["analyst"] = orch_caches["analyst"]
+        gauges.append(("session_history_sessions", {}, orch_caches["session_history"]["sessions"]))
+    except Exception:
+        pass
+    for name, cache in caches.items():
+        gauges.append(("cache_hits", {"cache": name}, cache["hits"]))
+        gauges.append(("cache_misses", {"cache": name}, cache["misses"]))
+        gauges.append(("cache_hit_ratio", {"cache": name}, hit_ratio(cache["hits"], cache["misses"])))
+    for tool, counters in encoding_stats()["tools"].items():
+        gauges.append(("tool_output_tokens", {"tool": tool, "format": "table"}, counters["baseline_tokens"]))
+        gauges.append(("tool_output_tokens", {"tool": tool, "format": "encoded"}, counters["encoded_tokens"]))
+    return gauges
+
+
+async def warmup() -> dict:
+    """
+    Build the shared orchestrator (client and every agent), load the numeric stack
+    and prime the history and macro caches, so the first request runs warm.
+    Failures are recorded, not raised: the server still starts and /health shows them.
+    """
+    global _warmup_state
+    start = time.perf_counter()
+    steps = {}
+
+    def done(step: str, since: float) -> float:
+        now = time.perf_counter()
+        steps[step] = round((now - since) * 1000, 1)
+        return now
+
+    try:
+        t = time.perf_counter()
+        get_pool().orchestrator
+        t = done("agents", t)
+        import pandas  # noqa: F401
+        import tools.indicators  # noqa: F401
+        t = done("imports", t)
+        from tools.market_data import get_market_data
+        market_data = get_market_data()
+        symbols = _get_warmup_symbols()
+        if symbols:
+            await asyncio.gather(*(market_data.history(symbol, "1y") for symbol in symbols), return_exceptions=True)
+            t = done("history", t)
+        if os.getenv("WARMUP_MACRO", "1").strip().lower() in ("1", "true", "yes", "on"):
+            from tools.macro_snapshot import get_macro_snapshot
+            await get_macro_snapshot().refresh()
+            done("macro", t)
+        _warmup_state = {"status": "ready", "steps_ms": steps}
+    except Exception as e:
+        _warmup_state = {"status": "failed", "steps_ms": steps, "error": repr(e)[:200]}
+    _warmup_state["total_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return _warmup_state
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    from tools.macro_snapshot import get_macro_snapshot
+    from tools.watchlist import get_watchlist_warmer
+
+    get_metrics()  # subscribe to trace events before the first request
+    if _get_warmup_on_startup():
+        # Runs before the server accepts connections, so a pod only reports ready once warm.
+        await warmup()
+    macro = get_macro_snapshot()
+    macro.start_refresher()
+    watchlist = get_watchlist_warmer()
+    watchlist.start(busy=lambda: get_pool().in_use > 0)
     yield
     # shutdown
+    await watchlist.stop()
+    await macro.stop_refresher()
 
 
 app = FastAPI(title="Trading Command Center API", lifespan=lifespan)
@@ -168,43 +265,72 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Session-Id"],
 )
 
 
 @app.get("/health")
 async def health():
-    """System health for observability: API latency, agent registry status."""
-    import time
+    """System health for observability: API latency, agent registry status, live latency percentiles."""
+    from tools.macro_snapshot import get_macro_snapshot
+    from tools.watchlist import get_watchlist_warmer
+
     start = time.perf_counter()
     registry_healthy = False
     agents = []
+    pool = get_pool()
+    metrics = get_metrics()
     try:
-        orch = get_orchestrator()
+        orch = pool.orchestrator
         registry_healthy = orch._registry is not None
         agents = [
-            {"id": "orchestrator", "status": "idle", "lastActivityAt": None, "latencyMs": None},
-            {"id": "classifier", "status": "idle", "lastActivityAt": None, "latencyMs": None},
-            {"id": "technical_analyst", "status": "idle", "lastActivityAt": None, "latencyMs": None},
-            {"id": "fundamental_analyst", "status": "idle", "lastActivityAt": None, "latencyMs": None},
-            {"id": "risk_analyst", "status": "idle", "lastActivityAt": None, "latencyMs": None},
+            {"id": agent_id, **metrics.agent_status(agent_id)}
+            for agent_id in ("orchestrator", "classifier", "technical_analyst", "fundamental_analyst", "risk_analyst")
         ]
     except Exception:
         pass
     elapsed_ms = int((time.perf_counter() - start) * 1000)
-    return {"registry_healthy": registry_healthy, "agents": agents, "api_latency_ms": elapsed_ms}
+    return {
+        "registry_healthy": registry_healthy,
+        "agents": agents,
+        "api_latency_ms": elapsed_ms,
+        "pool": pool.stats(),
+        "latency": metrics.percentiles(),
+        "warmup": _warmup_state,
+        "macro": get_macro_snapshot().stats(),
+        "watchlist": get_watchlist_warmer().stats(),
+    }
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus text exposition: latency histograms, call/error counters, pool and cache gauges."""
+    return PlainTextResponse(get_metrics().render(collect_gauges()), media_type="text/plain; version=0.0.4")
 
 
 @app.get("/stream")
-async def stream(query: str = ""):
-    """SSE stream of ThoughtEvents for the Reasoning Trace."""
+async def stream(query: str = "", session_id: Optional[str] = None):
+    """
+    SSE stream of ThoughtEvents for the Reasoning Trace. Requests without a
+    session_id get a fresh one (returned in X-Session-Id) rather than a shared session.
+    """
     if not query:
         return StreamingResponse(
             iter([sse_event({"type": "strategy", "payload": None})]),
             media_type="text/event-stream",
             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
         )
+    if get_pool().saturated():
+        get_metrics().inc("workflows_total", outcome="rejected")
+        return JSONResponse({"error": "Server busy; retry shortly."}, status_code=503, headers={"Retry-After": "1"})
+    session_id = session_id or new_session_id()
     return StreamingResponse(
-        run_workflow_with_stream(query),
+        run_workflow_with_stream(query, session_id),
         media_type="text/event-stream",
-        headers={"Cache-Control": "no-cache", "Connection": "keep-alive", "X-Accel-Buffering": "no"},
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+            "X-Session-Id": session_id,
+        },
     )
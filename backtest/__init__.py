@@ -0,0 +1 @@
+"""Historical replay of synthesized trading strategies (run as python -m backtest.run)."""
@@ -0,0 +1,285 @@
+"""
+Vectorized backtest of SecuritiesTradingStrategy decisions.
+
+Bars, decisions and positions are (symbols x days) NumPy matrices. A decision
+(direction, confidence, and stop / target levels parsed from `conditions`) is
+made at a bar's close and held until the next decision for that symbol, its
+stop or target is touched, or hold_days pass. The position earns the next bar's
+return, so there is no look-ahead. Everything after loading is whole-matrix
+array operations, so thousands of symbol-days take milliseconds.
+
+Decisions come from recorded strategies (JSONL written by record_strategy, e.g.
+from run_workflow outputs) or from stub_decisions, a deterministic moving-average
+stand-in for the agents.
+"""
+import json
+import re
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+TRADING_DAYS_PER_YEAR = 252
+DIRECTIONS = {"BUY": 1.0, "SELL": -1.0, "HOLD": 0.0}
+CONFIDENCE_SIZE = {"LOW": 0.5, "MEDIUM": 0.75, "HIGH": 1.0}
+
+# A level is '$182.5', 'at 182.5' / 'to 182.5' (optionally '%'), or '5%'; a bare
+# number ('stop loss within 3 days') is not a level.
+_LEVEL = r"(?:\$\s*(\d+(?:\.\d+)?)()|\b(?:at|to)\s+\$?\s*(\d+(?:\.\d+)?)(\s*%)?|(\d+(?:\.\d+)?)(\s*%))"
+_STOP = r"stop(?:[- ]loss)?"
+_TARGET = r"(?:take[- ]profit|profit target|price target|target)"
+_STOP_RE = re.compile(_STOP + r"\D{0,20}?" + _LEVEL, re.IGNORECASE)
+_TARGET_RE = re.compile(_TARGET + r"\D{0,20}?" + _LEVEL, re.IGNORECASE)
+_STOP_BARE_RE = re.compile(_STOP + r"\D{0,20}?\d", re.IGNORECASE)
+_TARGET_BARE_RE = re.compile(_TARGET + r"\D{0,20}?\d", re.IGNORECASE)
+
+
+def _ffill_index(valid: np.ndarray) -> np.ndarray:
+    """Per cell, the column of the last valid cell at or before it in its row (-1 if none)."""
+    cols = np.arange(valid.shape[1])
+    return np.maximum.accumulate(np.where(valid, cols, -1), axis=1)
+
+
+def _take(values: np.ndarray, index: np.ndarray, fill: float = np.nan) -> np.ndarray:
+    out = np.take_along_axis(values, np.clip(index, 0, None), axis=1)
+    return np.where(index >= 0, out, fill)
+
+
+def load_bars(symbols: Sequence[str], period: str = "5y", fixture_dir: Optional[str] = None):
+    """
+    Closes for symbols from the local dataset (fixture CSVs in fixture_dir or
+    MARKET_DATA_FIXTURE_DIR, else the seeded synthetic series), aligned on the
+    union of dates and forward-filled. Returns (symbols, dates, closes).
+    """
+    import pandas as pd
+
+    from tools.market_data import FixtureProvider
+
+    provider = FixtureProvider(fixture_dir=fixture_dir)
+    series = [provider.history(s, period)["Close"] for s in symbols]
+    frame = pd.concat(series, axis=1, keys=[s.upper() for s in symbols]).sort_index()
+    closes = frame.to_numpy(dtype=float).T
+    closes = _take(closes, _ffill_index(~np.isnan(closes)))
+    return [s.upper() for s in symbols], frame.index, closes
+
+
+def _levels(pattern, text: str, price: float, sign: float):
+    """Price levels in text for pattern; percentages are measured from price towards sign."""
+    for m in pattern.finditer(text):
+        value, pct = next((m.group(i), m.group(i + 1)) for i in (1, 3, 5) if m.group(i) is not None)
+        yield price * (1.0 + sign * float(value) / 100.0) if pct else float(value)
+
+
+def parse_levels(conditions: Iterable[str], price: float, direction: float) -> Tuple[float, float, int]:
+    """
+    (stop, target, ignored) from condition text such as 'stop loss at 182.5',
+    'stop 5% below entry' or 'take profit at $210'; NaN where none is given.
+    Percentages are measured from price on the losing / winning side of direction.
+    A level needs a '$', 'at' / 'to', or '%'; ignored counts stop / target
+    mentions whose number is not a level, or whose level is on the wrong side
+    of price for a BUY or SELL (e.g. a long stop above entry).
+    """
+    levels = [np.nan, np.nan]
+    ignored = 0
+    side = 1.0 if direction >= 0 else -1.0
+    rules = ((_STOP_RE, _STOP_BARE_RE, -side), (_TARGET_RE, _TARGET_BARE_RE, side))
+    for text in conditions:
+        for i, (pattern, bare, sign) in enumerate(rules):
+            found = False
+            for level in _levels(pattern, text, price, sign):
+                found = True
+                if level <= 0 or (direction != 0 and (level - price) * sign <= 0):
+                    ignored += 1
+                elif np.isnan(levels[i]):
+                    levels[i] = level
+            if not found and bare.search(text):
+                ignored += 1
+    return levels[0], levels[1], ignored
+
+
+class DecisionGrid:
+    """Sparse decisions on the (symbols x days) grid; NaN where no decision was made."""
+
+    def __init__(self, shape: Tuple[int, int]) -> None:
+        self.direction = np.full(shape, np.nan)
+        self.size = np.full(shape, np.nan)
+        self.stop = np.full(shape, np.nan)
+        self.target = np.full(shape, np.nan)
+        self.ignored_levels = 0  # stop / target mentions parse_levels rejected
+
+    @property
+    def count(self) -> int:
+        return int(np.count_nonzero(~np.isnan(self.direction)))
+
+
+def record_strategy(path: str, symbol: str, date: str, strategy) -> None:
+    """Append one strategy (a SecuritiesTradingStrategy or dict) decided on date to a JSONL file."""
+    payload = strategy.model_dump(mode="json") if hasattr(strategy, "model_dump") else dict(strategy)
+    with open(path, "a") as f:
+        f.write(json.dumps({"symbol": symbol.upper(), "date": str(date)[:10], "strategy": payload}) + "\n")
+
+
+def load_records(path: str) -> List[dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def decisions_from_records(records: Iterable[dict], symbols: Sequence[str], dates, closes: np.ndarray, sizing: str = "confidence") -> DecisionGrid:
+    """Place recorded strategies on the grid at the first bar on or after each record's date."""
+    import pandas as pd
+
+    grid = DecisionGrid(closes.shape)
+    row_of = {s: i for i, s in enumerate(symbols)}
+    day_index = pd.DatetimeIndex(dates).tz_localize(None).normalize() if getattr(dates, "tz", None) else pd.DatetimeIndex(dates).normalize()
+    for record in records:
+        row = row_of.get(str(record.get("symbol", "")).upper())
+        strategy = record.get("strategy", record)
+        direction = DIRECTIONS.get(str(strategy.get("direction", "")).upper())
+        if row is None or direction is None:
+            continue
+        col = int(day_index.searchsorted(pd.Timestamp(record["date"]).normalize()))
+        if col >= len(day_index):
+            continue
+        size = CONFIDENCE_SIZE.get(str(strategy.get("confidence", "")).upper(), 0.5) if sizing == "confidence" else 1.0
+        grid.direction[row, col] = direction
+        grid.size[row, col] = size
+        grid.stop[row, col], grid.target[row, col], ignored = parse_levels(strategy.get("conditions") or [], closes[row, col], direction)
+        grid.ignored_levels += ignored
+    return grid
+
+
+def stub_decisions(closes: np.ndarray, every: int = 5, fast: int = 20, slow: int = 50, stop_pct: float = 8.0, sizing: str = "confidence") -> DecisionGrid:
+    """
+    Deterministic stand-in for the agents, decided every `every` bars: BUY when
+    the fast SMA is above the slow one and price above the fast SMA, SELL in the
+    mirror case, HOLD otherwise; confidence from the SMA spread; stop at stop_pct.
+    """
+    from tools.indicators import sma
+
+    grid = DecisionGrid(closes.shape)
+    fast_ma, slow_ma = sma(closes, fast), sma(closes, slow)
+    cols = np.zeros(closes.shape[1], dtype=bool)
+    cols[slow - 1::every] = True
+    when = cols[None, :] & ~np.isnan(slow_ma)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        spread = fast_ma / slow_ma - 1.0
+        direction = np.where((spread > 0) & (closes > fast_ma), 1.0, np.where((spread < 0) & (closes < fast_ma), -1.0, 0.0))
+        size = np.select([np.abs(spread) > 0.02, np.abs(spread) > 0.005], [1.0, 0.75], 0.5) if sizing == "confidence" else np.ones_like(closes)
+    grid.direction = np.where(when, direction, np.nan)
+    grid.size = np.where(when, size, np.nan)
+    grid.stop = np.where(when & (direction != 0), closes * (1.0 - direction * stop_pct / 100.0), np.nan)
+    return grid
+
+
+def grid_to_records(grid: DecisionGrid, symbols: Sequence[str], dates) -> List[dict]:
+    """Strategy-shaped records for a grid (e.g. to save stub decisions and replay them as recorded ones)."""
+    names = {v: k for k, v in DIRECTIONS.items()}
+    sizes = {v: k for k, v in CONFIDENCE_SIZE.items()}
+    rows, cols = np.nonzero(~np.isnan(grid.direction))
+    records = []
+    for r, c in zip(rows, cols):
+        conditions = []
+        if not np.isnan(grid.stop[r, c]):
+            conditions.append(f"Stop loss at {grid.stop[r, c]:.2f}")
+        if not np.isnan(grid.target[r, c]):
+            conditions.append(f"Take profit at {grid.target[r, c]:.2f}")
+        records.append({
+            "symbol": symbols[r],
+            "date": str(dates[c])[:10],
+            "strategy": {
+                "direction": names[grid.direction[r, c]],
+                "confidence": sizes.get(grid.size[r, c], "MEDIUM"),
+                "conditions": conditions,
+            },
+        })
+    return records
+
+
+def simulate(closes: np.ndarray, grid: DecisionGrid, cost_bps: float = 5.0, hold_days: Optional[int] = None) -> dict:
+    """
+    Positions and daily P&L per symbol. Position at bar t = the latest decision's
+    direction x size, zeroed once its stop / target is touched at a close or after
+    hold_days; it earns the return from t to t+1. Costs are cost_bps per unit traded.
+    """
+    cols = np.arange(closes.shape[1])
+    start = _ffill_index(~np.isnan(grid.direction))
+    wanted = np.nan_to_num(_take(grid.direction, start) * _take(grid.size, start))
+    if hold_days:
+        wanted = np.where(cols[None, :] - start >= hold_days, 0.0, wanted)
+    stop, target = _take(grid.stop, start), _take(grid.target, start)
+    with np.errstate(invalid="ignore"):
+        long_exit = (wanted > 0) & ((closes <= stop) | (closes >= target))
+        short_exit = (wanted < 0) & ((closes >= stop) | (closes <= target))
+    last_exit = _ffill_index(long_exit | short_exit)
+    position = np.where(last_exit >= start, 0.0, wanted)
+
+    returns = np.zeros_like(closes)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns[:, 1:] = closes[:, 1:] / closes[:, :-1] - 1.0
+    returns = np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+    held = np.zeros_like(position)
+    held[:, 1:] = position[:, :-1]
+    traded = np.abs(np.diff(position, axis=1, prepend=0.0))
+    gross = held * returns
+    return {"position": position, "returns": returns, "gross": gross, "pnl": gross - traded * cost_bps / 1e4, "traded": traded}
+
+
+def _drawdown(equity: np.ndarray) -> float:
+    return float(np.min(equity / np.maximum.accumulate(equity) - 1.0)) if equity.size else 0.0
+
+
+def summarize(sim: dict, symbols: Sequence[str], periods_per_year: int = TRADING_DAYS_PER_YEAR) -> dict:
+    """Portfolio (equal capital per symbol) and per-symbol P&L, hit rate, drawdown, turnover and exposure."""
+    position, pnl, traded = sim["position"], sim["pnl"], sim["traded"]
+    n, days = position.shape
+    daily = pnl.mean(axis=0)
+    equity = np.cumprod(1.0 + daily)
+    years = days / periods_per_year
+    std = float(daily.std(ddof=1)) if days > 1 else 0.0
+
+    # Trades: runs of a constant non-zero position. A run starting at bar s earns
+    # gross[s+1 .. e+1] and pays the cost of the trade at s (its entry).
+    forward = pnl - sim["gross"]
+    forward[:, :-1] += sim["gross"][:, 1:]
+    change = np.ones_like(position, dtype=bool)
+    change[:, 1:] = position[:, 1:] != position[:, :-1]
+    ids = np.cumsum(change.ravel()) - 1
+    starts = np.flatnonzero(change.ravel())
+    trade_pnl = np.bincount(ids, weights=forward.ravel())
+    active = position.ravel()[starts] != 0
+    trade_row = starts // days
+    wins = (trade_pnl > 0) & active
+    trades_per_symbol = np.bincount(trade_row[active], minlength=n)
+    wins_per_symbol = np.bincount(trade_row[wins], minlength=n)
+    symbol_equity = np.cumprod(1.0 + pnl, axis=1)
+    symbol_dd = np.min(symbol_equity / np.maximum.accumulate(symbol_equity, axis=1) - 1.0, axis=1)
+    in_market = position != 0
+
+    def r(x: float, digits: int = 4) -> float:
+        return round(float(x), digits)
+
+    return {
+        "symbols": n,
+        "days": days,
+        "symbol_days": n * days,
+        "total_return_pct": r((equity[-1] - 1.0) * 100),
+        "cagr_pct": r((equity[-1] ** (1.0 / years) - 1.0) * 100) if years > 0 and equity[-1] > 0 else None,
+        "annualized_volatility_pct": r(std * np.sqrt(periods_per_year) * 100),
+        "sharpe": r(daily.mean() / std * np.sqrt(periods_per_year)) if std > 0 else None,
+        "max_drawdown_pct": r(_drawdown(equity) * 100),
+        "trades": int(active.sum()),
+        "hit_rate_pct": r(wins.sum() / active.sum() * 100, 2) if active.any() else None,
+        "daily_hit_rate_pct": r((sim["gross"][sim["gross"] != 0] > 0).mean() * 100, 2) if np.any(sim["gross"] != 0) else None,
+        "annual_turnover": r(traded.sum() / n / years, 2) if years > 0 else None,
+        "exposure_pct": r(in_market.mean() * 100, 2),
+        "long_pct": r((position > 0).mean() * 100, 2),
+        "short_pct": r((position < 0).mean() * 100, 2),
+        "per_symbol": {
+            symbol: {
+                "return_pct": r((symbol_equity[i, -1] - 1.0) * 100),
+                "max_drawdown_pct": r(symbol_dd[i] * 100),
+                "trades": int(trades_per_symbol[i]),
+                "hit_rate_pct": r(wins_per_symbol[i] / trades_per_symbol[i] * 100, 2) if trades_per_symbol[i] else None,
+            }
+            for i, symbol in enumerate(symbols)
+        },
+    }
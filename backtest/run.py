@@ -0,0 +1,111 @@
+"""
+Backtest strategy decisions over historical bars and print (or write) a JSON
+report: total return, CAGR, Sharpe, max drawdown, trade and daily hit rate,
+turnover and exposure, overall and per symbol, plus timings.
+
+Bars come from the local dataset (CSV files in --fixture-dir or
+MARKET_DATA_FIXTURE_DIR, else the seeded synthetic series). Decisions come from
+a recorded JSONL file (--decisions; see backtest.engine.record_strategy) or the
+deterministic moving-average stub.
+
+Run: python -m backtest.run [--symbols AAPL,MSFT] [--period 10y] [--output report.json]
+     python -m backtest.run --universe 500 --period 10y
+     python -m backtest.run --write-decisions stub.jsonl   # save stub decisions to replay later
+     python -m backtest.run --decisions recorded.jsonl --hold-days 20
+"""
+import argparse
+import json
+import sys
+import time
+
+from backtest.engine import (
+    decisions_from_records,
+    grid_to_records,
+    load_bars,
+    load_records,
+    simulate,
+    stub_decisions,
+    summarize,
+)
+from benchmarks.fixtures import SYMBOLS
+
+
+def run_backtest(args) -> dict:
+    timings = {}
+    start = time.perf_counter()
+    symbols, dates, closes = load_bars(args.symbols, args.period, args.fixture_dir)
+    timings["load_s"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if args.decisions:
+        grid = decisions_from_records(load_records(args.decisions), symbols, dates, closes, args.sizing)
+    else:
+        grid = stub_decisions(closes, every=args.every, stop_pct=args.stop_pct, sizing=args.sizing)
+    timings["decisions_s"] = time.perf_counter() - start
+    if args.write_decisions:
+        with open(args.write_decisions, "w") as f:
+            for record in grid_to_records(grid, symbols, dates):
+                f.write(json.dumps(record) + "\n")
+
+    start = time.perf_counter()
+    sim = simulate(closes, grid, cost_bps=args.cost_bps, hold_days=args.hold_days)
+    report = summarize(sim, symbols)
+    timings["simulate_s"] = time.perf_counter() - start
+
+    if not args.per_symbol:
+        report.pop("per_symbol")
+    return {
+        "config": {
+            "period": args.period,
+            "start": str(dates[0])[:10] if len(dates) else None,
+            "end": str(dates[-1])[:10] if len(dates) else None,
+            "decisions": args.decisions or "stub",
+            "decision_count": grid.count,
+            "ignored_levels": grid.ignored_levels,
+            "sizing": args.sizing,
+            "cost_bps": args.cost_bps,
+            "hold_days": args.hold_days,
+        },
+        "results": report,
+        "timings": {k: round(v, 4) for k, v in timings.items()},
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Vectorized backtest of trading strategy decisions.")
+    parser.add_argument("--symbols", default=",".join(SYMBOLS), help="comma-separated tickers")
+    parser.add_argument("--universe", type=int, help="use this many synthetic tickers (SYN0000...) instead of --symbols")
+    parser.add_argument("--period", default="5y")
+    parser.add_argument("--fixture-dir", help="directory of <SYMBOL>.csv bars (default MARKET_DATA_FIXTURE_DIR)")
+    parser.add_argument("--decisions", help="recorded strategies as JSONL {symbol, date, strategy}")
+    parser.add_argument("--write-decisions", help="also write the decisions used to this JSONL file")
+    parser.add_argument("--every", type=int, default=5, help="stub: bars between decisions")
+    parser.add_argument("--stop-pct", type=float, default=8.0, help="stub: stop-loss distance (%%)")
+    parser.add_argument("--sizing", choices=("confidence", "unit"), default="confidence")
+    parser.add_argument("--cost-bps", type=float, default=5.0, help="transaction cost per unit of position traded")
+    parser.add_argument("--hold-days", type=int, help="close positions this many bars after the decision")
+    parser.add_argument("--per-symbol", action="store_true", help="include the per-symbol breakdown")
+    parser.add_argument("--output", help="write the JSON report here as well as to stdout")
+    args = parser.parse_args(argv)
+    if args.universe:
+        args.symbols = [f"SYN{i:04d}" for i in range(args.universe)]
+    else:
+        args.symbols = list(dict.fromkeys(s.strip().upper() for s in args.symbols.split(",") if s.strip()))
+    if not args.symbols:
+        parser.error("no symbols given")
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    report = run_backtest(args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Performance checks and benchmarks for the trading agents (run as python -m benchmarks.<name>)."""
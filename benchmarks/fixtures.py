@@ -0,0 +1,74 @@
+"""
+Offline market data and wiring helpers for benchmarks.
+The fixture provider (tools.market_data.FixtureProvider) serves deterministic
+data; LatencyProvider adds a fixed per-call delay to stand in for network time.
+"""
+import time
+from typing import Optional
+
+from tools.market_data import FixtureProvider, MarketDataProvider, set_provider
+
+# Symbols rotated through by the scenarios, so runs are not served by one cache entry
+SYMBOLS = (
+    "AAPL", "MSFT", "NVDA", "AMZN", "GOOGL", "META", "TSLA", "NFLX", "JPM", "XOM",
+    "UNH", "V", "PG", "KO", "PEP", "COST", "ORCL", "CRM", "AMD", "INTC",
+)
+
+
+class LatencyProvider(MarketDataProvider):
+    """Wraps a provider and sleeps latency_s in every call (runs in the facade's worker threads)."""
+
+    def __init__(self, inner: MarketDataProvider, latency_s: float = 0.0) -> None:
+        self._inner = inner
+        self._latency_s = latency_s
+        self.host = inner.host
+        self.calls = 0
+
+    def _delay(self) -> None:
+        self.calls += 1
+        if self._latency_s > 0:
+            time.sleep(self._latency_s)
+
+    def history(self, symbol: str, period: str):
+        self._delay()
+        return self._inner.history(symbol, period)
+
+    def bulk_history(self, symbols: list, period: str) -> dict:
+        self._delay()
+        return self._inner.bulk_history(symbols, period)
+
+    def info(self, symbol: str) -> dict:
+        self._delay()
+        return self._inner.info(symbol)
+
+    def earnings_dates(self, symbol: str):
+        self._delay()
+        return self._inner.earnings_dates(symbol)
+
+    def income_statement(self, symbol: str, quarterly: bool = False):
+        self._delay()
+        return self._inner.income_statement(symbol, quarterly)
+
+    def balance_sheet(self, symbol: str, quarterly: bool = False):
+        self._delay()
+        return self._inner.balance_sheet(symbol, quarterly)
+
+
+def install_fixture_provider(latency_s: float = 0.0, fixture_dir: Optional[str] = None) -> LatencyProvider:
+    """Route all market data through the fixture provider (clears cached history)."""
+    provider = LatencyProvider(FixtureProvider(fixture_dir=fixture_dir), latency_s)
+    set_provider(provider)
+    return provider
+
+
+def reset_caches() -> None:
+    """Drop cross-run caches so the next run starts cold (history, fundamentals and tool memo)."""
+    from tools.fundamentals_store import get_fundamentals_store
+    from tools.history_cache import get_history_cache
+    from tools.memo import clear_memo
+
+    get_history_cache().invalidate()
+    store = get_fundamentals_store()
+    if store is not None:
+        store.invalidate()
+    clear_memo()
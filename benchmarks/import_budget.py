@@ -0,0 +1,86 @@
+"""
+Import-time budget check.
+Imports each entry-point module in a fresh interpreter, takes the best of a few
+runs, and fails if a module exceeds its budget or drags in a heavy dependency
+(pandas, numpy, yfinance, the Azure client) that should only load on first use.
+
+Run: python -m benchmarks.import_budget [--runs 3] [--scale 1.0]
+Exit status is 1 when any budget is exceeded. The same check runs under pytest
+(tests/test_import_budget.py; IMPORT_BUDGET_SCALE loosens it on slow hosts).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Module -> import budget in milliseconds (best of --runs, on a warm disk cache)
+BUDGETS_MS = {
+    "tools": 150,
+    "schemas": 400,
+    "agents.orchestrator": 800,
+    "api.stream_server": 1500,
+}
+
+# Modules that must not be loaded by importing any entry point
+DEFERRED_MODULES = ("pandas", "numpy", "yfinance", "agent_framework.azure")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"ms": elapsed, "loaded": [m for m in {deferred!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module: str, runs: int) -> dict:
+    """Best import time over runs, plus any deferred modules that were loaded."""
+    best = None
+    loaded: list = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, deferred=DEFERRED_MODULES)],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        best = result["ms"] if best is None else min(best, result["ms"])
+        loaded = result["loaded"]
+    return {"ms": round(best, 1), "loaded": loaded}
+
+
+def check(module: str, runs: int = 3, scale: float = 1.0) -> dict:
+    """measure() plus the list of budget problems for module (empty when it passes)."""
+    result = measure(module, runs)
+    limit = BUDGETS_MS[module] * scale
+    problems = []
+    if result["ms"] > limit:
+        problems.append(f"over budget ({limit:.0f} ms)")
+    if result["loaded"]:
+        problems.append("loaded " + ", ".join(result["loaded"]))
+    result["problems"] = problems
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="fresh-interpreter runs per module")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget (slow CI hosts)")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in BUDGETS_MS:
+        result = check(module, args.runs, args.scale)
+        failed = failed or bool(result["problems"])
+        status = "FAIL " + "; ".join(result["problems"]) if result["problems"] else "ok"
+        print(f"{module:<24} {result['ms']:>8.1f} ms  {status}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,256 @@
+"""
+Offline benchmark suite for the orchestrator pipeline.
+Runs scenarios against the stub LLM client and fixture market data and prints
+(or writes) JSON with p50/p95/p99 latency, throughput and peak RSS per scenario.
+
+Scenarios:
+  single     technical query, one workflow at a time
+  both       full technical + fundamental + risk workflow
+  risk_only  risk query (deterministic risk engine)
+  batch      run_batch over --batch-size tickers
+  sse        --concurrency concurrent /stream requests through the ASGI app
+
+Run: python -m benchmarks.run [--scenarios single,both] [--iterations 20] [--output out.json]
+     python -m benchmarks.run --baseline previous.json --max-regression 0.2
+Exit status is 1 when a scenario's p95 regresses past --max-regression vs the baseline.
+"""
+import argparse
+import asyncio
+import json
+import resource
+import sys
+import time
+from typing import Callable, Dict, List
+
+from benchmarks.fixtures import SYMBOLS, install_fixture_provider, reset_caches
+from benchmarks.stub_client import TOOL_MODES, StubResponsesClient
+
+SCENARIOS = ("single", "both", "risk_only", "batch", "sse")
+
+QUERIES = {
+    "single": "technical outlook for {symbol}",
+    "both": "should I buy {symbol}? full analysis",
+    "risk_only": "what is the risk and volatility of {symbol}",
+}
+
+
+def latency_stats(samples: List[float]) -> dict:
+    """p50/p95/p99/mean/max in milliseconds for samples in seconds."""
+    if not samples:
+        return {"p50": None, "p95": None, "p99": None, "mean": None, "max": None}
+    ordered = sorted(samples)
+
+    def pct(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))] * 1000, 2)
+
+    return {
+        "p50": pct(0.50),
+        "p95": pct(0.95),
+        "p99": pct(0.99),
+        "mean": round(sum(ordered) / len(ordered) * 1000, 2),
+        "max": round(ordered[-1] * 1000, 2),
+    }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def make_client(args) -> StubResponsesClient:
+    return StubResponsesClient(latency_s=args.llm_latency, jitter=args.jitter, tool_mode=args.tool_mode, seed=args.seed)
+
+
+def make_orchestrator(client: StubResponsesClient):
+    from agents.orchestrator import OrchestratorAgent
+
+    orchestrator = OrchestratorAgent(client=client)
+    orchestrator.build_agents()
+    return orchestrator
+
+
+def _symbol(i: int) -> str:
+    return SYMBOLS[i % len(SYMBOLS)]
+
+
+async def _timed_workflows(args, query: str) -> dict:
+    client = make_client(args)
+    orchestrator = make_orchestrator(client)
+    samples, errors = [], 0
+    start = time.perf_counter()
+    for i in range(args.iterations):
+        if args.cold:
+            reset_caches()
+        t = time.perf_counter()
+        try:
+            await orchestrator.run_workflow(query.format(symbol=_symbol(i)), session_id=f"bench-{i}")
+        except Exception:
+            errors += 1
+        samples.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+    return {"samples": samples, "elapsed_s": elapsed, "ops": args.iterations, "errors": errors, "llm_calls": client.llm_calls()}
+
+
+async def scenario_single(args) -> dict:
+    return await _timed_workflows(args, QUERIES["single"])
+
+
+async def scenario_both(args) -> dict:
+    return await _timed_workflows(args, QUERIES["both"])
+
+
+async def scenario_risk_only(args) -> dict:
+    return await _timed_workflows(args, QUERIES["risk_only"])
+
+
+async def scenario_batch(args) -> dict:
+    """Latency samples are per batch; ops counts tickers."""
+    client = make_client(args)
+    orchestrator = make_orchestrator(client)
+    samples, per_ticker, errors = [], [], 0
+    start = time.perf_counter()
+    for i in range(args.iterations):
+        if args.cold:
+            reset_caches()
+        symbols = [_symbol(i * args.batch_size + j) for j in range(args.batch_size)]
+        t = time.perf_counter()
+        async for strategy in orchestrator.run_batch(symbols, max_concurrency=args.concurrency):
+            per_ticker.append(time.perf_counter() - t)
+            if strategy.rationale.startswith("Batch run failed"):
+                errors += 1
+        samples.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - start
+    return {
+        "samples": samples,
+        "elapsed_s": elapsed,
+        "ops": args.iterations * args.batch_size,
+        "errors": errors,
+        "llm_calls": client.llm_calls(),
+        "ticker_completion_ms": latency_stats(per_ticker),
+    }
+
+
+async def scenario_sse(args) -> dict:
+    """Concurrent /stream requests; latency is request start to the final strategy event."""
+    from api import stream_server
+    from api.orchestrator_pool import OrchestratorPool
+    from benchmarks.sse import stream_asgi
+
+    client = make_client(args)
+    stream_server.set_pool(OrchestratorPool(lambda: make_orchestrator(client)))
+    stream_server.get_orchestrator()
+    limit = asyncio.Semaphore(args.concurrency)
+
+    async def one(i: int):
+        async with limit:
+            return await stream_asgi(stream_server.app, QUERIES["both"].format(symbol=_symbol(i)), session_id=f"bench-{i}")
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(one(i) for i in range(args.iterations)))
+    elapsed = time.perf_counter() - start
+    first_event = [r.events[0][0] for r in results if r.events]
+    return {
+        "samples": [r.total_s for r in results if r.ok],
+        "elapsed_s": elapsed,
+        "ops": args.iterations,
+        "errors": sum(1 for r in results if not r.ok),
+        "llm_calls": client.llm_calls(),
+        "time_to_first_event_ms": latency_stats(first_event),
+    }
+
+
+RUNNERS: Dict[str, Callable] = {
+    "single": scenario_single,
+    "both": scenario_both,
+    "risk_only": scenario_risk_only,
+    "batch": scenario_batch,
+    "sse": scenario_sse,
+}
+
+
+async def run_suite(args) -> dict:
+    install_fixture_provider(latency_s=args.data_latency)
+    report = {
+        "config": {
+            "iterations": args.iterations,
+            "concurrency": args.concurrency,
+            "batch_size": args.batch_size,
+            "llm_latency_s": args.llm_latency,
+            "data_latency_s": args.data_latency,
+            "tool_mode": args.tool_mode,
+            "cold": args.cold,
+        },
+        "scenarios": {},
+    }
+    for name in args.scenarios:
+        reset_caches()
+        raw = await RUNNERS[name](args)
+        samples = raw.pop("samples")
+        elapsed = raw.pop("elapsed_s")
+        ops = raw.pop("ops")
+        report["scenarios"][name] = {
+            "latency_ms": latency_stats(samples),
+            "throughput_per_s": round(ops / elapsed, 2) if elapsed else None,
+            "ops": ops,
+            **raw,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+    report["peak_rss_mb"] = peak_rss_mb()
+    return report
+
+
+def compare(report: dict, baseline: dict, max_regression: float) -> List[str]:
+    """Scenarios whose p95 latency grew by more than max_regression (a fraction) vs baseline."""
+    regressions = []
+    for name, result in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name, {}).get("latency_ms", {}).get("p95")
+        after = result["latency_ms"]["p95"]
+        if before and after and after > before * (1 + max_regression):
+            regressions.append(f"{name}: p95 {before} ms -> {after} ms")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the orchestrator pipeline.")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset of " + ", ".join(SCENARIOS))
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent SSE streams / batch tickers in flight")
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="stub model latency per agent run (s)")
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--data-latency", type=float, default=0.0, help="added latency per market-data call (s)")
+    parser.add_argument("--tool-mode", choices=TOOL_MODES, default="missing")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--cold", action="store_true", help="clear history and tool caches before every iteration")
+    parser.add_argument("--output", help="write the JSON report here as well as to stdout")
+    parser.add_argument("--baseline", help="previous JSON report to compare p95 latencies against")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args(argv)
+    args.scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [s for s in args.scenarios if s not in RUNNERS]
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(unknown)}")
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(run_suite(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.max_regression)
+        for line in regressions:
+            print("REGRESSION " + line, file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+SSE clients for benchmarks: drive GET /stream in-process through the ASGI app
+(no network, accurate per-event timestamps) or against a running server over
+HTTP, recording when each event arrived.
+"""
+import asyncio
+import json
+import time
+from typing import List, Optional, Tuple
+from urllib.parse import urlencode
+
+
+class StreamResult:
+    """Outcome of one /stream request: HTTP status, timestamped events, total time."""
+
+    def __init__(self) -> None:
+        self.status: Optional[int] = None
+        self.events: List[Tuple[float, dict]] = []  # (seconds since request start, event)
+        self.total_s: float = 0.0
+        self.error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status == 200 and any(e.get("type") == "strategy" for _, e in self.events)
+
+    def first(self, event_type: str) -> Optional[float]:
+        """Seconds until the first event of event_type, or None if it never arrived."""
+        return next((t for t, e in self.events if e.get("type") == event_type), None)
+
+    def last(self, event_type: str) -> Optional[float]:
+        return next((t for t, e in reversed(self.events) if e.get("type") == event_type), None)
+
+
+class _SSEParser:
+    def __init__(self, result: StreamResult, start: float) -> None:
+        self._result = result
+        self._start = start
+        self._buffer = ""
+
+    def feed(self, chunk: str) -> None:
+        self._buffer += chunk
+        while "\n\n" in self._buffer:
+            block, self._buffer = self._buffer.split("\n\n", 1)
+            for line in block.splitlines():
+                if line.startswith("data: "):
+                    try:
+                        event = json.loads(line[6:])
+                    except ValueError:
+                        continue
+                    self._result.events.append((time.perf_counter() - self._start, event))
+                    if event.get("type") == "error" and self._result.error is None:
+                        self._result.error = event.get("message", "error event")
+
+
+async def stream_asgi(app, query: str, session_id: str = "bench") -> StreamResult:
+    """Run one /stream request through app (an ASGI callable) in this event loop."""
+    result = StreamResult()
+    start = time.perf_counter()
+    parser = _SSEParser(result, start)
+    finished = asyncio.Event()
+    request_sent = False
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": "/stream",
+        "raw_path": b"/stream",
+        "root_path": "",
+        "query_string": urlencode({"query": query, "session_id": session_id}).encode(),
+        "headers": [(b"host", b"bench"), (b"accept", b"text/event-stream")],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result.status = message["status"]
+        elif message["type"] == "http.response.body":
+            parser.feed(message.get("body", b"").decode("utf-8", "replace"))
+
+    try:
+        await app(scope, receive, send)
+    except Exception as e:
+        result.error = repr(e)[:200]
+    finally:
+        finished.set()
+    result.total_s = time.perf_counter() - start
+    if result.status not in (None, 200) and result.error is None:
+        result.error = f"HTTP {result.status}"
+    return result
+
+
+async def stream_http(client, base_url: str, query: str, session_id: str = "bench") -> StreamResult:
+    """Run one /stream request against a live server using an httpx.AsyncClient."""
+    result = StreamResult()
+    start = time.perf_counter()
+    parser = _SSEParser(result, start)
+    try:
+        async with client.stream("GET", f"{base_url.rstrip('/')}/stream", params={"query": query, "session_id": session_id}) as response:
+            result.status = response.status_code
+            if response.status_code != 200:
+                result.error = f"HTTP {response.status_code}"
+            else:
+                async for chunk in response.aiter_text():
+                    parser.feed(chunk)
+    except Exception as e:
+        result.error = repr(e)[:200]
+    result.total_s = time.perf_counter() - start
+    return result
@@ -0,0 +1,184 @@
+"""
+Concurrent load generator for the /stream SSE endpoint.
+Ramps the number of concurrent clients (closed loop: each client issues its
+next request as soon as the previous stream ends) and, per level, records time
+to the classification, first analyst_end and strategy events, events per second,
+throughput and errors. The levels together form the saturation curve.
+
+Transports:
+  asgi   in-process through api.stream_server:app (default; no sockets)
+  http   real HTTP: starts uvicorn on 127.0.0.1:--port in this process,
+         or targets --url (an already running server, stubbed or not)
+In-process runs use the stub LLM client and fixture market data.
+
+Run: python -m benchmarks.sse_load --levels 1,4,16,64 --duration 10 [--transport http] [--output curve.json]
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from typing import List, Optional
+
+from benchmarks.fixtures import SYMBOLS, install_fixture_provider
+from benchmarks.run import latency_stats, make_orchestrator, peak_rss_mb
+from benchmarks.sse import StreamResult, stream_asgi, stream_http
+from benchmarks.stub_client import TOOL_MODES, StubResponsesClient
+
+QUERY = "should I buy {symbol}? full analysis"
+MILESTONES = ("classification", "analyst_end", "strategy")
+
+
+def summarize(level: int, results: List[StreamResult], elapsed: float) -> dict:
+    """One point on the saturation curve."""
+    ok = [r for r in results if r.ok]
+    errors: dict = {}
+    for r in results:
+        if not r.ok:
+            key = r.error or "incomplete stream"
+            key = "HTTP 503" if "503" in key or "busy" in key.lower() else key.split("(")[0]
+            errors[key] = errors.get(key, 0) + 1
+    events = sum(len(r.events) for r in results)
+    return {
+        "concurrency": level,
+        "requests": len(results),
+        "completed": len(ok),
+        "errors": errors,
+        "throughput_per_s": round(len(ok) / elapsed, 2) if elapsed else None,
+        "events_per_s": round(events / elapsed, 1) if elapsed else None,
+        "time_to_ms": {
+            name: latency_stats([t for t in (r.first(name) for r in ok) if t is not None]) for name in MILESTONES
+        },
+    }
+
+
+async def run_level(request, level: int, duration: float, error_backoff: float = 0.5) -> dict:
+    """Keep level clients busy for duration seconds; a client backs off after an error (e.g. 503)."""
+    results: List[StreamResult] = []
+    deadline = time.perf_counter() + duration
+    counter = iter(range(10**9))
+
+    async def client(worker: int) -> None:
+        while time.perf_counter() < deadline:
+            i = next(counter)
+            result = await request(QUERY.format(symbol=SYMBOLS[i % len(SYMBOLS)]), f"load-{worker}-{i}")
+            results.append(result)
+            if not result.ok:
+                await asyncio.sleep(error_backoff)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(w) for w in range(level)))
+    return summarize(level, results, time.perf_counter() - start)
+
+
+def _install_stub_pool(args) -> None:
+    from api import stream_server
+    from api.orchestrator_pool import OrchestratorPool
+
+    install_fixture_provider(latency_s=args.data_latency)
+    client = StubResponsesClient(latency_s=args.llm_latency, jitter=args.jitter, tool_mode=args.tool_mode)
+    stream_server.set_pool(
+        OrchestratorPool(lambda: make_orchestrator(client), max_concurrent=args.max_concurrent, max_queue=args.max_queue)
+    )
+    stream_server.get_orchestrator()
+
+
+async def _start_uvicorn(app, port: int):
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    task = asyncio.ensure_future(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.05)
+    return server, task
+
+
+async def run_curve(args) -> dict:
+    from api import stream_server
+
+    server = server_task = http_client = None
+    base_url: Optional[str] = args.url
+    if base_url is None:
+        _install_stub_pool(args)
+    if args.transport == "asgi" and base_url is None:
+        async def request(query: str, session_id: str) -> StreamResult:
+            return await stream_asgi(stream_server.app, query, session_id)
+    else:
+        import httpx
+
+        if base_url is None:
+            server, server_task = await _start_uvicorn(stream_server.app, args.port)
+            base_url = f"http://127.0.0.1:{args.port}"
+        limits = httpx.Limits(max_connections=max(args.levels) * 2, max_keepalive_connections=max(args.levels))
+        http_client = httpx.AsyncClient(timeout=httpx.Timeout(args.timeout), limits=limits)
+
+        async def request(query: str, session_id: str) -> StreamResult:
+            return await stream_http(http_client, base_url, query, session_id)
+
+    curve = []
+    try:
+        for level in args.levels:
+            point = await run_level(request, level, args.duration, args.error_backoff)
+            point["peak_rss_mb"] = peak_rss_mb()
+            curve.append(point)
+            print(
+                f"c={level:<5} ok={point['completed']:<6} err={sum(point['errors'].values()):<5} "
+                f"rps={point['throughput_per_s']:<8} strategy p95={point['time_to_ms']['strategy']['p95']} ms",
+                file=sys.stderr,
+            )
+    finally:
+        if http_client is not None:
+            await http_client.aclose()
+        if server is not None:
+            server.should_exit = True
+            await server_task
+    return {
+        "config": {
+            "transport": "http" if args.url or args.transport == "http" else "asgi",
+            "url": args.url,
+            "duration_s": args.duration,
+            "llm_latency_s": args.llm_latency,
+            "data_latency_s": args.data_latency,
+            "max_concurrent": args.max_concurrent,
+            "max_queue": args.max_queue,
+        },
+        "curve": curve,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent SSE load generator for /stream.")
+    parser.add_argument("--levels", default="1,2,4,8,16,32,64", help="comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per level")
+    parser.add_argument("--transport", choices=("asgi", "http"), default="asgi")
+    parser.add_argument("--url", help="target a running server instead of an in-process stubbed app")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--error-backoff", type=float, default=0.5, help="seconds a client waits after a failed request")
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--data-latency", type=float, default=0.02)
+    parser.add_argument("--tool-mode", choices=TOOL_MODES, default="missing")
+    parser.add_argument("--max-concurrent", type=int, default=None, help="pool size (default ORCHESTRATOR_MAX_CONCURRENT)")
+    parser.add_argument("--max-queue", type=int, default=None, help="pool queue (default ORCHESTRATOR_MAX_QUEUE)")
+    parser.add_argument("--output", help="write the JSON curve here as well as to stdout")
+    args = parser.parse_args(argv)
+    args.levels = [int(x) for x in args.levels.split(",") if x.strip()]
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    report = asyncio.run(run_curve(args))
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
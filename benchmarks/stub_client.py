@@ -0,0 +1,162 @@
+"""
+Stub stand-in for AzureOpenAIResponsesClient, for offline benchmarks.
+Agents sleep for a configurable model latency (plus jitter), optionally call
+their registered tools the way a model would, and return well-formed structured
+output so the orchestrator runs its normal code paths end to end.
+"""
+import asyncio
+import inspect
+import random
+import re
+import zlib
+from typing import Callable, Dict, List, Optional
+
+from agents.fast_classifier import extract_tickers, fast_classify
+from schemas import AnalysisType, ClassifierOutput, SecuritiesTradingStrategy
+
+# Tool-calling behavior of analyst agents
+TOOL_MODES = ("none", "missing", "all")
+
+_PREFETCHED_MARKER = "Market data (prefetched"
+_SECURITY_RE = re.compile(r"Security/ticker: (\S+)")
+
+
+class StubResponse:
+    """Shape of an agent run result: .text and, for structured agents, .value."""
+
+    def __init__(self, text: str, value=None) -> None:
+        self.text = text
+        self.value = value
+
+
+class StubUpdate:
+    def __init__(self, text: str) -> None:
+        self.text = text
+
+
+class StubAgent:
+    """One agent created by StubResponsesClient.create_agent."""
+
+    def __init__(self, client: "StubResponsesClient", name: str, instructions: str = "", tools=None, response_format=None, **kwargs) -> None:
+        self._client = client
+        self.name = name
+        self.instructions = instructions
+        self.tools: List[Callable] = list(tools or [])
+        self.response_format = response_format
+        self.runs = 0
+
+    async def run(self, message: str) -> StubResponse:
+        self.runs += 1
+        await self._client.think(self.name)
+        if self.tools:
+            await self._call_tools(message)
+        text, value = self._respond(message)
+        return StubResponse(text, value if self.response_format is not None else None)
+
+    async def run_stream(self, message: str):
+        """Stream the response text in small chunks, spreading the model latency over them."""
+        self.runs += 1
+        text, _ = self._respond(message)
+        chunk = self._client.stream_chunk_chars
+        pieces = [text[i:i + chunk] for i in range(0, len(text), chunk)] or [""]
+        await self._client.think(self.name, fraction=0.3)
+        for piece in pieces:
+            await self._client.think(self.name, fraction=0.7 / len(pieces))
+            yield StubUpdate(piece)
+
+    async def _call_tools(self, message: str) -> None:
+        mode = self._client.tool_mode
+        if mode == "none" or (mode == "missing" and _PREFETCHED_MARKER in message):
+            return
+        match = _SECURITY_RE.search(message)
+        symbol = match.group(1) if match else "SPY"
+        calls = []
+        for tool in self.tools:
+            params = list(inspect.signature(tool).parameters)
+            if not params or params[0] != "symbol":
+                continue
+            result = tool(symbol)
+            if inspect.isawaitable(result):
+                calls.append(result)
+        if calls:
+            await asyncio.gather(*calls)
+
+    def _respond(self, message: str):
+        if self.response_format is ClassifierOutput or self.name == "Classifier":
+            output, _ = fast_classify(message)
+            if output is None:
+                tickers = extract_tickers(message)
+                output = ClassifierOutput(
+                    analysis_type=AnalysisType.BOTH,
+                    security=tickers[0] if tickers else None,
+                    raw_intent=" ".join(message.split())[:200],
+                )
+            return output.model_dump_json(), output
+        if self.response_format is SecuritiesTradingStrategy or self.name == "Synthesizer":
+            strategy = _stub_strategy(message)
+            return strategy.model_dump_json(), strategy
+        return f"{self.name} findings: " + " ".join(message.split())[: self._client.analyst_reply_chars], None
+
+
+def _stub_strategy(message: str) -> SecuritiesTradingStrategy:
+    digest = zlib.crc32(message.encode())
+    tickers = extract_tickers(message.split("\n", 1)[0])
+    return SecuritiesTradingStrategy(
+        security=tickers[0] if tickers else None,
+        direction=("BUY", "SELL", "HOLD")[digest % 3],
+        confidence=("LOW", "MEDIUM", "HIGH")[(digest // 3) % 3],
+        technical_summary="Stub technical summary.",
+        fundamental_summary="Stub fundamental summary.",
+        risk_assessment="Stub risk assessment.",
+        rationale="Stub rationale derived from the analysts' findings.",
+        conditions=["Stub condition"],
+        warnings=[],
+    )
+
+
+class StubResponsesClient:
+    """
+    Drop-in for AzureOpenAIResponsesClient.create_agent.
+
+    latency_s: model latency per agent run; latency_by_agent overrides it per agent name.
+    jitter: +/- fraction of latency applied uniformly at random (seeded).
+    tool_mode: "none", "missing" (only when the prompt lacks prefetched data) or "all".
+    """
+
+    def __init__(
+        self,
+        latency_s: float = 0.05,
+        latency_by_agent: Optional[Dict[str, float]] = None,
+        jitter: float = 0.2,
+        tool_mode: str = "missing",
+        seed: int = 7,
+        analyst_reply_chars: int = 600,
+        stream_chunk_chars: int = 16,
+    ) -> None:
+        if tool_mode not in TOOL_MODES:
+            raise ValueError(f"tool_mode must be one of {TOOL_MODES}")
+        self.latency_s = latency_s
+        self.latency_by_agent = dict(latency_by_agent or {})
+        self.jitter = jitter
+        self.tool_mode = tool_mode
+        self.analyst_reply_chars = analyst_reply_chars
+        self.stream_chunk_chars = stream_chunk_chars
+        self._random = random.Random(seed)
+        self.agents: List[StubAgent] = []
+
+    def create_agent(self, name: str, instructions: str = "", tools=None, response_format=None, **kwargs) -> StubAgent:
+        agent = StubAgent(self, name, instructions, tools=tools, response_format=response_format, **kwargs)
+        self.agents.append(agent)
+        return agent
+
+    async def think(self, agent_name: str, fraction: float = 1.0) -> None:
+        base = self.latency_by_agent.get(agent_name, self.latency_s) * fraction
+        if base <= 0:
+            return
+        await asyncio.sleep(base * (1 + self._random.uniform(-self.jitter, self.jitter)))
+
+    def llm_calls(self) -> Dict[str, int]:
+        calls: Dict[str, int] = {}
+        for agent in self.agents:
+            calls[agent.name] = calls.get(agent.name, 0) + agent.runs
+        return calls
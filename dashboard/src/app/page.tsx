@@ -17,12 +17,27 @@ export default function CommandCenterPage() {
   const { strategy, riskScore } = useMemo(() => {
     let s: SecuritiesTradingStrategy | null = null;
     let r: number | null = null;
+    let draft: Partial<SecuritiesTradingStrategy> = {};
     for (let i = events.length - 1; i >= 0; i--) {
       const e = events[i];
       if (e.type === "strategy") s = e.payload;
+      if (e.type === "strategy_partial" && s == null) draft = { ...e.payload, ...draft };
       if (e.type === "risk_score") r = e.score;
       if (s != null && r != null) break;
     }
+    // Show the streamed draft until the validated strategy arrives.
+    if (s == null && draft.direction && draft.confidence) {
+      s = {
+        security: null,
+        technical_summary: "",
+        fundamental_summary: "",
+        risk_assessment: "",
+        rationale: "",
+        conditions: [],
+        warnings: [],
+        ...draft,
+      } as SecuritiesTradingStrategy;
+    }
     return { strategy: s, riskScore: r };
   }, [events]);
 
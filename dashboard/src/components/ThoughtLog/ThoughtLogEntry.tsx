@@ -1,6 +1,6 @@
 "use client";
 
-import type { ThoughtEvent } from "@/types/streaming";
+import type { SpanTiming, ThoughtEvent } from "@/types/streaming";
 import { clsx } from "clsx";
 
 const AGENT_COLORS: Record<string, string> = {
@@ -40,12 +40,29 @@ function getMessage(e: ThoughtEvent): { title: string; detail?: string } {
         title: toolCallToLabel(e.tool, e.args),
         detail: Object.keys(e.args).length ? JSON.stringify(e.args).slice(0, 80) : undefined,
       };
-    case "tool_result":
-      return { title: `${e.tool} result`, detail: e.result.slice(0, 120) + (e.result.length > 120 ? "…" : "") };
+    case "tool_result": {
+      const result = e.result ?? e.error ?? "";
+      return {
+        title: `${e.tool} result${timing(e)}`,
+        detail: result.slice(0, 120) + (result.length > 120 ? "…" : ""),
+      };
+    }
     case "analyst_end":
-      return { title: "Done", detail: e.summary.slice(0, 80) + "..." };
+      return { title: `Done${timing(e)}`, detail: e.summary.slice(0, 80) + "..." };
+    case "stage_start":
+      return { title: `Stage: ${e.stage}` };
+    case "stage_end":
+      return { title: `Stage: ${e.stage} done${timing(e)}`, detail: e.source ? `via ${e.source}` : undefined };
+    case "llm_start":
+      return { title: `LLM call${e.model ? ` (${e.model})` : ""}` };
+    case "llm_end":
+      return { title: `LLM done${timing(e)}`, detail: e.queued_ms ? `queued ${e.queued_ms} ms` : undefined };
+    case "error":
+      return { title: "Error", detail: e.message };
     case "risk_score":
       return { title: `Risk score: ${e.score} (${e.label})` };
+    case "strategy_partial":
+      return { title: `Drafting: ${Object.keys(e.payload).join(", ")}` };
     case "strategy":
       return { title: `Strategy: ${e.payload.direction}`, detail: e.payload.rationale.slice(0, 80) + "..." };
     default:
@@ -53,6 +70,11 @@ function getMessage(e: ThoughtEvent): { title: string; detail?: string } {
   }
 }
 
+function timing(e: SpanTiming): string {
+  if (e.wall_ms == null) return "";
+  return ` · ${Math.round(e.wall_ms)} ms${e.cache_hit ? " (cached)" : ""}`;
+}
+
 function toolCallToLabel(tool: string, args: Record<string, unknown>): string {
   const sym = (args.symbol as string) || "";
   const labels: Record<string, string> = {
@@ -4,6 +4,17 @@ import { useCallback, useEffect, useState } from "react";
 import type { ThoughtEvent, SystemHealth } from "@/types/streaming";
 
 const API_BASE = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
+const SESSION_KEY = "thoughtStreamSessionId";
+
+/** Per-tab session id so each dashboard tab has its own conversation memory on the server. */
+function getSessionId(): string {
+  let id = sessionStorage.getItem(SESSION_KEY);
+  if (!id) {
+    id = crypto.randomUUID();
+    sessionStorage.setItem(SESSION_KEY, id);
+  }
+  return id;
+}
 
 export function useThoughtStream() {
   const [events, setEvents] = useState<ThoughtEvent[]>([]);
@@ -45,7 +56,8 @@ export function useThoughtStream() {
       setIsStreaming(true);
       setError(null);
       try {
-        const res = await fetch(`${API_BASE}/stream?query=${encodeURIComponent(query)}`, {
+        const params = new URLSearchParams({ query, session_id: getSessionId() });
+        const res = await fetch(`${API_BASE}/stream?${params}`, {
           headers: { Accept: "text/event-stream" },
         });
         if (!res.ok || !res.body) throw new Error(res.statusText || "Stream failed");
@@ -25,15 +25,31 @@ export interface SecuritiesTradingStrategy {
   warnings: string[];
 }
 
+/** Timing fields carried by *_end / tool_result events. */
+export interface SpanTiming {
+  wall_ms?: number;
+  bytes?: number;
+  cache_hit?: boolean;
+  error?: string;
+}
+
+export type StageName = "classification" | "market_data" | "synthesis";
+
 export type ThoughtEvent =
   | { type: "classification"; payload: ClassifierPayload }
+  | { type: "stage_start"; agent: AgentId; stage: StageName }
+  | ({ type: "stage_end"; agent: AgentId; stage: StageName; source?: string } & SpanTiming)
   | { type: "analyst_start"; agent: AgentId; instruction: string }
   | { type: "thought"; agent: AgentId; step: string; payload?: unknown }
+  | { type: "llm_start"; agent: AgentId; model: string | null; prompt_bytes: number }
+  | ({ type: "llm_end"; agent: AgentId; model: string | null; prompt_bytes: number; queued_ms?: number } & SpanTiming)
   | { type: "tool_call"; agent: AgentId; tool: string; args: Record<string, unknown> }
-  | { type: "tool_result"; agent: AgentId; tool: string; result: string }
-  | { type: "analyst_end"; agent: AgentId; summary: string }
+  | ({ type: "tool_result"; agent: AgentId; tool: string; result?: string } & SpanTiming)
+  | ({ type: "analyst_end"; agent: AgentId; summary: string } & SpanTiming)
   | { type: "strategy"; payload: SecuritiesTradingStrategy }
-  | { type: "risk_score"; score: number; label: string };
+  | { type: "strategy_partial"; payload: Partial<SecuritiesTradingStrategy> }
+  | { type: "risk_score"; score: number; label: string }
+  | { type: "error"; message: string };
 
 export interface AgentStatus {
   id: AgentId;
@@ -18,7 +18,7 @@ from config import (
     AZURE_OPENAI_DEPLOYMENT,
 )
 from agents.orchestrator import OrchestratorAgent
-from schemas import SecuritiesTradingStrategy
+from schemas import AnalysisType, SecuritiesTradingStrategy
 
 load_dotenv()
 
@@ -59,11 +59,30 @@ def print_strategy(strategy: SecuritiesTradingStrategy) -> None:
     print("=" * 60)
 
 
+async def run_batch(orchestrator: OrchestratorAgent, symbols: list[str]) -> None:
+    """Portfolio batch mode: stream one strategy per ticker as each completes."""
+    analysis_type = AnalysisType(os.getenv("TRADING_ANALYSIS_TYPE", AnalysisType.BOTH.value))
+    print(f"Batch: {len(symbols)} securities, analysis_type={analysis_type.value}")
+    results = []
+    async for strategy in orchestrator.run_batch(symbols, analysis_type):
+        print(f"{strategy.security or 'N/A':<8} {strategy.direction:<5} {strategy.confidence}")
+        results.append(strategy.model_dump())
+
+    print("\nStructured output (JSON):")
+    print(json.dumps(results, indent=2))
+
+
 async def main():
     # Initialize the multi-agent team via the central Orchestrator
     client = create_responses_client()
     orchestrator = OrchestratorAgent(client=client)
 
+    # Batch mode: TRADING_BATCH="AAPL,MSFT,NVDA" (skips classification)
+    batch = os.getenv("TRADING_BATCH", "")
+    if batch:
+        await run_batch(orchestrator, [s for s in batch.split(",") if s.strip()])
+        return
+
     # Example user objective (can be replaced with CLI/API input)
     user_query = os.getenv(
         "TRADING_QUERY",
@@ -22,13 +22,44 @@ class ClassifierOutput(BaseModel):
     raw_intent: str = Field(description="One-line summary of user intent")
 
 
+class MarketDataBundle(BaseModel):
+    """Market data prefetched by the Orchestrator so analysts can answer in a single model turn."""
+    security: str = Field(description="Ticker the data belongs to")
+    price_summary: Optional[str] = None
+    price_history: Optional[str] = None
+    moving_averages: Optional[str] = None
+    volume: Optional[str] = None
+    earnings: Optional[str] = None
+    income_statement: Optional[str] = None
+    balance_sheet: Optional[str] = None
+    macro: list[str] = Field(default_factory=list, description="Macro indicator readings")
+
+    def subset(self, fields: list[str]) -> "MarketDataBundle":
+        """Copy keeping only the named data fields (security is always kept)."""
+        keep = set(fields) | {"security"}
+        return MarketDataBundle(**{k: v for k, v in self.model_dump().items() if k in keep})
+
+    def compact(self) -> str:
+        """Text form for the analyst prompt; omits missing fields."""
+        lines = []
+        for name, value in self.model_dump(exclude={"security"}).items():
+            if not value:
+                continue
+            label = name.replace("_", " ").capitalize()
+            text = "; ".join(value) if isinstance(value, list) else value
+            lines.append(f"[{label}]\n{text}")
+        return "\n".join(lines)
+
+
 class AnalystContext(BaseModel):
     """Context passed from Orchestrator to domain agents to avoid redundant tool calls."""
     security: Optional[str] = None
     sector: Optional[str] = None
     time_horizon: Optional[str] = None
     shared_facts: list[str] = Field(default_factory=list, description="Facts already gathered to reuse")
+    market_data: Optional[MarketDataBundle] = Field(default=None, description="Prefetched market data for this analyst")
     orchestrator_instruction: str = Field(description="Specific task for this analyst")
+    user_query: Optional[str] = Field(default=None, description="The user's query verbatim, for analysts that read details from it")
 
 
 class SecuritiesTradingStrategy(BaseModel):
@@ -42,3 +73,108 @@ class SecuritiesTradingStrategy(BaseModel):
     rationale: str = Field(description="Combined rationale for the strategy")
     conditions: list[str] = Field(default_factory=list, description="Conditions under which strategy holds")
     warnings: list[str] = Field(default_factory=list, description="Risk warnings and caveats")
+
+
+class RiskReport(BaseModel):
+    """Deterministic risk metrics for one security, computed without the LLM."""
+    security: str = Field(description="Ticker evaluated")
+    volatility_period: str = Field(description="History window for volatility, e.g. 1mo")
+    annualized_volatility_pct: Optional[float] = Field(default=None, description="Annualized volatility %")
+    max_volatility_pct: float = Field(description="Volatility limit %")
+    volatility_within_limit: Optional[bool] = Field(default=None, description="None when volatility is unavailable")
+    drawdown_period: str = Field(description="History window for drawdown, e.g. 3mo")
+    max_drawdown_pct: Optional[float] = Field(default=None, description="Worst peak-to-trough decline % (negative)")
+    proposed_position_pct: float = Field(description="Proposed position size as % of portfolio")
+    max_position_pct: float = Field(description="Position size limit %")
+    position_compliant: bool = Field(description="Proposed position within limit")
+    breaches: list[str] = Field(default_factory=list, description="Limit breaches and data gaps")
+    acceptable: bool = Field(description="True when volatility is known and within limit and the position complies")
+
+    def summary(self) -> str:
+        """One-paragraph text form for the synthesizer and the Reasoning Trace."""
+        parts = [f"Risk report for {self.security}:"]
+        if self.annualized_volatility_pct is None:
+            parts.append(f"annualized volatility ({self.volatility_period}) unavailable;")
+        else:
+            within = "WITHIN" if self.volatility_within_limit else "EXCEEDS"
+            parts.append(
+                f"annualized volatility ({self.volatility_period}) ≈ {self.annualized_volatility_pct:.1f}% "
+                f"vs limit {self.max_volatility_pct}% ({within} limit);"
+            )
+        if self.max_drawdown_pct is None:
+            parts.append(f"max drawdown ({self.drawdown_period}) unavailable;")
+        else:
+            parts.append(f"max drawdown ({self.drawdown_period}) = {self.max_drawdown_pct:.1f}%;")
+        parts.append(
+            f"proposed position {self.proposed_position_pct}% vs max {self.max_position_pct}% "
+            f"({'compliant' if self.position_compliant else 'NOT compliant'})."
+        )
+        parts.append("Overall: " + ("ACCEPTABLE." if self.acceptable else "NOT ACCEPTABLE."))
+        if self.breaches:
+            parts.append("Breaches: " + "; ".join(self.breaches) + ".")
+        return " ".join(parts)
+
+
+class PositionRisk(BaseModel):
+    """One holding's weight and share of portfolio risk."""
+    security: str
+    weight_pct: float = Field(description="Position as % of portfolio value (negative for shorts)")
+    marginal_volatility_pct: float = Field(description="Change in annualized portfolio volatility per unit of weight, %")
+    risk_contribution_pct: float = Field(description="Share of portfolio volatility from this position, %")
+
+
+class PortfolioRiskReport(BaseModel):
+    """Deterministic portfolio-level risk across holdings, computed without the LLM."""
+    period: str = Field(description="History window for returns, e.g. 1y")
+    observations: int = Field(default=0, description="Daily returns used")
+    confidence_pct: float = Field(description="VaR/CVaR confidence level, e.g. 95")
+    horizon_days: int = Field(description="VaR/CVaR horizon in trading days")
+    gross_exposure_pct: float = Field(description="Sum of absolute weights %")
+    net_exposure_pct: float = Field(description="Sum of signed weights %")
+    annualized_volatility_pct: Optional[float] = Field(default=None, description="Annualized portfolio volatility %")
+    max_volatility_pct: float = Field(description="Volatility limit %")
+    historical_var_pct: Optional[float] = Field(default=None, description="Historical VaR, loss % of portfolio value")
+    historical_cvar_pct: Optional[float] = Field(default=None, description="Historical CVaR (expected shortfall) %")
+    parametric_var_pct: Optional[float] = Field(default=None, description="Normal VaR %")
+    parametric_cvar_pct: Optional[float] = Field(default=None, description="Normal CVaR %")
+    max_var_pct: float = Field(description="VaR limit %")
+    max_weight_pct: float = Field(description="Largest absolute position %")
+    max_position_pct: float = Field(description="Position size limit %")
+    max_risk_contribution_pct: float = Field(description="Limit on one position's share of portfolio volatility %")
+    herfindahl_index: float = Field(description="Concentration of absolute weights (1 = single position)")
+    effective_positions: float = Field(description="1 / Herfindahl index")
+    positions: list[PositionRisk] = Field(default_factory=list, description="Per-position risk, largest contribution first")
+    missing: list[str] = Field(default_factory=list, description="Holdings without price history (excluded)")
+    breaches: list[str] = Field(default_factory=list, description="Limit breaches and data gaps")
+    acceptable: bool = Field(description="True when risk metrics are known and no limit is breached")
+
+    def summary(self, top: int = 5) -> str:
+        """Short text form for the risk analyst and the Reasoning Trace."""
+        parts = [
+            f"Portfolio risk ({len(self.positions)} positions, gross {self.gross_exposure_pct:.1f}%, "
+            f"net {self.net_exposure_pct:.1f}%, {self.period}, {self.observations} daily returns):"
+        ]
+        if self.annualized_volatility_pct is None:
+            parts.append("risk metrics unavailable;")
+        else:
+            h = f"{self.horizon_days}d {self.confidence_pct:g}%"
+            parts.append(
+                f"annualized volatility {self.annualized_volatility_pct:.1f}% vs limit {self.max_volatility_pct}%;"
+                f" {h} VaR historical {self.historical_var_pct:.2f}% / parametric {self.parametric_var_pct:.2f}%"
+                f" (limit {self.max_var_pct}%); CVaR historical {self.historical_cvar_pct:.2f}%"
+                f" / parametric {self.parametric_cvar_pct:.2f}%;"
+            )
+        parts.append(
+            f"largest position {self.max_weight_pct:.1f}% vs max {self.max_position_pct}%,"
+            f" effective positions {self.effective_positions:.1f} (HHI {self.herfindahl_index:.3f})."
+        )
+        if self.positions:
+            parts.append(
+                "Top risk contributors: "
+                + ", ".join(f"{p.security} {p.risk_contribution_pct:.1f}% of risk at {p.weight_pct:.1f}% weight" for p in self.positions[:top])
+                + "."
+            )
+        parts.append("Overall: " + ("ACCEPTABLE." if self.acceptable else "NOT ACCEPTABLE."))
+        if self.breaches:
+            parts.append("Breaches: " + "; ".join(self.breaches) + ".")
+        return " ".join(parts)
@@ -0,0 +1,58 @@
+"""Shared fixtures: route market data through the offline FixtureProvider with cold caches."""
+from collections import Counter
+
+import pytest
+
+from tools import market_data
+from tools.market_data import FixtureProvider, set_provider
+
+
+class CountingProvider(FixtureProvider):
+    """FixtureProvider that counts upstream calls by method."""
+
+    def __init__(self) -> None:
+        super().__init__(fixture_dir="")
+        self.calls = Counter()
+
+    def history(self, symbol, period):
+        self.calls["history"] += 1
+        return super().history(symbol, period)
+
+    def bulk_history(self, symbols, period):
+        self.calls["bulk_history"] += 1
+        return {s: super(CountingProvider, self).history(s, period) for s in symbols}
+
+    def info(self, symbol):
+        self.calls["info"] += 1
+        return super().info(symbol)
+
+    def earnings_dates(self, symbol):
+        self.calls["earnings_dates"] += 1
+        return super().earnings_dates(symbol)
+
+    def income_statement(self, symbol, quarterly=False):
+        self.calls["income_statement"] += 1
+        return super().income_statement(symbol, quarterly)
+
+    def balance_sheet(self, symbol, quarterly=False):
+        self.calls["balance_sheet"] += 1
+        return super().balance_sheet(symbol, quarterly)
+
+
+@pytest.fixture
+def fixture_market(tmp_path, monkeypatch):
+    """A CountingProvider behind the shared facade, with empty caches and a temporary fundamentals store."""
+    from tools import fundamentals_store
+    from tools.fundamentals_store import FundamentalsStore, set_fundamentals_store
+    from tools.memo import clear_memo
+
+    monkeypatch.setenv("FUNDAMENTALS_STORE", "1")
+    previous, previous_store = market_data._provider, fundamentals_store._store
+    provider = CountingProvider()
+    set_provider(provider)
+    set_fundamentals_store(FundamentalsStore(str(tmp_path / "fundamentals.sqlite")))
+    clear_memo()
+    yield provider
+    set_provider(previous)
+    set_fundamentals_store(previous_store)
+    clear_memo()
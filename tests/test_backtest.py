@@ -0,0 +1,119 @@
+"""Backtest engine: stop/target parsing, exits, trade P&L attribution and replay of recorded decisions."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtest.engine import (
+    DecisionGrid,
+    decisions_from_records,
+    grid_to_records,
+    load_bars,
+    parse_levels,
+    simulate,
+    stub_decisions,
+    summarize,
+)
+
+
+@pytest.mark.parametrize("conditions, direction, expected", [
+    (["Stop loss at 182.5", "Take profit at $210"], 1.0, (182.5, 210.0, 0)),
+    (["stop 5% below entry", "target 10% above"], 1.0, (190.0, 220.0, 0)),
+    (["stop-loss to $190 if earnings miss"], 1.0, (190.0, np.nan, 0)),
+    (["Stop at 210", "take profit at 180"], -1.0, (210.0, 180.0, 0)),
+    (["stop 5%", "target 10%"], -1.0, (210.0, 180.0, 0)),
+])
+def test_parse_levels(conditions, direction, expected):
+    stop, target, ignored = parse_levels(conditions, 200.0, direction)
+    np.testing.assert_allclose([stop, target], expected[:2])
+    assert ignored == expected[2]
+
+
+@pytest.mark.parametrize("conditions, ignored", [
+    (["stop loss within 3 days", "price target 2026"], 2),  # bare numbers are not levels
+    (["Stop loss at 210"], 1),  # a long's stop above entry
+    (["take profit at $150"], 1),  # a long's target below entry
+    (["stop at 120%"], 1),  # a non-positive price
+])
+def test_rejected_levels_are_counted(conditions, ignored):
+    stop, target, count = parse_levels(conditions, 200.0, 1.0)
+    assert np.isnan(stop) and np.isnan(target)
+    assert count == ignored
+
+
+def test_first_valid_level_wins():
+    stop, target, ignored = parse_levels(["stop at 205", "stop at 190", "stop at 180"], 200.0, 1.0)
+    assert (stop, ignored) == (190.0, 1)
+
+
+def test_hold_keeps_levels_without_a_side():
+    assert parse_levels(["stop at 210", "target at 190"], 200.0, 0.0)[:2] == (210.0, 190.0)
+
+
+def one_symbol(closes, decisions):
+    closes = np.array([closes], dtype=float)
+    grid = DecisionGrid(closes.shape)
+    for col, (direction, stop, target) in decisions.items():
+        grid.direction[0, col], grid.size[0, col] = direction, 1.0
+        grid.stop[0, col], grid.target[0, col] = stop, target
+    return closes, grid
+
+
+def test_stop_closes_the_position_at_the_touching_bar():
+    closes, grid = one_symbol([100, 101, 95, 90, 80], {0: (1.0, 96.0, np.nan)})
+    sim = simulate(closes, grid, cost_bps=0)
+    np.testing.assert_array_equal(sim["position"][0], [1, 1, 0, 0, 0])
+    # Earned from bar 0 to 2 (the exit close), nothing after.
+    assert np.prod(1 + sim["pnl"][0]) - 1 == pytest.approx(95 / 100 - 1)
+
+
+def test_position_earns_the_next_bar_only():
+    closes, grid = one_symbol([100, 110, 121], {1: (1.0, np.nan, np.nan)})
+    sim = simulate(closes, grid, cost_bps=0)
+    np.testing.assert_allclose(sim["gross"][0], [0.0, 0.0, 0.1])
+
+
+def test_each_trade_pays_its_own_entry_cost():
+    # Long from bar 0 earns 1.5% on bar 2, where it reverses to a short that earns nothing.
+    closes, grid = one_symbol([100, 100, 101.5, 101.5, 101.5], {0: (1.0, np.nan, np.nan), 2: (-1.0, np.nan, np.nan)})
+    sim = simulate(closes, grid, cost_bps=100)  # 1% per unit traded
+    costs = sim["gross"] - sim["pnl"]
+    np.testing.assert_allclose(costs[0], [0.01, 0.0, 0.02, 0.0, 0.0])
+    report = summarize(sim, ["X"])
+    # Long: +1.5% - 1% entry wins; short: -2% reversal entry loses. Charging the
+    # reversal to the long instead would make both trades lose.
+    assert report["trades"] == 2
+    assert report["hit_rate_pct"] == 50.0
+
+
+def test_stub_backtest_over_fixture_bars():
+    symbols, dates, closes = load_bars(["AAPL", "MSFT", "XOM"], "2y", fixture_dir="")
+    sim = simulate(closes, stub_decisions(closes), cost_bps=10)
+    report = summarize(sim, symbols)
+    assert report["symbols"] == 3 and report["days"] == closes.shape[1]
+    assert report["trades"] > 0
+    assert 0 <= report["hit_rate_pct"] <= 100
+    assert report["total_return_pct"] == pytest.approx((np.prod(1 + sim["pnl"].mean(axis=0)) - 1) * 100, abs=1e-4)
+
+
+def test_recorded_decisions_replay_the_stub():
+    symbols, dates, closes = load_bars(["AAPL", "MSFT", "XOM"], "2y", fixture_dir="")
+    stub = stub_decisions(closes, stop_pct=8.0)
+    replay = decisions_from_records(grid_to_records(stub, symbols, dates), symbols, dates, closes)
+    assert replay.count == stub.count
+    assert replay.ignored_levels == 0
+    np.testing.assert_allclose(replay.stop, stub.stop, atol=0.005, equal_nan=True)
+    a, b = summarize(simulate(closes, stub), symbols), summarize(simulate(closes, replay), symbols)
+    assert a["total_return_pct"] == pytest.approx(b["total_return_pct"], abs=1e-3)
+
+
+def test_records_with_bad_levels_are_counted():
+    symbols, dates, closes = load_bars(["AAPL"], "1y", fixture_dir="")
+    day = str(pd.Timestamp(dates[100]).date())
+    records = [
+        {"symbol": "AAPL", "date": day, "strategy": {"direction": "BUY", "confidence": "HIGH", "conditions": ["stop loss within 3 days"]}},
+        {"symbol": "aapl", "date": day, "strategy": {"direction": "SELL", "conditions": ["stop at 1", "target at 100000"]}},
+        {"symbol": "UNKNOWN", "date": day, "strategy": {"direction": "BUY", "conditions": ["stop at 1"]}},
+    ]
+    grid = decisions_from_records(records, symbols, dates, closes)
+    assert grid.count == 1
+    assert grid.ignored_levels == 3
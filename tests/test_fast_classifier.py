@@ -0,0 +1,58 @@
+"""Rule-based fast classifier: ticker extraction, analysis path and confidence."""
+import pytest
+
+from agents.fast_classifier import extract_tickers, fast_classify, normalize_query
+from schemas import AnalysisType
+
+
+@pytest.mark.parametrize("query, tickers", [
+    ("Technical outlook for AAPL", ["AAPL"]),
+    ("compare $msft and $nvda", ["MSFT", "NVDA"]),
+    ("Is BRK.B a BUY for the USA market?", ["BRK.B"]),
+    ("should I buy apple or tesla", ["AAPL", "TSLA"]),
+    ("What is the RSI and MACD on AAPL AAPL", ["AAPL"]),
+    ("what is the market doing", []),
+])
+def test_extract_tickers(query, tickers):
+    assert extract_tickers(query) == tickers
+
+
+@pytest.mark.parametrize("query, analysis_type", [
+    ("Technical outlook for AAPL: support and resistance", AnalysisType.TECHNICAL),
+    ("How do MSFT earnings and revenue look?", AnalysisType.FUNDAMENTAL),
+    ("What is the drawdown and volatility of NVDA?", AnalysisType.RISK_ONLY),
+    ("Should I buy TSLA?", AnalysisType.BOTH),
+    ("Chart and valuation for META", AnalysisType.BOTH),
+])
+def test_single_ticker_keyword_queries_are_confident(query, analysis_type):
+    output, confidence = fast_classify(query)
+    assert output.analysis_type == analysis_type
+    assert confidence == 0.9
+
+
+def test_fields_are_filled_from_the_query():
+    output, _ = fast_classify("Long-term   fundamental view on $JPM in financials")
+    assert output.security == "JPM"
+    assert output.sector == "financials"
+    assert output.time_horizon == "long_term"
+    assert output.raw_intent == "Long-term fundamental view on $JPM in financials"
+
+
+@pytest.mark.parametrize("query", [
+    "technical outlook for AAPL and MSFT",  # two tickers
+    "technical outlook for the market",  # no ticker
+    "volatility and momentum of AAPL",  # risk mixed with one analysis path
+])
+def test_ambiguous_queries_fall_below_the_llm_threshold(query):
+    output, confidence = fast_classify(query)
+    assert output is not None
+    assert confidence <= 0.5
+
+
+@pytest.mark.parametrize("query", ["", "   ", "hello there AAPL"])
+def test_undecidable_queries_return_none(query):
+    assert fast_classify(query) == (None, 0.0)
+
+
+def test_normalize_query():
+    assert normalize_query("  Should I   BUY Apple?! ") == "should i buy apple"
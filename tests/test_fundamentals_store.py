@@ -0,0 +1,80 @@
+"""FundamentalsStore: frames round-trip by column type; an unusable store falls back to the provider."""
+import asyncio
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools import fundamentals_store
+from tools.fundamentals_store import FundamentalsStore, _decode_frame, _encode_frame
+from tools.market_data import AsyncMarketData, FixtureProvider
+
+
+@pytest.fixture
+def provider():
+    return FixtureProvider(fixture_dir="")
+
+
+def test_mixed_type_frame_round_trips():
+    index = pd.DatetimeIndex(["2024-10-24 16:00", "2024-07-25 16:00"], tz="America/New_York", name="Earnings Date")
+    frame = pd.DataFrame(
+        {
+            "EPS Estimate": [1.5, np.nan],
+            "Surprise(%)": ["3.1", None],
+            "Event": ["Earnings", "Meeting"],
+            "Filed": pd.to_datetime(["2024-11-01", None]),
+        },
+        index=index,
+    )
+    decoded = _decode_frame(_encode_frame(frame))
+    assert list(decoded.columns) == list(frame.columns)
+    pd.testing.assert_index_equal(decoded.index, frame.index)
+    assert decoded["EPS Estimate"].iloc[0] == 1.5 and np.isnan(decoded["EPS Estimate"].iloc[1])
+    assert decoded["Surprise(%)"].tolist()[0] == 3.1
+    assert decoded["Event"].tolist() == ["Earnings", "Meeting"]
+    assert decoded["Filed"].iloc[0] == pd.Timestamp("2024-11-01") and pd.isna(decoded["Filed"].iloc[1])
+
+
+def test_statement_is_served_until_its_next_period_is_due(tmp_path, provider):
+    store = FundamentalsStore(str(tmp_path / "store.sqlite"))
+    statement = provider.income_statement("AAPL")
+    period_end = max(statement.columns)
+    now = period_end.timestamp() + 10 * 86400
+    store.put("fixture", "aapl", "income_yearly", statement, now=now)
+    served = store.get("fixture", "AAPL", "income_yearly", now=now + 86400)
+    pd.testing.assert_frame_equal(served, statement, check_freq=False)
+    assert store.get("fixture", "AAPL", "income_yearly", now=now + 500 * 86400) is None
+    assert store.periods("fixture", "AAPL", "income_yearly") == [period_end.date().isoformat()]
+
+
+def test_unopenable_store_falls_back_to_the_provider(tmp_path, monkeypatch, provider):
+    blocker = tmp_path / "file"
+    blocker.write_text("not a directory")
+    monkeypatch.setenv("FUNDAMENTALS_STORE", "1")
+    monkeypatch.setenv("FUNDAMENTALS_STORE_PATH", str(blocker / "store.sqlite"))
+    monkeypatch.setattr(fundamentals_store, "_store", None)
+    monkeypatch.setattr(fundamentals_store, "_open_errors", 0)
+    monkeypatch.setattr(fundamentals_store, "_open_failed_at", None)
+    md = AsyncMarketData(provider)
+
+    async def main():
+        return [await md.income_statement("AAPL"), await md.balance_sheet("AAPL")]
+
+    try:
+        income, balance = asyncio.run(main())
+    finally:
+        md.shutdown()
+    pd.testing.assert_frame_equal(income, provider.income_statement("AAPL"))
+    assert not balance.empty
+    stats = fundamentals_store.open_error_stats()
+    assert stats["errors"] == 1  # the second call did not retry within the minute
+    assert stats["last_error"].startswith("open:")
+
+
+def test_default_path_does_not_depend_on_the_working_directory(monkeypatch, tmp_path):
+    monkeypatch.delenv("FUNDAMENTALS_STORE_PATH", raising=False)
+    monkeypatch.chdir(tmp_path)
+    path = fundamentals_store._get_path()
+    assert os.path.isabs(path)
+    assert not path.startswith(str(tmp_path))
@@ -0,0 +1,102 @@
+"""HistoryCache: widest-window fetches, period slicing, TTL expiry and LRU eviction."""
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from tools import history_cache
+from tools.history_cache import HistoryCache, _slice_period
+from tools.market_data import FixtureProvider
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(history_cache, "time", SimpleNamespace(monotonic=clock))
+    return clock
+
+
+@pytest.fixture
+def provider():
+    return FixtureProvider(fixture_dir="")
+
+
+def make_cache(provider, calls, **kwargs):
+    def fetch(symbol, period):
+        calls.append((symbol, period))
+        return provider.history(symbol, period)
+
+    return HistoryCache(fetch=fetch, **kwargs)
+
+
+def test_narrower_periods_are_sliced_from_one_fetch(provider, clock):
+    calls = []
+    cache = make_cache(provider, calls, ttl_seconds=60, min_period="1y")
+    wide = cache.get_history("aapl", "1y")
+    narrow = cache.get_history("AAPL", "1mo")
+    assert calls == [("AAPL", "1y")]
+    assert narrow.equals(_slice_period(wide, "1mo"))
+    assert narrow.equals(provider.history("AAPL", "1mo"))
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_wider_request_refetches_the_wider_window(provider, clock):
+    calls = []
+    cache = make_cache(provider, calls, ttl_seconds=60, min_period="1mo")
+    cache.get_history("MSFT", "1mo")
+    cache.get_history("MSFT", "2y")
+    cache.get_history("MSFT", "6mo")
+    assert calls == [("MSFT", "1mo"), ("MSFT", "2y")]
+
+
+def test_entries_expire_after_ttl(provider, clock):
+    calls = []
+    cache = make_cache(provider, calls, ttl_seconds=60, min_period="1mo")
+    cache.get_history("NVDA", "1mo")
+    clock.now += 59
+    assert cache.peek("NVDA", "1mo") is not None
+    clock.now += 2
+    assert cache.peek("NVDA", "1mo") is None
+    cache.get_history("NVDA", "1mo")
+    assert len(calls) == 2
+
+
+def test_least_recently_used_symbol_is_evicted(provider, clock):
+    calls = []
+    one = history_cache._frame_bytes(provider.history("AAPL", "1mo"))
+    cache = make_cache(provider, calls, ttl_seconds=60, min_period="1mo", max_bytes=int(one * 2.5))
+    cache.get_history("AAPL", "1mo")
+    cache.get_history("MSFT", "1mo")
+    cache.get_history("AAPL", "1mo")  # AAPL is now the most recently used
+    cache.get_history("NVDA", "1mo")
+    assert cache.peek("MSFT", "1mo") is None
+    assert cache.peek("AAPL", "1mo") is not None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= cache.stats()["max_bytes"]
+
+
+@pytest.mark.parametrize("period, offset", [("1mo", {"months": 1}), ("3mo", {"months": 3}), ("1y", {"years": 1})])
+def test_slice_period_keeps_bars_after_the_offset_from_the_last_one(provider, period, offset):
+    full = provider.history("AAPL", "10y")
+    sliced = _slice_period(full, period)
+    start = full.index[-1] - pd.DateOffset(**offset)
+    assert sliced.index[-1] == full.index[-1]
+    assert sliced.index[0] > start
+    assert full.index[len(full) - len(sliced) - 1] <= start
+
+
+def test_slice_period_days_are_bars(provider):
+    assert len(_slice_period(provider.history("AAPL", "1y"), "5d")) == 5
+
+
+def test_unknown_period_is_rejected(provider):
+    with pytest.raises(ValueError):
+        HistoryCache(fetch=lambda s, p: None).get_history("AAPL", "7w")
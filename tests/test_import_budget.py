@@ -0,0 +1,12 @@
+"""Import-time budget: entry points stay fast and defer heavy dependencies to first use."""
+import os
+
+import pytest
+
+from benchmarks.import_budget import BUDGETS_MS, check
+
+
+@pytest.mark.parametrize("module", list(BUDGETS_MS))
+def test_import_budget(module):
+    result = check(module, runs=3, scale=float(os.getenv("IMPORT_BUDGET_SCALE", "1.0")))
+    assert not result["problems"], f"{module}: {result['ms']} ms; " + "; ".join(result["problems"])
@@ -0,0 +1,127 @@
+"""Incremental indicator state: parity with the vectorized IndicatorEngine as bars arrive."""
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools import risk_tools
+from tools.history_cache import _slice_period
+from tools.incremental import PERIOD_BARS, IndicatorStates, SymbolState, get_indicator_states
+from tools.indicators import IndicatorEngine
+from tools.market_data import FixtureProvider, get_market_data, set_provider
+from tools.technical_tools import get_moving_averages
+
+SYMBOLS = ["AAPL", "NVDA", "XOM"]
+
+
+@pytest.fixture(scope="module")
+def full():
+    provider = FixtureProvider(fixture_dir="")
+    return {s: provider.history(s, "10y") for s in SYMBOLS}
+
+
+def assert_matches_engine(state: SymbolState, closes: np.ndarray) -> None:
+    engine = IndicatorEngine(closes)
+    assert state.volatility_pct() == pytest.approx(engine.volatility_pct[0], rel=1e-9)
+    assert state.max_drawdown_pct() == pytest.approx(engine.max_drawdown_pct[0], rel=1e-9, abs=1e-12)
+    assert state.last_close == closes[-1]
+
+
+@pytest.mark.parametrize("symbol", SYMBOLS)
+@pytest.mark.parametrize("period", ["1mo", "3mo", "1y"])
+def test_seeded_state_matches_engine(full, symbol, period):
+    closes = full[symbol]["Close"].to_numpy()[-PERIOD_BARS[period]:]
+    state = SymbolState.from_closes(symbol, period, closes)
+    assert_matches_engine(state, closes)
+    engine = IndicatorEngine(closes, sma_windows=(20, 50), ema_spans=(12, 26))
+    for window in (20, 50):
+        expected = engine.sma[window][0, -1]
+        if np.isnan(expected):  # fewer bars than the window
+            assert np.isnan(state.sma_value(window))
+        else:
+            assert state.sma_value(window) == pytest.approx(expected)
+    for span in (12, 26):
+        assert state.ema_value(span) == pytest.approx(engine.ema[span][0, -1])
+
+
+@pytest.mark.parametrize("period", ["1mo", "3mo"])
+def test_daily_syncs_over_date_sliced_history_push_instead_of_reseeding(full, period):
+    frame = full["AAPL"]
+    states = IndicatorStates()
+    lengths = set()
+    bars = PERIOD_BARS[period]
+    for end in range(300, 500):
+        hist = _slice_period(frame.iloc[:end], period)
+        lengths.add(len(hist))
+        state = states.sync("AAPL", period, hist)
+        assert_matches_engine(state, frame["Close"].to_numpy()[end - bars:end])
+    assert len(lengths) > 1  # the date-offset window really does change length
+    assert states.stats()["seeds"] == 1
+
+
+def test_intraday_revision_of_the_last_bar(full):
+    frame = full["NVDA"].iloc[-200:].copy()
+    states = IndicatorStates()
+    states.sync("NVDA", "3mo", frame)
+    for bump in (0.9, 1.2, 0.5):
+        revised = frame.copy()
+        revised.iloc[-1, revised.columns.get_loc("Close")] *= bump
+        state = states.sync("NVDA", "3mo", revised)
+        assert_matches_engine(state, revised["Close"].to_numpy()[-63:])
+    assert states.stats()["seeds"] == 1
+
+
+def test_non_finite_closes_are_skipped(full):
+    frame = full["XOM"].iloc[-150:].copy()
+    closes = frame["Close"].to_numpy().copy()
+    frame.iloc[-30, frame.columns.get_loc("Close")] = np.nan
+    frame.iloc[-10, frame.columns.get_loc("Close")] = np.inf
+    states = IndicatorStates()
+    states.sync("XOM", "3mo", frame.iloc[:-20])
+    state = states.sync("XOM", "3mo", frame)
+    finite = np.delete(closes, [len(closes) - 30, len(closes) - 10])
+    assert_matches_engine(state, finite[-63:])
+    assert states.stats()["seeds"] == 1
+
+
+def test_state_survives_serialization(full):
+    closes = full["AAPL"]["Close"].to_numpy()[-63:]
+    state = SymbolState.from_closes("AAPL", "3mo", closes)
+    restored = SymbolState.from_dict(state.to_dict())
+    assert restored.volatility_pct() == pytest.approx(state.volatility_pct())
+    assert restored.max_drawdown_pct() == pytest.approx(state.max_drawdown_pct())
+    assert restored.ema_value(12) == state.ema_value(12)
+
+
+def test_set_provider_clears_states(fixture_market, full):
+    get_indicator_states().sync("AAPL", "3mo", full["AAPL"])
+    assert get_indicator_states().stats()["states"] == 1
+    set_provider(fixture_market)
+    assert get_indicator_states().stats()["states"] == 0
+
+
+def test_moving_average_tool_is_the_same_with_and_without_incremental_state(fixture_market, monkeypatch):
+    from tools.memo import clear_memo
+
+    outputs = []
+    for flag in ("1", "0"):
+        monkeypatch.setenv("INCREMENTAL_INDICATORS", flag)
+        clear_memo()
+        outputs.append(asyncio.run(get_moving_averages("AAPL", "3mo")))
+    assert outputs[0] == outputs[1]
+    assert "50-day SMA" in outputs[0]
+
+
+@pytest.mark.parametrize("flag", ["1", "0"])
+def test_risk_helpers_return_none_without_finite_data(fixture_market, monkeypatch, flag):
+    monkeypatch.setenv("INCREMENTAL_INDICATORS", flag)
+    index = pd.bdate_range("2024-01-01", periods=8, tz="America/New_York")
+
+    async def history(symbol, period="1mo"):
+        return pd.DataFrame({"Close": [np.nan] * 7 + [10.0]}, index=index)
+
+    monkeypatch.setattr(get_market_data(), "history", history)
+    assert asyncio.run(risk_tools._annualized_volatility_pct("ZZZ", "1mo")) is None
+    text = asyncio.run(risk_tools.evaluate_volatility("ZZZ"))
+    assert text.startswith("Insufficient data") and "nan" not in text
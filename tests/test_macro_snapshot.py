@@ -0,0 +1,102 @@
+"""MacroSnapshot: partial downloads keep earlier readings; failed refreshes back off."""
+import asyncio
+
+import pandas as pd
+import pytest
+
+from tools import macro_snapshot, market_data
+from tools.macro_snapshot import MacroSnapshot
+from tools.market_data import AsyncMarketData, FixtureProvider
+
+
+class ScriptedProvider(FixtureProvider):
+    """Fixture provider whose bulk downloads return only the tickers listed for each call."""
+
+    def __init__(self, script) -> None:
+        super().__init__(fixture_dir="")
+        self.script = list(script)
+
+    def bulk_history(self, symbols, period):
+        wanted = self.script.pop(0)
+        if isinstance(wanted, Exception):
+            raise wanted
+        return {s: self.history(s, period) for s in symbols if s in wanted}
+
+
+@pytest.fixture
+def use_provider(monkeypatch):
+    facades = []
+
+    def install(provider):
+        md = AsyncMarketData(provider)
+        facades.append(md)
+        monkeypatch.setattr(market_data, "get_market_data", lambda: md)
+
+    yield install
+    for md in facades:
+        md.shutdown()
+
+
+def test_partial_download_keeps_previous_readings(use_provider):
+    snapshot = MacroSnapshot(tickers={"VIX": "^VIX", "SP500": "^GSPC"})
+    provider = ScriptedProvider([{"^VIX", "^GSPC"}, {"^VIX"}])
+    use_provider(provider)
+
+    async def main():
+        await snapshot.refresh()
+        first = snapshot.reading("^GSPC")
+        await snapshot.refresh()
+        return first
+
+    first = asyncio.run(main())
+    assert snapshot.reading("^GSPC") == first
+    assert snapshot.reading("^VIX")["close"] == pytest.approx(float(provider.history("^VIX", "5d")["Close"].iloc[-1]))
+    assert snapshot.refreshes == 2 and snapshot.errors == 0
+
+
+def test_empty_download_raises_without_marking_the_snapshot_fresh(use_provider):
+    snapshot = MacroSnapshot(tickers={"VIX": "^VIX"})
+    use_provider(ScriptedProvider([{"^VIX"}, set()]))
+
+    async def main():
+        await snapshot.refresh()
+        refreshed_at = snapshot.refreshed_at
+        with pytest.raises(RuntimeError):
+            await snapshot.refresh()
+        return refreshed_at
+
+    refreshed_at = asyncio.run(main())
+    assert snapshot.refreshed_at == refreshed_at
+    assert snapshot.reading("^VIX") is not None
+    assert snapshot.refreshes == 1 and snapshot.errors == 1
+
+
+def test_failed_refreshes_back_off(monkeypatch):
+    sleeps = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(seconds):
+        sleeps.append(seconds)
+        await real_sleep(0)
+
+    class Failing(MacroSnapshot):
+        calls = 0
+
+        async def refresh(self):
+            Failing.calls += 1
+            if Failing.calls == 1:
+                self.refreshed_at = 0.0  # filled once, long ago: always due
+                return
+            raise RuntimeError("upstream down")
+
+    monkeypatch.setattr(macro_snapshot.asyncio, "sleep", fake_sleep)
+
+    async def main():
+        snapshot = Failing()
+        snapshot.start_refresher(interval=300)
+        while Failing.calls < 7:
+            await real_sleep(0)
+        await snapshot.stop_refresher()
+
+    asyncio.run(main())
+    assert sleeps[:6] == [30.0, 60.0, 120.0, 240.0, 300, 300]
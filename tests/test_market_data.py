@@ -0,0 +1,17 @@
+"""Market data providers: bulk and single-symbol history agree."""
+import pandas as pd
+import pytest
+
+from tools.market_data import FixtureProvider
+
+
+@pytest.mark.parametrize("period", ["1mo", "1y", "5y"])
+def test_bulk_history_matches_history(period):
+    provider = FixtureProvider(fixture_dir="")
+    symbols = ["AAPL", "MSFT", "SPY"]
+    frames = provider.bulk_history(symbols, period)
+    assert sorted(frames) == sorted(symbols)
+    for symbol in symbols:
+        single = provider.history(symbol, period)
+        pd.testing.assert_frame_equal(frames[symbol], single)
+        assert frames[symbol].index.tz is not None
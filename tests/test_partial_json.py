@@ -0,0 +1,71 @@
+"""PartialJSONObject: fields surface as soon as their values close, whatever the chunking."""
+import json
+
+import pytest
+
+from tools.partial_json import PartialJSONObject
+
+STRATEGY = {
+    "direction": "BUY",
+    "confidence": "HIGH",
+    "entry_price": 182.5,
+    "position_size_pct": 5,
+    "conditions": ["Stop loss at $170", "Take profit at $210"],
+    "risks": {"volatility": "moderate", "note": "earnings \"next\" week"},
+    "hedged": False,
+    "rationale": "Trend and \\ momentum agree",
+}
+
+
+def stream(text: str, size: int):
+    parser = PartialJSONObject()
+    events = []
+    for i in range(0, len(text), size):
+        events.append(parser.feed(text[i:i + size]))
+    return parser, events
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 1000])
+def test_chunking_does_not_change_the_fields(size):
+    text = json.dumps(STRATEGY, indent=2)
+    parser, events = stream(text, size)
+    assert parser.fields == STRATEGY
+    assert parser.closed
+    order = [key for new in events for key in new]
+    assert order == list(STRATEGY)
+
+
+def test_prose_before_the_object_is_skipped():
+    parser, _ = stream("Here is the strategy:\n```json\n" + json.dumps(STRATEGY) + "\n```", 5)
+    assert parser.fields == STRATEGY
+
+
+def test_field_is_reported_once_its_value_closes():
+    parser = PartialJSONObject()
+    assert parser.feed('{"direction": "BU') == {}
+    assert parser.feed('Y", "conditions": ["a"') == {"direction": "BUY"}
+    assert parser.feed(', "b"], ') == {"conditions": ["a", "b"]}
+
+
+def test_number_at_the_buffer_edge_waits_for_more_text():
+    parser = PartialJSONObject()
+    assert parser.feed('{"entry_price": 18') == {}
+    assert parser.feed('2.5') == {}
+    assert parser.feed(', ') == {"entry_price": 182.5}
+    assert parser.feed('"hedged": true') == {}
+    assert parser.feed('}') == {"hedged": True}
+    assert parser.closed
+
+
+def test_exponent_at_the_buffer_edge_waits_for_more_text():
+    parser = PartialJSONObject()
+    assert parser.feed('{"a": 1') == {}
+    assert parser.feed('e') == {}
+    assert parser.feed('3}') == {"a": 1000.0}
+
+
+def test_nothing_is_reported_after_the_object_closes():
+    parser = PartialJSONObject()
+    parser.feed('{"a": 1}')
+    assert parser.feed(' {"b": 2}') == {}
+    assert parser.fields == {"a": 1}
@@ -0,0 +1,99 @@
+"""Portfolio risk: holdings parsing, covariance metrics, cross-timezone alignment and the report."""
+import asyncio
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from tools.indicators import align_closes, simple_returns
+from tools.portfolio_risk import concentration, portfolio_metrics
+from tools.risk_tools import compute_portfolio_risk_report, parse_holdings
+
+
+def test_parse_holdings():
+    assert parse_holdings("aapl:30, MSFT=20%; tlt:-10, AAPL:5") == {"AAPL": 35.0, "MSFT": 20.0, "TLT": -10.0}
+
+
+@pytest.mark.parametrize("text", ["", " , ", "AAPL 30", ":30", "AAPL:abc"])
+def test_parse_holdings_rejects_malformed_input(text):
+    with pytest.raises(ValueError):
+        parse_holdings(text)
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(7)
+    base = rng.normal(0.0, 0.01, 500)
+    return np.vstack([
+        base + rng.normal(0.0, 0.005, 500),
+        base * 0.5 + rng.normal(0.0, 0.01, 500),
+        rng.normal(0.0005, 0.02, 500),
+    ])
+
+
+def test_risk_contributions_sum_to_portfolio_volatility(returns):
+    weights = np.array([0.5, 0.3, 0.2])
+    m = portfolio_metrics(returns, weights)
+    assert m["component"].sum() == pytest.approx(m["volatility"])
+    assert m["risk_share"].sum() == pytest.approx(1.0)
+    assert m["volatility"] == pytest.approx((weights @ returns).std(ddof=1) * np.sqrt(252))
+    assert m["observations"] == 500
+
+
+def test_var_and_cvar(returns):
+    weights = np.array([0.5, 0.3, 0.2])
+    m = portfolio_metrics(returns, weights, confidence=0.95, horizon_days=4)
+    port = weights @ returns
+    cutoff = np.quantile(port, 0.05)
+    assert m["historical_var"] == pytest.approx(-cutoff * 2)
+    assert m["historical_cvar"] == pytest.approx(-port[port <= cutoff].mean() * 2)
+    assert m["historical_cvar"] >= m["historical_var"]
+    sigma, mu, z = port.std(ddof=1), port.mean(), NormalDist().inv_cdf(0.95)
+    assert m["parametric_var"] == pytest.approx(z * sigma * 2 - mu * 4)
+    assert m["parametric_cvar"] > m["parametric_var"]
+
+
+def test_missing_returns_count_as_no_move(returns):
+    gappy = returns.copy()
+    gappy[1, 10] = np.nan
+    filled = returns.copy()
+    filled[1, 10] = 0.0
+    weights = np.array([0.4, 0.4, 0.2])
+    assert portfolio_metrics(gappy, weights)["volatility"] == pytest.approx(portfolio_metrics(filled, weights)["volatility"])
+
+
+def test_metrics_need_two_observations():
+    with pytest.raises(ValueError):
+        portfolio_metrics(np.array([[0.01]]), np.array([1.0]))
+
+
+def test_concentration():
+    assert concentration(np.array([25.0, 25.0, -25.0, 25.0])) == {"hhi": 0.25, "effective_positions": 4.0, "max_weight": 25.0}
+    assert concentration(np.zeros(3))["effective_positions"] == 0.0
+
+
+def test_calendar_alignment_lines_up_exchanges_in_different_timezones():
+    days = pd.bdate_range("2024-03-01", periods=6)
+    new_york = pd.Series(np.arange(100.0, 106.0), index=days.tz_localize("America/New_York") + pd.Timedelta(hours=16))
+    london = pd.Series(np.arange(50.0, 56.0), index=days.tz_localize("Europe/London") + pd.Timedelta(hours=16, minutes=30))
+    london = london.drop(london.index[2])  # a London holiday
+
+    _, naive = align_closes({"NY": new_york, "LDN": london})
+    assert naive.shape[1] > 6 and np.isnan(naive).any()
+
+    names, prices = align_closes({"NY": new_york, "LDN": london}, calendar=True)
+    assert names == ["NY", "LDN"]
+    assert prices.shape == (2, 6)
+    assert not np.isnan(prices).any()
+    assert prices[1, 2] == prices[1, 1]  # the holiday carries the last close forward
+    assert not np.isnan(simple_returns(prices)[:, 1:]).any()
+
+
+def test_report_merges_holdings_that_normalize_to_the_same_symbol(fixture_market):
+    report = asyncio.run(compute_portfolio_risk_report({"aapl": 10.0, " AAPL": 5.0, "msft": 20.0}, period="1y"))
+    weights = {p.security: p.weight_pct for p in report.positions}
+    assert weights == {"AAPL": 15.0, "MSFT": 20.0}
+    assert report.gross_exposure_pct == 35.0
+    assert report.observations > 200
+    assert sum(p.risk_contribution_pct for p in report.positions) == pytest.approx(100.0, abs=1e-3)
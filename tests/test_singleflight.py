@@ -0,0 +1,103 @@
+"""SingleFlight: concurrent callers share one call; failures and cancellations are not retained."""
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from tools import singleflight
+from tools.singleflight import SingleFlight
+
+
+def counting(result="value", delay=0.01, error=None):
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return result
+
+    return fn, calls
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    fn, calls = counting()
+
+    async def main():
+        return await asyncio.gather(*(flight.do("k", fn) for _ in range(10)))
+
+    assert asyncio.run(main()) == ["value"] * 10
+    assert len(calls) == 1
+    assert flight.stats() == {"calls": 1, "shared": 9, "window_hits": 0, "inflight": 0}
+
+
+def test_distinct_keys_run_separately():
+    flight = SingleFlight()
+    fn, calls = counting()
+
+    async def main():
+        await asyncio.gather(flight.do("a", fn), flight.do("b", fn))
+
+    asyncio.run(main())
+    assert len(calls) == 2
+
+
+def test_without_window_sequential_calls_run_again():
+    flight = SingleFlight()
+    fn, calls = counting()
+
+    async def main():
+        await flight.do("k", fn)
+        await flight.do("k", fn)
+
+    asyncio.run(main())
+    assert len(calls) == 2
+
+
+def test_window_reuses_result_until_it_expires(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(singleflight, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    flight = SingleFlight(window=5.0)
+    fn, calls = counting()
+
+    async def main():
+        await flight.do("k", fn)
+        now[0] += 4.9
+        await flight.do("k", fn)
+        now[0] += 0.2
+        await flight.do("k", fn)
+
+    asyncio.run(main())
+    assert len(calls) == 2
+    assert flight.stats()["window_hits"] == 1
+
+
+def test_failures_reach_every_caller_and_are_not_retained():
+    flight = SingleFlight(window=60.0)
+    fn, calls = counting(error=RuntimeError("upstream down"))
+
+    async def main():
+        results = await asyncio.gather(*(flight.do("k", fn) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        with pytest.raises(RuntimeError):
+            await flight.do("k", fn)
+
+    asyncio.run(main())
+    assert len(calls) == 2
+
+
+def test_one_caller_cancelling_does_not_cancel_the_others():
+    flight = SingleFlight()
+    fn, calls = counting(delay=0.05)
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("k", fn))
+        second = asyncio.ensure_future(flight.do("k", fn))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "value"
+    assert len(calls) == 1
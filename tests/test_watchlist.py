@@ -0,0 +1,81 @@
+"""WatchlistWarmer: bulk history batches, pacing derived from TTLs, throttling instead of pausing."""
+import asyncio
+
+import pytest
+
+from tools import history_cache
+from tools.history_cache import HistoryCache, get_history_cache
+from tools.market_data import FixtureProvider
+from tools.watchlist import WatchlistWarmer, _derived_cycle_seconds
+
+SYMBOLS = [f"SYN{i:04d}" for i in range(120)]
+
+
+def test_refresh_many_keeps_the_widest_cached_window():
+    provider = FixtureProvider(fixture_dir="")
+    calls = []
+
+    def fetch_many(symbols, period):
+        calls.append((list(symbols), period))
+        frames = {s: provider.history(s, period) for s in symbols}
+        frames["EMPTY"] = frames["EMPTY"].iloc[:0]
+        return frames
+
+    cache = HistoryCache(fetch=provider.history, ttl_seconds=60, min_period="1mo")
+    cache.get_history("AAPL", "2y")
+    stored = cache.refresh_many(["aapl", "msft", "empty"], "1y", fetch_many)
+    assert calls == [(["AAPL", "MSFT", "EMPTY"], "2y")]
+    assert stored == 2
+    assert cache.peek("MSFT", "2y") is not None
+    assert cache.peek("EMPTY", "1mo") is None
+
+
+def test_cycle_fetches_history_in_bulk_batches(fixture_market):
+    warmer = WatchlistWarmer(SYMBOLS, fetches_per_second=0, cycle_seconds=60, batch_size=50)
+    asyncio.run(warmer.run_cycle())
+    assert fixture_market.calls["bulk_history"] == 3
+    assert fixture_market.calls["history"] == 0
+    stats = warmer.stats()
+    assert stats["history_warm"] == len(SYMBOLS)
+    assert stats["fundamentals_warm"] == len(SYMBOLS)
+    assert stats["fundamentals_pending"] == 0
+
+    asyncio.run(warmer.run_cycle())  # everything is still fresh
+    assert fixture_market.calls["bulk_history"] == 3
+    assert fixture_market.calls["info"] == len(SYMBOLS)
+
+
+def test_busy_server_slows_warming_but_does_not_stop_it(fixture_market):
+    warmer = WatchlistWarmer(SYMBOLS[:10], busy=lambda: True, fetches_per_second=0, cycle_seconds=60)
+    asyncio.run(warmer.run_cycle())
+    stats = warmer.stats()
+    assert stats["history_warm"] == 10 and stats["fundamentals_warm"] == 10
+    assert stats["throttled_fetches"] == stats["fetches"] > 0
+
+
+def test_fundamentals_past_the_deadline_carry_over(fixture_market):
+    warmer = WatchlistWarmer(SYMBOLS[:10], fetches_per_second=0, cycle_seconds=0.0)
+    asyncio.run(warmer.run_cycle())
+    assert warmer.stats()["fundamentals_pending"] == 10 * 4
+    warmer = WatchlistWarmer(SYMBOLS[:10], fetches_per_second=0, cycle_seconds=60)
+    asyncio.run(warmer.run_cycle())
+    assert warmer.stats()["fundamentals_pending"] == 0
+
+
+def test_rate_spreads_planned_fetches_over_the_cycle_within_the_cap():
+    warmer = WatchlistWarmer(["AAPL"], fetches_per_second=None, max_fetches_per_second=5)
+    warmer._plan_rate(90, 100.0)
+    assert warmer.stats()["fetches_per_second"] == 1.0
+    warmer._plan_rate(9000, 100.0)
+    assert warmer.stats()["fetches_per_second"] == 5.0
+    warmer._plan_rate(0, 100.0)
+    assert warmer.stats()["fetches_per_second"] == 0.0
+
+
+@pytest.mark.parametrize("memo_ttl, expected", [("60", 48.0), ("0", 120.0), ("600", 120.0)])
+def test_cycle_length_derives_from_history_and_memo_ttls(monkeypatch, memo_ttl, expected):
+    monkeypatch.setattr(history_cache, "_history_cache", HistoryCache(ttl_seconds=300))
+    monkeypatch.setenv("WATCHLIST_REFRESH_AHEAD", "0.5")
+    monkeypatch.setenv("TOOL_MEMO_TTL_SECONDS", memo_ttl)
+    assert get_history_cache().ttl_seconds == 300
+    assert _derived_cycle_seconds() == pytest.approx(expected)
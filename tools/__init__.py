@@ -1,32 +1,36 @@
-"""Financial tools for Fundamental, Technical, and Risk Management agents."""
-from .fundamental_tools import (
-    get_earnings_summary,
-    get_income_statement_summary,
-    get_balance_sheet_summary,
-    get_macro_indicators,
-)
-from .technical_tools import (
-    get_price_history,
-    get_volume_analysis,
-    get_moving_averages,
-    get_price_summary,
-)
-from .risk_tools import (
-    evaluate_volatility,
-    evaluate_position_limit_compliance,
-    evaluate_downside_risk,
-)
+"""Financial tools for Fundamental, Technical, and Risk Management agents.
 
-__all__ = [
-    "get_earnings_summary",
-    "get_income_statement_summary",
-    "get_balance_sheet_summary",
-    "get_macro_indicators",
-    "get_price_history",
-    "get_volume_analysis",
-    "get_moving_averages",
-    "get_price_summary",
-    "evaluate_volatility",
-    "evaluate_position_limit_compliance",
-    "evaluate_downside_risk",
-]
+Tools are resolved on first attribute access (PEP 562), so importing the package
+does not pull in the data providers, pandas or numpy.
+"""
+import importlib
+
+_TOOL_MODULES = {
+    "get_earnings_summary": "fundamental_tools",
+    "get_income_statement_summary": "fundamental_tools",
+    "get_balance_sheet_summary": "fundamental_tools",
+    "get_macro_indicators": "fundamental_tools",
+    "get_price_history": "technical_tools",
+    "get_volume_analysis": "technical_tools",
+    "get_moving_averages": "technical_tools",
+    "get_price_summary": "technical_tools",
+    "evaluate_volatility": "risk_tools",
+    "evaluate_position_limit_compliance": "risk_tools",
+    "evaluate_downside_risk": "risk_tools",
+    "evaluate_portfolio_risk": "risk_tools",
+}
+
+__all__ = list(_TOOL_MODULES)
+
+
+def __getattr__(name: str):
+    module = _TOOL_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,186 @@
+"""Token-compact encodings for tool outputs.
+
+Tool results go straight into analyst prompts, and model latency and cost grow
+with input tokens. Formats, selectable per tool:
+
+  table    pandas to_string (the original wide tables)
+  compact  columnar rows with fixed-precision numbers (B/M/K suffixes for large values)
+  delta    like compact, but closes are delta-encoded and open/high/low are offsets from the close
+  stats    pre-aggregated statistics instead of raw rows
+
+TOOL_OUTPUT_FORMAT sets the default (compact); TOOL_OUTPUT_FORMAT_<TOOL_NAME>
+overrides it for one tool, e.g. TOOL_OUTPUT_FORMAT_GET_PRICE_HISTORY=stats.
+
+Measuring the tokens saved against the table format (encoding_stats()) renders
+the table too and tokenizes both, so it is off by default: set
+TOOL_OUTPUT_MEASURE_SAVINGS to 1 to measure every call or to a fraction (e.g.
+0.05) to sample. Counts use the optional tiktoken package when it is installed.
+"""
+import math
+import os
+import random
+import threading
+from typing import Callable, Dict, Optional
+
+FORMATS = ("table", "compact", "delta", "stats")
+
+_stats: Dict[str, Dict[str, int]] = {}
+_stats_lock = threading.Lock()
+
+_UNLOADED = object()
+_encoding = _UNLOADED
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding():
+    """tiktoken's o200k_base encoding, loaded on first measurement (it may fetch its BPE file)."""
+    global _encoding
+    if _encoding is _UNLOADED:
+        with _encoding_lock:
+            if _encoding is _UNLOADED:
+                try:
+                    import tiktoken
+
+                    _encoding = tiktoken.get_encoding("o200k_base")
+                except Exception:  # optional dependency (or offline without the encoding files)
+                    _encoding = None
+    return _encoding
+
+
+def output_format(tool: str) -> str:
+    """Output format configured for tool (per-tool env override, then the default)."""
+    fmt = os.getenv(f"TOOL_OUTPUT_FORMAT_{tool.upper()}") or os.getenv("TOOL_OUTPUT_FORMAT", "compact")
+    fmt = fmt.strip().lower()
+    return fmt if fmt in FORMATS else "compact"
+
+
+def _get_measure_rate() -> float:
+    """Fraction of encode() calls whose savings are measured (0 = off, 1 = every call)."""
+    value = os.getenv("TOOL_OUTPUT_MEASURE_SAVINGS", "0").strip().lower()
+    if value in ("true", "yes", "on"):
+        return 1.0
+    try:
+        return min(max(float(value), 0.0), 1.0)
+    except ValueError:
+        return 0.0
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count with tiktoken when installed, else the ~4 characters per token rule of thumb."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def fmt_num(value, precision: int = 2) -> str:
+    """Fixed precision, with B/M/K suffixes for large magnitudes; n/a for missing values."""
+    try:
+        x = float(value)
+    except (TypeError, ValueError):
+        return str(value)
+    if math.isnan(x) or math.isinf(x):
+        return "n/a"
+    magnitude = abs(x)
+    for bound, suffix in ((1e9, "B"), (1e6, "M"), (1e3, "K")):
+        if magnitude >= bound * 10 or (suffix != "K" and magnitude >= bound):
+            return f"{x / bound:.{precision}f}{suffix}"
+    return f"{x:.{precision}f}"
+
+
+def _dates(index) -> list:
+    return [d.strftime("%Y-%m-%d") if hasattr(d, "strftime") else str(d) for d in index]
+
+
+def encode_ohlcv(frame, fmt: str) -> str:
+    """Encode an OHLCV DataFrame (Open, High, Low, Close, Volume) in fmt."""
+    if fmt == "table":
+        return frame[["Open", "High", "Low", "Close", "Volume"]].to_string()
+    dates = _dates(frame.index)
+    close = [float(c) for c in frame["Close"]]
+    if fmt == "stats":
+        return _ohlcv_stats(frame, dates, close)
+    lines = [f"dates {dates[0]}..{dates[-1]} ({len(dates)} bars)"]
+    if fmt == "delta":
+        deltas = [f"{b - a:+.2f}" for a, b in zip(close, close[1:])]
+        lines.append(f"close {close[0]:.2f} then deltas: " + " ".join(deltas))
+        for column in ("Open", "High", "Low"):
+            offsets = (float(v) - c for v, c in zip(frame[column], close))
+            lines.append(f"{column.lower()}-close: " + " ".join(f"{o:+.2f}" for o in offsets))
+    else:
+        lines.append("date,open,high,low,close")
+        for d, o, h, l, c in zip(dates, frame["Open"], frame["High"], frame["Low"], close):
+            lines.append(f"{d[5:]},{o:.2f},{h:.2f},{l:.2f},{c:.2f}")
+    lines.append("volume: " + " ".join(fmt_num(v, 1) for v in frame["Volume"]))
+    return "\n".join(lines)
+
+
+def _ohlcv_stats(frame, dates: list, close: list) -> str:
+    returns = [b / a - 1 for a, b in zip(close, close[1:]) if a]
+    mean = sum(returns) / len(returns) if returns else 0.0
+    std = math.sqrt(sum((r - mean) ** 2 for r in returns) / (len(returns) - 1)) if len(returns) > 1 else 0.0
+    high_i = max(range(len(close)), key=lambda i: float(frame["High"].iloc[i]))
+    low_i = min(range(len(close)), key=lambda i: float(frame["Low"].iloc[i]))
+    volume = [float(v) for v in frame["Volume"]]
+    change = (close[-1] / close[0] - 1) * 100 if close[0] else 0.0
+    return "\n".join([
+        f"{len(close)} bars {dates[0]}..{dates[-1]}: first close {close[0]:.2f}, last close {close[-1]:.2f} ({change:+.1f}%)",
+        f"high {float(frame['High'].iloc[high_i]):.2f} on {dates[high_i]}, low {float(frame['Low'].iloc[low_i]):.2f} on {dates[low_i]}",
+        f"daily return mean {mean * 100:+.2f}%, std {std * 100:.2f}%, up days {sum(r > 0 for r in returns)}/{len(returns)}",
+        f"avg volume {fmt_num(sum(volume) / len(volume), 1)}, last volume {fmt_num(volume[-1], 1)}",
+        "last 5 closes: " + " ".join(f"{c:.2f}" for c in close[-5:]),
+    ])
+
+
+def encode_rows(frame, fmt: str, precision: int = 2) -> str:
+    """Encode a small DataFrame (e.g. earnings dates) one row per line, dropping missing values."""
+    if fmt == "table":
+        return frame.to_string()
+    lines = []
+    for label, row in zip(_dates(frame.index), frame.itertuples(index=False)):
+        values = [
+            f"{column}={fmt_num(value, precision)}"
+            for column, value in zip(frame.columns, row)
+            if not (isinstance(value, float) and math.isnan(value))
+        ]
+        lines.append(f"{label}: " + (", ".join(values) if values else "n/a"))
+    return "\n".join(lines)
+
+
+def encode(tool: str, fmt: str, encoder: Callable[[str], str], baseline: Optional[Callable[[], str]] = None) -> str:
+    """
+    Run encoder(fmt) and, for the sampled share of calls, record tokens saved vs
+    the table format. baseline builds the table text for comparison (defaults to
+    encoder("table")).
+    """
+    text = encoder(fmt)
+    rate = _get_measure_rate()
+    if rate > 0 and (rate >= 1 or random.random() < rate):
+        if fmt == "table":
+            before = after = estimate_tokens(text)
+        else:
+            before = estimate_tokens(baseline() if baseline is not None else encoder("table"))
+            after = estimate_tokens(text)
+        with _stats_lock:
+            counters = _stats.setdefault(tool, {"measured_calls": 0, "baseline_tokens": 0, "encoded_tokens": 0})
+            counters["measured_calls"] += 1
+            counters["baseline_tokens"] += before
+            counters["encoded_tokens"] += after
+    return text
+
+
+def encoding_stats() -> dict:
+    """Per-tool token totals over measured calls (table format vs the configured one) and overall savings."""
+    with _stats_lock:
+        per_tool = {k: dict(v) for k, v in _stats.items()}
+    for counters in per_tool.values():
+        base = counters["baseline_tokens"]
+        counters["saved_pct"] = round((1 - counters["encoded_tokens"] / base) * 100, 1) if base else 0.0
+    baseline = sum(c["baseline_tokens"] for c in per_tool.values())
+    encoded = sum(c["encoded_tokens"] for c in per_tool.values())
+    return {
+        "baseline_tokens": baseline,
+        "encoded_tokens": encoded,
+        "saved_pct": round((1 - encoded / baseline) * 100, 1) if baseline else 0.0,
+        "tools": per_tool,
+    }
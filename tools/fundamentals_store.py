@@ -0,0 +1,331 @@
+"""Disk-backed fundamentals store keyed by symbol and fiscal period.
+
+Financial statements and earnings dates change once per reporting period, so the
+async market-data facade serves them from a local SQLite file and only asks the
+provider again once a new period is expected: the latest fiscal period end plus
+the usual interval and filing lag (quarterly ~91+45 days, yearly ~365+90 days),
+or the next scheduled earnings date. If the upstream has nothing new by then,
+the entry is rechecked at most every FUNDAMENTALS_RECHECK_SECONDS. Quote-like
+`info` fields are cached with a plain TTL.
+
+The file uses WAL journaling with a busy timeout, so several worker processes
+can share one store: readers never block, writers serialize on the database lock.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+DAY = 86400.0
+
+# (period length, filing lag) in days per statement frequency
+_PERIOD_SCHEDULE = {"quarterly": (91, 45), "yearly": (365, 90)}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fundamentals (
+    source TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    fiscal_period TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (source, symbol, kind, fiscal_period)
+);
+CREATE TABLE IF NOT EXISTS refresh (
+    source TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    fiscal_period TEXT NOT NULL,
+    next_due REAL NOT NULL,
+    PRIMARY KEY (source, symbol, kind)
+);
+"""
+
+
+def _get_enabled() -> bool:
+    return os.getenv("FUNDAMENTALS_STORE", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+# <repo>/.cache, so the server and benchmarks share one store wherever they start.
+_DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "fundamentals.sqlite")
+
+# After the store fails to open, callers go to the provider until this much time passes.
+_OPEN_RETRY_SECONDS = 60.0
+
+
+def _get_path() -> str:
+    return os.getenv("FUNDAMENTALS_STORE_PATH", _DEFAULT_PATH)
+
+
+def _get_recheck_seconds() -> float:
+    return float(os.getenv("FUNDAMENTALS_RECHECK_SECONDS", str(DAY)))
+
+
+def _get_info_ttl_seconds() -> float:
+    return float(os.getenv("FUNDAMENTALS_INFO_TTL_SECONDS", str(6 * 3600)))
+
+
+def _encode_column(values) -> tuple:
+    """(kind, JSON-safe values) for one column: numbers, datetimes, else strings."""
+    import pandas as pd
+
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return "datetime", [None if pd.isna(v) else v.isoformat() for v in values]
+    if not pd.api.types.is_bool_dtype(values):
+        numbers = pd.to_numeric(values, errors="coerce")
+        # Object columns count as numeric only when every present value converts.
+        if numbers.notna().sum() == values.notna().sum():
+            return "float", [None if pd.isna(v) else float(v) for v in numbers]
+    return "str", [None if pd.isna(v) else str(v) for v in values]
+
+
+def _encode_frame(frame) -> str:
+    """JSON for a DataFrame with date or string labels (statements, earnings dates), encoded column by column."""
+    import pandas as pd
+
+    def labels(values) -> dict:
+        dated = isinstance(values, pd.DatetimeIndex)
+        return {
+            "values": [v.isoformat() if dated else str(v) for v in values],
+            "dates": dated,
+            "tz": str(values.tz) if dated and values.tz is not None else None,
+            "name": values.name,
+        }
+
+    kinds, data = zip(*(_encode_column(frame.iloc[:, i]) for i in range(frame.shape[1]))) if frame.shape[1] else ((), ())
+    return json.dumps({
+        "index": labels(frame.index),
+        "columns": labels(frame.columns),
+        "kinds": list(kinds),
+        "data": list(data),
+    })
+
+
+def _decode_frame(text: str):
+    import pandas as pd
+
+    raw = json.loads(text)
+
+    def labels(spec: dict):
+        if spec["dates"]:
+            index = pd.DatetimeIndex(pd.to_datetime(spec["values"], utc=spec["tz"] is not None), name=spec["name"])
+            return index.tz_convert(spec["tz"]) if spec["tz"] else index
+        return pd.Index(spec["values"], name=spec["name"])
+
+    index, columns = labels(raw["index"]), labels(raw["columns"])
+
+    def column(kind: str, values: list):
+        if kind == "float":
+            return pd.Series(values, index=index, dtype=float)
+        if kind == "datetime":
+            return pd.Series(pd.to_datetime(values), index=index)
+        return pd.Series(values, index=index, dtype=object)
+
+    frame = pd.concat([column(k, v) for k, v in zip(raw["kinds"], raw["data"])], axis=1) if raw["data"] else pd.DataFrame(index=index)
+    frame.columns = columns
+    return frame
+
+
+def _timestamp(value) -> Optional[float]:
+    try:
+        return float(value.timestamp())
+    except (AttributeError, ValueError, OverflowError):
+        return None
+
+
+def latest_period(kind: str, frame, now: Optional[float] = None) -> Optional[str]:
+    """Fiscal period a fetched frame covers: the latest statement column, or the latest reported earnings date."""
+    if frame is None or frame.empty:
+        return None
+    if kind == "earnings_dates":
+        now = time.time() if now is None else now
+        reported = [d for d in frame.index if (_timestamp(d) or 0) <= now]
+        return max(reported).date().isoformat() if reported else min(frame.index).date().isoformat()
+    return max(frame.columns).date().isoformat()
+
+
+def next_refresh(kind: str, frame, fiscal_period: Optional[str], now: Optional[float] = None) -> float:
+    """When a newer reporting period can first be expected for this kind."""
+    import pandas as pd
+
+    now = time.time() if now is None else now
+    if fiscal_period is None:
+        return now + _get_recheck_seconds()
+    period_end = pd.Timestamp(fiscal_period).timestamp()
+    if kind == "earnings_dates":
+        upcoming = [t for t in (_timestamp(d) for d in frame.index) if t is not None and t > now]
+        due = min(upcoming) + DAY if upcoming else period_end + (91 + 1) * DAY
+    else:
+        length, lag = _PERIOD_SCHEDULE["quarterly" if kind.endswith("quarterly") else "yearly"]
+        due = period_end + (length + lag) * DAY
+    return due if due > now else now + _get_recheck_seconds()
+
+
+class FundamentalsStore:
+    """
+    SQLite-backed store of fundamentals frames. One connection per thread;
+    every write is a single transaction, safe across threads and processes.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path or _get_path()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._writes = 0
+        self._errors = 0
+        self._last_error: Optional[str] = None
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def get(self, source: str, symbol: str, kind: str, now: Optional[float] = None):
+        """Stored frame (or info dict) if its period is still current, else None."""
+        now = time.time() if now is None else now
+        row = self._connect().execute(
+            "SELECT f.payload FROM refresh r JOIN fundamentals f"
+            " ON f.source = r.source AND f.symbol = r.symbol AND f.kind = r.kind AND f.fiscal_period = r.fiscal_period"
+            " WHERE r.source = ? AND r.symbol = ? AND r.kind = ? AND r.next_due > ?",
+            (source, symbol.upper(), kind, now),
+        ).fetchone()
+        self._count(row is not None)
+        if row is None:
+            return None
+        return json.loads(row[0]) if kind == "info" else _decode_frame(row[0])
+
+    def is_current(self, source: str, symbol: str, kind: str, now: Optional[float] = None) -> bool:
+        """Whether get() would be served locally; does not count as a hit or miss."""
+        now = time.time() if now is None else now
+        row = self._connect().execute(
+            "SELECT 1 FROM refresh WHERE source = ? AND symbol = ? AND kind = ? AND next_due > ?",
+            (source, symbol.upper(), kind, now),
+        ).fetchone()
+        return row is not None
+
+    def put(self, source: str, symbol: str, kind: str, value, now: Optional[float] = None) -> None:
+        """Store a fetched frame under its fiscal period and schedule the next refresh."""
+        now = time.time() if now is None else now
+        if kind == "info":
+            # Quote fields have no fiscal period; keep one row per symbol.
+            period, payload, due = "latest", json.dumps(value, default=str), now + _get_info_ttl_seconds()
+        else:
+            if value is None or value.empty:
+                return
+            period = latest_period(kind, value, now)
+            payload, due = _encode_frame(value), next_refresh(kind, value, period, now)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO fundamentals VALUES (?, ?, ?, ?, ?, ?)",
+                (source, symbol.upper(), kind, period, payload, now),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO refresh VALUES (?, ?, ?, ?, ?)",
+                (source, symbol.upper(), kind, period, due),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        with self._lock:
+            self._writes += 1
+
+    def periods(self, source: str, symbol: str, kind: str) -> list:
+        """Fiscal periods stored for symbol/kind, most recent first."""
+        rows = self._connect().execute(
+            "SELECT fiscal_period FROM fundamentals WHERE source = ? AND symbol = ? AND kind = ? ORDER BY fiscal_period DESC",
+            (source, symbol.upper(), kind),
+        ).fetchall()
+        return [r[0] for r in rows]
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        """Force a refetch on next read (all symbols, or one); stored periods are kept."""
+        conn = self._connect()
+        if symbol is None:
+            conn.execute("UPDATE refresh SET next_due = 0")
+        else:
+            conn.execute("UPDATE refresh SET next_due = 0 WHERE symbol = ?", (symbol.upper(),))
+
+    def record_error(self, operation: str, error: BaseException) -> None:
+        """Count a failed read or write that callers fell back from."""
+        with self._lock:
+            self._errors += 1
+            self._last_error = f"{operation}: {type(error).__name__}: {error}"
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = {
+                "hits": self._hits,
+                "misses": self._misses,
+                "writes": self._writes,
+                "errors": self._errors,
+                "last_error": self._last_error,
+            }
+        counters["entries"] = self._connect().execute("SELECT COUNT(*) FROM fundamentals").fetchone()[0]
+        counters["path"] = self.path
+        return counters
+
+
+_store: Optional[FundamentalsStore] = None
+_store_lock = threading.Lock()
+_open_errors = 0
+_open_last_error: Optional[str] = None
+_open_failed_at: Optional[float] = None
+
+
+def get_fundamentals_store() -> Optional[FundamentalsStore]:
+    """
+    Singleton store at FUNDAMENTALS_STORE_PATH, or None when FUNDAMENTALS_STORE=0
+    or the file cannot be opened (counted in open_error_stats, retried after a minute).
+    """
+    global _store, _open_errors, _open_last_error, _open_failed_at
+    if not _get_enabled():
+        return None
+    with _store_lock:
+        if _store is None:
+            if _open_failed_at is not None and time.monotonic() - _open_failed_at < _OPEN_RETRY_SECONDS:
+                return None
+            try:
+                _store = FundamentalsStore()
+            except (OSError, sqlite3.Error) as e:
+                _open_errors += 1
+                _open_last_error = f"open: {type(e).__name__}: {e}"
+                _open_failed_at = time.monotonic()
+                return None
+            _open_failed_at = None
+        return _store
+
+
+def open_error_stats() -> dict:
+    """Failed attempts to open the store (each one served fundamentals from the provider)."""
+    with _store_lock:
+        return {"errors": _open_errors, "last_error": _open_last_error}
+
+
+def set_fundamentals_store(store: Optional[FundamentalsStore]) -> None:
+    """Swap the store (e.g. a temporary file for benchmarks)."""
+    global _store
+    with _store_lock:
+        _store = store
@@ -0,0 +1,248 @@
+"""Shared OHLCV history cache for Technical and Risk tools.
+
+One workflow touches the same symbol from several tools with overlapping periods
+('1mo', '3mo', ...). The cache fetches the widest requested window once per symbol
+and serves narrower periods by slicing it. Entries expire after a TTL and the
+least recently used symbols are evicted once the cache exceeds its byte budget.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+# Approximate span of each yfinance period in days; used to order periods by width.
+PERIOD_DAYS = {
+    "1d": 1,
+    "5d": 5,
+    "1mo": 31,
+    "3mo": 92,
+    "6mo": 183,
+    "ytd": 366,
+    "1y": 366,
+    "2y": 731,
+    "5y": 1827,
+    "10y": 3653,
+    "max": 100000,
+}
+
+
+def _get_ttl_seconds() -> float:
+    return float(os.getenv("HISTORY_CACHE_TTL_SECONDS", "300"))
+
+
+def _get_max_bytes() -> int:
+    return int(os.getenv("HISTORY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+
+def _get_min_period() -> str:
+    return os.getenv("HISTORY_CACHE_MIN_PERIOD", "3mo")
+
+
+def _period_days(period: str) -> int:
+    days = PERIOD_DAYS.get(period)
+    if days is None:
+        raise ValueError(f"Unsupported period: {period!r}")
+    return days
+
+
+def _slice_period(hist, period: str):
+    """Return the rows of hist that fall inside period, measured back from the last bar."""
+    if hist is None or hist.empty or period == "max":
+        return hist
+    import pandas as pd
+
+    last = hist.index[-1]
+    if period.endswith("d"):
+        return hist.tail(int(period[:-1]))
+    if period == "ytd":
+        start = pd.Timestamp(year=last.year, month=1, day=1, tz=last.tz)
+        return hist[hist.index >= start]
+    if period.endswith("mo"):
+        start = last - pd.DateOffset(months=int(period[:-2]))
+    else:
+        start = last - pd.DateOffset(years=int(period[:-1]))
+    return hist[hist.index > start]
+
+
+def _frame_bytes(hist) -> int:
+    if hist is None:
+        return 0
+    return int(hist.memory_usage(deep=True).sum())
+
+
+def _provider_fetch(symbol: str, period: str):
+    from .market_data import get_provider
+
+    return get_provider().history(symbol, period)
+
+
+class _Entry:
+    __slots__ = ("hist", "period", "fetched_at", "nbytes")
+
+    def __init__(self, hist, period: str, fetched_at: float) -> None:
+        self.hist = hist
+        self.period = period
+        self.fetched_at = fetched_at
+        self.nbytes = _frame_bytes(hist)
+
+
+class HistoryCache:
+    """
+    Per-symbol OHLCV cache. Stores the widest window fetched for each symbol,
+    slices it for narrower periods, expires entries after ttl_seconds, and
+    evicts least recently used symbols when total size exceeds max_bytes.
+    """
+
+    def __init__(
+        self,
+        fetch: Optional[Callable[[str, str], object]] = None,
+        ttl_seconds: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        min_period: Optional[str] = None,
+    ) -> None:
+        self._fetch = fetch or _provider_fetch
+        self._ttl = ttl_seconds if ttl_seconds is not None else _get_ttl_seconds()
+        self._max_bytes = max_bytes if max_bytes is not None else _get_max_bytes()
+        self._min_period = min_period or _get_min_period()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def peek(self, symbol: str, period: str = "1mo"):
+        """Return the cached slice for period, or None if fetching would be required."""
+        key = symbol.upper()
+        wanted = _period_days(period)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry.fetched_at > self._ttl:
+                return None
+            if _period_days(entry.period) < wanted:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            hist = entry.hist
+        return _slice_period(hist, period)
+
+    def get_history(self, symbol: str, period: str = "1mo"):
+        """Return OHLCV history for symbol over period, fetching only when the cache cannot serve it."""
+        key = symbol.upper()
+        wanted = _period_days(period)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry.fetched_at > self._ttl:
+                self._drop(key)
+                entry = None
+            if entry is not None and _period_days(entry.period) >= wanted:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _slice_period(entry.hist, period)
+            self.misses += 1
+            # Fetch the widest window seen so far so later, wider requests are served too.
+            fetch_period = max(
+                (p for p in (period, self._min_period, entry.period if entry else None) if p),
+                key=_period_days,
+            )
+
+        hist = self._fetch(key, fetch_period)
+        self._put(key, hist, fetch_period)
+        return _slice_period(hist, period)
+
+    @property
+    def ttl_seconds(self) -> float:
+        return self._ttl
+
+    def age(self, symbol: str) -> Optional[float]:
+        """Seconds since symbol's entry was fetched, or None if it is not cached."""
+        with self._lock:
+            entry = self._entries.get(symbol.upper())
+            return None if entry is None else time.monotonic() - entry.fetched_at
+
+    def refresh(self, symbol: str, period: str) -> None:
+        """Refetch symbol now (e.g. ahead of expiry), keeping at least the cached window."""
+        key = symbol.upper()
+        with self._lock:
+            entry = self._entries.get(key)
+            fetch_period = max((p for p in (period, entry.period if entry else None) if p), key=_period_days)
+        self._put(key, self._fetch(key, fetch_period), fetch_period)
+
+    def refresh_many(self, symbols: List[str], period: str, fetch_many: Callable[[list, str], dict]) -> int:
+        """
+        Refetch several symbols with one fetch_many(symbols, period) call (e.g. a
+        provider's bulk_history), keeping at least the widest cached window among
+        them. Returns how many symbols were stored.
+        """
+        keys = [s.upper() for s in symbols]
+        with self._lock:
+            cached = [self._entries[k].period for k in keys if k in self._entries]
+        fetch_period = max([period] + cached, key=_period_days)
+        frames = fetch_many(keys, fetch_period)
+        stored = 0
+        for key in keys:
+            hist = frames.get(key)
+            if hist is not None and not hist.empty:
+                self._put(key, hist, fetch_period)
+                stored += 1
+        return stored
+
+    def invalidate(self, symbol: Optional[str] = None) -> None:
+        """Drop one symbol, or everything when symbol is None."""
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+                self._bytes = 0
+            else:
+                self._drop(symbol.upper())
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current footprint."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _put(self, key: str, hist, period: str) -> None:
+        with self._lock:
+            if hist is not None and not hist.empty:
+                self._drop(key)
+                new_entry = _Entry(hist, period, time.monotonic())
+                self._entries[key] = new_entry
+                self._bytes += new_entry.nbytes
+                self._evict()
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.nbytes
+
+    def _evict(self) -> None:
+        # Keep the most recent entry even if it alone exceeds the budget.
+        while self._bytes > self._max_bytes and len(self._entries) > 1:
+            key, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.nbytes
+            self.evictions += 1
+
+
+_history_cache: Optional[HistoryCache] = None
+
+
+def get_history_cache() -> HistoryCache:
+    """Singleton access to the shared history cache."""
+    global _history_cache
+    if _history_cache is None:
+        _history_cache = HistoryCache()
+    return _history_cache
+
+
+def get_history(symbol: str, period: str = "1mo"):
+    """Cached, blocking price history for symbol over period."""
+    return get_history_cache().get_history(symbol, period)
@@ -0,0 +1,374 @@
+"""Incremental per-symbol indicator and risk state.
+
+A SymbolState covers one symbol over one history window (the bars a tool's
+period spans). It is seeded once from history; after that, each new bar is an
+O(1) update, and so is a revised close for the latest bar (intraday). The state
+keeps:
+
+  - sliding-window Welford mean/variance of returns, for volatility
+  - a monotonic deque of the running window maximum, for drawdown
+  - ring-buffer SMAs and recursive EMAs
+
+The worst drawdown is recomputed over the window only when its peak leaves the
+window or its trough is revised. States are compact (__slots__, array-backed)
+and round-trip through to_dict() / from_dict().
+
+IndicatorStates.sync(symbol, period, hist) brings a state up to date with the
+history the tools already fetched (usually from the shared cache). Windows are
+a fixed number of bars per period (PERIOD_BARS, e.g. 1mo = 21), not a date
+range, so a new day is one push rather than a reseed. sync pushes only the bars
+after the state's last one, skips non-finite closes, and reseeds only when the
+history no longer lines up.
+"""
+import math
+import threading
+from array import array
+from collections import OrderedDict, deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Same as indicators.TRADING_DAYS_PER_YEAR; not imported so this module stays free of numpy.
+TRADING_DAYS_PER_YEAR = 252
+SMA_WINDOWS = (20, 50)
+EMA_SPANS = (12, 26)
+
+# Trading bars per history period; other periods (ytd, max) use every bar given.
+PERIOD_BARS = {"5d": 5, "1mo": 21, "3mo": 63, "6mo": 126, "1y": 252, "2y": 504, "5y": 1260, "10y": 2520}
+
+
+class RollingWindow:
+    """Fixed-size ring buffer with O(1) push / amend-last and sliding Welford mean and variance."""
+
+    __slots__ = ("size", "_buf", "_head", "count", "mean", "_m2")
+
+    def __init__(self, size: int) -> None:
+        self.size = max(1, int(size))
+        self._buf = array("d", bytes(8 * self.size))
+        self._head = 0  # next write position
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def _add(self, x: float) -> None:
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+
+    def _remove(self, x: float) -> None:
+        self.count -= 1
+        if self.count == 0:
+            self.mean = self._m2 = 0.0
+            return
+        delta = x - self.mean
+        self.mean -= delta / self.count
+        self._m2 -= delta * (x - self.mean)
+
+    def push(self, x: float) -> Optional[float]:
+        """Append x; returns the evicted oldest value once the window is full."""
+        evicted = None
+        if self.count == self.size:
+            evicted = self._buf[self._head]
+            self._remove(evicted)
+        self._buf[self._head] = x
+        self._head = (self._head + 1) % self.size
+        self._add(x)
+        return evicted
+
+    def amend_last(self, x: float) -> None:
+        """Replace the newest value (e.g. a revised close for the current bar)."""
+        i = (self._head - 1) % self.size
+        self._remove(self._buf[i])
+        self._buf[i] = x
+        self._add(x)
+
+    @property
+    def full(self) -> bool:
+        return self.count == self.size
+
+    @property
+    def last(self) -> float:
+        return self._buf[(self._head - 1) % self.size] if self.count else math.nan
+
+    def previous(self) -> float:
+        """Second newest value (NaN with fewer than two)."""
+        return self._buf[(self._head - 2) % self.size] if self.count >= 2 else math.nan
+
+    def values(self) -> List[float]:
+        """Oldest to newest."""
+        start = (self._head - self.count) % self.size
+        return [self._buf[(start + i) % self.size] for i in range(self.count)]
+
+    def variance(self, ddof: int = 1) -> float:
+        return max(self._m2, 0.0) / (self.count - ddof) if self.count > ddof else math.nan
+
+
+class SymbolState:
+    """Incremental volatility, drawdown, SMA and EMA for one symbol over a window of bars."""
+
+    __slots__ = (
+        "symbol", "period", "bars", "last_ts", "seq",
+        "closes", "returns", "sma", "ema", "_ema_prev",
+        "_peaks", "_worst", "_worst_peak", "_worst_trough", "_dirty",
+    )
+
+    def __init__(self, symbol: str, period: str, bars: int) -> None:
+        self.symbol = symbol.upper()
+        self.period = period
+        self.bars = max(1, int(bars))
+        self.last_ts: Optional[int] = None  # nanoseconds since epoch of the newest bar
+        self.seq = -1  # sequence number of the newest bar
+        self.closes = RollingWindow(self.bars)
+        self.returns = RollingWindow(max(1, self.bars - 1))
+        self.sma: Dict[int, RollingWindow] = {w: RollingWindow(w) for w in SMA_WINDOWS}
+        self.ema: Dict[int, float] = {s: math.nan for s in EMA_SPANS}
+        self._ema_prev: Dict[int, float] = dict(self.ema)
+        self._peaks: deque = deque()  # (seq, close), closes strictly decreasing
+        self._worst = 0.0
+        self._worst_peak = -1
+        self._worst_trough = -1
+        self._dirty = False
+
+    # -- updates -----------------------------------------------------------
+
+    def push(self, close: float, ts: Optional[int] = None) -> None:
+        """Add a new bar: O(1) amortized. Non-finite closes are ignored."""
+        if not math.isfinite(close):
+            return
+        prev = self.closes.last
+        self.seq += 1
+        self.last_ts = ts
+        self.closes.push(close)
+        if self.closes.count >= 2 and prev:
+            self.returns.push(close / prev - 1.0)
+        for window in self.sma.values():
+            window.push(close)
+        for span in self.ema:
+            self._ema_prev[span] = self.ema[span]
+            self.ema[span] = self._ema_step(span, close, self._ema_prev[span])
+
+        oldest = self.seq - self.bars + 1
+        while self._peaks and self._peaks[0][0] < oldest:
+            self._peaks.popleft()
+        while self._peaks and self._peaks[-1][1] <= close:
+            self._peaks.pop()
+        self._peaks.append((self.seq, close))
+        if self._worst_peak >= 0 and self._worst_peak < oldest:
+            self._dirty = True  # the worst drawdown's peak left the window
+        if not self._dirty:
+            self._consider(self._peaks[0], close)
+
+    def amend_last(self, close: float, ts: Optional[int] = None) -> None:
+        """Revise the newest bar's close (intraday): O(1) except a window scan for the peak deque."""
+        if not math.isfinite(close):
+            return
+        if self.closes.count == 0:
+            self.push(close, ts)
+            return
+        if ts is not None:
+            self.last_ts = ts
+        self.closes.amend_last(close)
+        prev = self.closes.previous()
+        if self.closes.count >= 2 and prev:
+            self.returns.amend_last(close / prev - 1.0)
+        for window in self.sma.values():
+            window.amend_last(close)
+        for span in self.ema:
+            self.ema[span] = self._ema_step(span, close, self._ema_prev[span])
+        self._rebuild_peaks()
+        if self._worst_trough == self.seq or self._worst_peak == self.seq:
+            self._dirty = True
+        elif not self._dirty:
+            self._consider(self._peaks[0], close)
+
+    @staticmethod
+    def _ema_step(span: int, close: float, prev: float) -> float:
+        alpha = 2.0 / (span + 1.0)
+        return close if math.isnan(prev) else alpha * close + (1.0 - alpha) * prev
+
+    def _consider(self, peak: Tuple[int, float], close: float) -> None:
+        drawdown = close / peak[1] - 1.0 if peak[1] else 0.0
+        if drawdown < self._worst:
+            self._worst, self._worst_peak, self._worst_trough = drawdown, peak[0], self.seq
+
+    def _window(self) -> Iterable[Tuple[int, float]]:
+        values = self.closes.values()
+        first = self.seq - len(values) + 1
+        return zip(range(first, self.seq + 1), values)
+
+    def _rebuild_peaks(self) -> None:
+        self._peaks.clear()
+        for seq, close in self._window():
+            while self._peaks and self._peaks[-1][1] <= close:
+                self._peaks.pop()
+            self._peaks.append((seq, close))
+
+    def _recompute_worst(self) -> None:
+        self._worst, self._worst_peak, self._worst_trough = 0.0, -1, -1
+        peak = None
+        for seq, close in self._window():
+            if peak is None or close >= peak[1]:
+                peak = (seq, close)
+            elif peak[1]:
+                drawdown = close / peak[1] - 1.0
+                if drawdown < self._worst:
+                    self._worst, self._worst_peak, self._worst_trough = drawdown, peak[0], seq
+        self._dirty = False
+
+    # -- reads -------------------------------------------------------------
+
+    @property
+    def last_close(self) -> float:
+        return self.closes.last
+
+    def volatility_pct(self, periods_per_year: int = TRADING_DAYS_PER_YEAR) -> Optional[float]:
+        """Annualized sample std of returns over the window, in percent; None with fewer than two returns."""
+        if self.returns.count < 2:
+            return None
+        return math.sqrt(self.returns.variance(ddof=1)) * math.sqrt(periods_per_year) * 100.0
+
+    def max_drawdown_pct(self) -> Optional[float]:
+        """Worst peak-to-trough decline in the window, in percent (negative, 0 if none)."""
+        if self.closes.count == 0:
+            return None
+        if self._dirty:
+            self._recompute_worst()
+        return self._worst * 100.0
+
+    def sma_value(self, window: int) -> float:
+        ring = self.sma.get(window)
+        return ring.mean if ring is not None and ring.full else math.nan
+
+    def ema_value(self, span: int) -> float:
+        return self.ema.get(span, math.nan)
+
+    # -- serialization -----------------------------------------------------
+
+    def to_dict(self) -> dict:
+        """JSON-safe form: the window's closes plus EMA state (everything else is derived)."""
+        # SMA rings can reach further back than the window; keep whichever is longest.
+        source = max((self.closes, *self.sma.values()), key=lambda ring: ring.count)
+        return {
+            "symbol": self.symbol,
+            "period": self.period,
+            "bars": self.bars,
+            "last_ts": self.last_ts,
+            "closes": source.values(),
+            "ema": {str(k): v for k, v in self.ema.items()},
+            "ema_prev": {str(k): v for k, v in self._ema_prev.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SymbolState":
+        state = cls(data["symbol"], data["period"], data["bars"])
+        for close in data["closes"]:
+            state.push(close)
+        state.last_ts = data.get("last_ts")
+        state.ema = {int(k): float(v) for k, v in data["ema"].items()}
+        state._ema_prev = {int(k): float(v) for k, v in data["ema_prev"].items()}
+        return state
+
+    @classmethod
+    def from_closes(cls, symbol: str, period: str, closes, timestamps=None, bars: Optional[int] = None) -> "SymbolState":
+        """Seed from closes (O(n), once); the window holds bars closes (default: all of them)."""
+        closes = list(closes)
+        state = cls(symbol, period, bars or len(closes))
+        for i, close in enumerate(closes):
+            state.push(float(close), None if timestamps is None else int(timestamps[i]))
+        return state
+
+
+class IndicatorStates:
+    """SymbolStates keyed by (symbol, period), least recently used evicted past max_entries."""
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        self._states: "OrderedDict[Tuple[str, str], SymbolState]" = OrderedDict()
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self.seeds = 0
+        self.updates = 0
+        self.unchanged = 0
+
+    def sync(self, symbol: str, period: str, hist) -> SymbolState:
+        """
+        State for symbol over the last PERIOD_BARS[period] bars of hist (an OHLCV
+        frame covering at least that period), advanced to its last finite close.
+        """
+        key = (symbol.upper(), period)
+        closes = hist["Close"].to_numpy(dtype=float)
+        stamps = hist.index.asi8
+        finite = [i for i, c in enumerate(closes) if math.isfinite(c)]
+        if len(finite) != len(closes):
+            closes, stamps = closes[finite], stamps[finite]
+        bars = PERIOD_BARS.get(period)
+        if bars is not None and len(closes) > bars:
+            closes, stamps = closes[-bars:], stamps[-bars:]
+        with self._lock:
+            state = self._states.get(key)
+            if state is not None:
+                self._states.move_to_end(key)
+                if self._advance(state, closes, stamps, bars):
+                    return state
+            state = SymbolState.from_closes(symbol, period, closes, stamps, bars=bars)
+            self.seeds += 1
+            self._states[key] = state
+            while len(self._states) > self._max_entries:
+                self._states.popitem(last=False)
+            return state
+
+    def _advance(self, state: SymbolState, closes, stamps, bars: Optional[int]) -> bool:
+        """Apply the bars after state.last_ts; False when the state must be reseeded."""
+        if state.last_ts is None or not len(closes):
+            return False
+        if bars is None and len(closes) != state.bars:
+            return False  # window spans every bar given; its length changed
+        last = int(stamps[-1])
+        if last == state.last_ts:
+            if closes[-1] != state.last_close:
+                state.amend_last(float(closes[-1]))
+                self.updates += 1
+            else:
+                self.unchanged += 1
+            return True
+        pos = int(stamps.searchsorted(state.last_ts))
+        if pos >= len(stamps) or int(stamps[pos]) != state.last_ts:
+            return False
+        if closes[pos] != state.last_close:
+            state.amend_last(float(closes[pos]))  # the bar closed at a revised price
+        for i in range(pos + 1, len(closes)):
+            state.push(float(closes[i]), int(stamps[i]))
+        self.updates += 1
+        return True
+
+    def get(self, symbol: str, period: str) -> Optional[SymbolState]:
+        with self._lock:
+            return self._states.get((symbol.upper(), period))
+
+    def dump(self) -> List[dict]:
+        """Every state's to_dict(), e.g. to persist across restarts."""
+        with self._lock:
+            return [state.to_dict() for state in self._states.values()]
+
+    def load(self, items: Iterable[dict]) -> None:
+        for data in items:
+            state = SymbolState.from_dict(data)
+            with self._lock:
+                self._states[(state.symbol, state.period)] = state
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"states": len(self._states), "seeds": self.seeds, "updates": self.updates, "unchanged": self.unchanged}
+
+
+_states: Optional[IndicatorStates] = None
+
+
+def get_indicator_states() -> IndicatorStates:
+    """Process-wide incremental indicator states."""
+    global _states
+    if _states is None:
+        _states = IndicatorStates()
+    return _states
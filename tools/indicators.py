@@ -0,0 +1,249 @@
+"""Vectorized indicator engine over a 2-D price matrix (symbols x bars).
+
+Rows are symbols and columns are bars in time order. Shorter histories are
+left-padded with NaN. Every indicator is computed for all rows at once with
+NumPy, so screening hundreds of tickers costs about as much as one ticker.
+Tools in technical_tools.py and risk_tools.py read single rows from here.
+"""
+from functools import cached_property
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def _as_matrix(prices) -> np.ndarray:
+    arr = np.asarray(prices, dtype=float)
+    if arr.ndim == 1:
+        arr = arr[None, :]
+    if arr.ndim != 2:
+        raise ValueError("prices must be a 1-D series or a 2-D (symbols x bars) matrix")
+    return arr
+
+
+def sma(prices: np.ndarray, window: int) -> np.ndarray:
+    """Simple moving average; NaN until a full window of valid bars is available."""
+    x = _as_matrix(prices)
+    out = np.full_like(x, np.nan)
+    if window <= 0 or x.shape[1] < window:
+        return out
+    windows = np.lib.stride_tricks.sliding_window_view(x, window, axis=1)
+    out[:, window - 1:] = windows.mean(axis=-1)
+    return out
+
+
+def rolling_std(prices: np.ndarray, window: int, ddof: int = 0) -> np.ndarray:
+    """Rolling standard deviation over window bars."""
+    x = _as_matrix(prices)
+    out = np.full_like(x, np.nan)
+    if window <= ddof or x.shape[1] < window:
+        return out
+    windows = np.lib.stride_tricks.sliding_window_view(x, window, axis=1)
+    out[:, window - 1:] = windows.std(axis=-1, ddof=ddof)
+    return out
+
+
+def ewm(prices: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    Exponentially weighted mean (recursive form, like pandas ewm(adjust=False)).
+    Each row starts at its first valid bar; NaN bars carry the previous value.
+    """
+    x = _as_matrix(prices)
+    out = np.empty_like(x)
+    prev = np.full(x.shape[0], np.nan)
+    for t in range(x.shape[1]):
+        xt = x[:, t]
+        step = alpha * xt + (1.0 - alpha) * prev
+        prev = np.where(np.isnan(prev), xt, np.where(np.isnan(xt), prev, step))
+        out[:, t] = prev
+    return out
+
+
+def ema(prices: np.ndarray, span: int) -> np.ndarray:
+    """Exponential moving average with the usual span convention (alpha = 2 / (span + 1))."""
+    return ewm(prices, 2.0 / (span + 1.0))
+
+
+def rsi(prices: np.ndarray, window: int = 14) -> np.ndarray:
+    """Wilder's RSI (0-100); NaN until window price changes are available."""
+    x = _as_matrix(prices)
+    out = np.full_like(x, np.nan)
+    if x.shape[1] < 2:
+        return out
+    delta = np.diff(x, axis=1)
+    gains = ewm(np.where(delta > 0, delta, np.where(np.isnan(delta), np.nan, 0.0)), 1.0 / window)
+    losses = ewm(np.where(delta < 0, -delta, np.where(np.isnan(delta), np.nan, 0.0)), 1.0 / window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = np.where(losses == 0, 100.0, 100.0 - 100.0 / (1.0 + gains / losses))
+    enough = np.cumsum(~np.isnan(delta), axis=1) >= window
+    out[:, 1:] = np.where(enough, values, np.nan)
+    return out
+
+
+def simple_returns(prices: np.ndarray) -> np.ndarray:
+    """Bar-to-bar simple returns, shape (symbols, bars - 1)."""
+    x = _as_matrix(prices)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return x[:, 1:] / x[:, :-1] - 1.0
+
+
+def annualized_volatility_pct(prices: np.ndarray, periods_per_year: int = TRADING_DAYS_PER_YEAR) -> np.ndarray:
+    """Sample std of simple returns, annualized, in percent; NaN with fewer than two returns."""
+    returns = simple_returns(prices)
+    valid = np.sum(~np.isnan(returns), axis=1)
+    out = np.full(returns.shape[0], np.nan)
+    ok = valid >= 2
+    if ok.any():
+        out[ok] = np.nanstd(returns[ok], axis=1, ddof=1) * np.sqrt(periods_per_year) * 100.0
+    return out
+
+
+def max_drawdown_pct(prices: np.ndarray) -> np.ndarray:
+    """Worst peak-to-trough decline in percent (a negative number, 0 if none)."""
+    x = _as_matrix(prices)
+    peaks = np.fmax.accumulate(x, axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdown = x / peaks - 1.0
+    out = np.full(x.shape[0], np.nan)
+    ok = np.any(~np.isnan(drawdown), axis=1)
+    if ok.any():
+        out[ok] = np.nanmin(drawdown[ok], axis=1) * 100.0
+    return out
+
+
+def last_valid(values: np.ndarray) -> np.ndarray:
+    """Last non-NaN value of each row (NaN when a row has none)."""
+    x = _as_matrix(values)
+    valid = ~np.isnan(x)
+    idx = x.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+    out = x[np.arange(x.shape[0]), idx]
+    out[~valid.any(axis=1)] = np.nan
+    return out
+
+
+def _calendar_dates(series):
+    """series re-indexed by local calendar date (each exchange's own timezone), last bar per date kept."""
+    index = series.index
+    if getattr(index, "tz", None) is not None:
+        index = index.tz_localize(None)
+    out = series.set_axis(index.normalize())
+    return out[~out.index.duplicated(keep="last")]
+
+
+def align_closes(closes: Mapping[str, object], calendar: bool = False) -> Tuple[List[str], np.ndarray]:
+    """
+    Build a (symbols x bars) matrix from {symbol: pandas Series of closes}.
+    Series are aligned on the union of their dates; missing bars are NaN.
+
+    With calendar=True (for cross-exchange return comparisons), bars are keyed
+    by local calendar date so different timezones line up, gaps such as one
+    exchange's holiday carry the last close forward, and dates before every
+    series has started are dropped: the matrix has no NaNs.
+    """
+    import pandas as pd
+
+    symbols = list(closes)
+    if not symbols:
+        return [], np.empty((0, 0))
+    series = [_calendar_dates(closes[s]) if calendar else closes[s] for s in symbols]
+    frame = pd.concat(series, axis=1, keys=symbols, sort=True)
+    if calendar:
+        frame = frame.ffill().dropna()
+    return symbols, frame.to_numpy(dtype=float).T
+
+
+class IndicatorEngine:
+    """
+    Indicators for every row of a price matrix. Each indicator is computed
+    vectorized across all symbols on first access and then reused; compute_all()
+    fills every indicator in one pass for screening.
+    """
+
+    def __init__(
+        self,
+        prices,
+        symbols: Optional[Iterable[str]] = None,
+        sma_windows: Iterable[int] = (20, 50),
+        ema_spans: Iterable[int] = (12, 26),
+        rsi_window: int = 14,
+        macd_spans: Tuple[int, int, int] = (12, 26, 9),
+        bollinger_window: int = 20,
+        bollinger_k: float = 2.0,
+        periods_per_year: int = TRADING_DAYS_PER_YEAR,
+    ) -> None:
+        self.prices = _as_matrix(prices)
+        self.symbols = list(symbols) if symbols is not None else None
+        self.sma_windows = tuple(sma_windows)
+        self.ema_spans = tuple(ema_spans)
+        self.rsi_window = rsi_window
+        self.macd_spans = macd_spans
+        self.bollinger_window = bollinger_window
+        self.bollinger_k = bollinger_k
+        self.periods_per_year = periods_per_year
+
+    @classmethod
+    def from_closes(cls, closes: Mapping[str, object], **kwargs) -> "IndicatorEngine":
+        """Build from {symbol: pandas Series of closes}."""
+        symbols, matrix = align_closes(closes)
+        return cls(matrix, symbols=symbols, **kwargs)
+
+    @cached_property
+    def sma(self) -> Dict[int, np.ndarray]:
+        return {w: sma(self.prices, w) for w in self.sma_windows}
+
+    @cached_property
+    def ema(self) -> Dict[int, np.ndarray]:
+        spans = set(self.ema_spans) | set(self.macd_spans[:2])
+        return {s: ema(self.prices, s) for s in sorted(spans)}
+
+    @cached_property
+    def rsi(self) -> np.ndarray:
+        return rsi(self.prices, self.rsi_window)
+
+    @cached_property
+    def macd(self) -> Dict[str, np.ndarray]:
+        fast, slow, signal = self.macd_spans
+        line = self.ema[fast] - self.ema[slow]
+        signal_line = ema(line, signal)
+        return {"macd": line, "signal": signal_line, "histogram": line - signal_line}
+
+    @cached_property
+    def bollinger(self) -> Dict[str, np.ndarray]:
+        middle = sma(self.prices, self.bollinger_window)
+        band = self.bollinger_k * rolling_std(self.prices, self.bollinger_window)
+        return {"middle": middle, "upper": middle + band, "lower": middle - band}
+
+    @cached_property
+    def volatility_pct(self) -> np.ndarray:
+        return annualized_volatility_pct(self.prices, self.periods_per_year)
+
+    @cached_property
+    def max_drawdown_pct(self) -> np.ndarray:
+        return max_drawdown_pct(self.prices)
+
+    def compute_all(self) -> "IndicatorEngine":
+        """Evaluate every indicator now (e.g. before screening)."""
+        for name in ("sma", "ema", "rsi", "macd", "bollinger", "volatility_pct", "max_drawdown_pct"):
+            getattr(self, name)
+        return self
+
+    def latest(self) -> List[dict]:
+        """Most recent value of every indicator, one dict per symbol."""
+        self.compute_all()
+        close = last_valid(self.prices)
+        columns = {"close": close}
+        columns.update({f"sma_{w}": last_valid(v) for w, v in self.sma.items()})
+        columns.update({f"ema_{s}": last_valid(v) for s, v in self.ema.items()})
+        columns["rsi"] = last_valid(self.rsi)
+        columns.update({f"macd_{k}" if k != "macd" else "macd": last_valid(v) for k, v in self.macd.items()})
+        columns.update({f"bb_{k}": last_valid(v) for k, v in self.bollinger.items()})
+        columns["volatility_pct"] = self.volatility_pct
+        columns["max_drawdown_pct"] = self.max_drawdown_pct
+        rows = []
+        for i in range(self.prices.shape[0]):
+            row = {k: (None if np.isnan(v[i]) else float(v[i])) for k, v in columns.items()}
+            if self.symbols is not None:
+                row["symbol"] = self.symbols[i]
+            rows.append(row)
+        return rows
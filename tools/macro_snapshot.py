@@ -0,0 +1,180 @@
+"""In-memory snapshot of macro indicators, refreshed in the background.
+
+Macro tickers (yields, dollar index, VIX, S&P 500) are global: every request
+reads the same values. The snapshot downloads all of them in one bulk provider
+call and get_macro_indicators reads the latest close from memory, together with
+the snapshot's age. The API lifespan keeps it fresh with start_refresher();
+without one (CLI runs), the first read fills it and later reads trigger a
+background refresh once it is older than MACRO_MAX_AGE_SECONDS.
+"""
+import asyncio
+import os
+import time
+from typing import Dict, Optional
+
+from .singleflight import SingleFlight
+
+# Indicator name -> Yahoo Finance ticker
+MACRO_TICKERS = {
+    "TREASURY_YIELD_10Y": "^TNX",
+    "TREASURY_YIELD_2Y": "^IRX",
+    "DXY": "DX-Y.NYB",
+    "VIX": "^VIX",
+    "SP500": "^GSPC",
+}
+DEFAULT_TICKER = "^TNX"
+
+
+def _get_refresh_seconds() -> float:
+    return float(os.getenv("MACRO_REFRESH_SECONDS", "300"))
+
+
+def _get_max_age_seconds() -> float:
+    return float(os.getenv("MACRO_MAX_AGE_SECONDS", "900"))
+
+
+def ticker_for(indicator: str) -> str:
+    return MACRO_TICKERS.get(indicator.upper(), DEFAULT_TICKER)
+
+
+class MacroSnapshot:
+    """Latest close per macro ticker plus when it was fetched; merged and swapped atomically on refresh."""
+
+    def __init__(self, tickers: Optional[Dict[str, str]] = None, period: str = "5d") -> None:
+        self.tickers = dict(tickers or MACRO_TICKERS)
+        self.period = period
+        self._readings: Dict[str, dict] = {}
+        self.refreshed_at: Optional[float] = None
+        self.refreshes = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+        self._flight = SingleFlight()
+        self._pending: Optional[asyncio.Task] = None
+        self._refresher: Optional[asyncio.Task] = None
+
+    def age_seconds(self) -> Optional[float]:
+        return None if self.refreshed_at is None else time.time() - self.refreshed_at
+
+    def stale(self) -> bool:
+        age = self.age_seconds()
+        return age is None or age > _get_max_age_seconds()
+
+    def clear(self) -> None:
+        """Drop readings (e.g. after the provider changes); the next read refetches."""
+        self._readings = {}
+        self.refreshed_at = None
+
+    def reading(self, ticker: str) -> Optional[dict]:
+        """{"close", "as_of"} for ticker, or None if the last download lacked it."""
+        return self._readings.get(ticker)
+
+    async def refresh(self) -> None:
+        """Download every ticker in one bulk call; concurrent callers share it."""
+        await self._flight.do("refresh", self._refresh)
+
+    async def _refresh(self) -> None:
+        from .market_data import get_market_data
+
+        md = get_market_data()
+        tickers = sorted(set(self.tickers.values()))
+        try:
+            frames = await md.run(md.provider.bulk_history, tickers, self.period)
+        except Exception as e:
+            self.errors += 1
+            self.last_error = repr(e)[:200]
+            raise
+        # Bulk downloads return empty or partial frames rather than raising; keep
+        # the previous reading for any ticker missing from this one.
+        fresh = {}
+        for ticker, hist in frames.items():
+            if hist is None or hist.empty:
+                continue
+            last = hist.index[-1]
+            fresh[ticker] = {
+                "close": float(hist["Close"].iloc[-1]),
+                "as_of": last.strftime("%Y-%m-%d") if hasattr(last, "strftime") else str(last),
+            }
+        if not fresh:
+            self.errors += 1
+            self.last_error = "bulk download returned no data"
+            raise RuntimeError(f"macro refresh returned no data for {', '.join(tickers)}")
+        readings = dict(self._readings)
+        readings.update(fresh)
+        self._readings = readings
+        self.refreshed_at = time.time()
+        self.refreshes += 1
+
+    async def ensure_fresh(self) -> None:
+        """Fill an empty snapshot now; refresh a stale one in the background."""
+        if self.refreshed_at is None:
+            await self.refresh()
+        elif self.stale() and self._pending is None and self._refresher is None:
+            self._pending = asyncio.ensure_future(self._background_refresh())
+
+    async def _background_refresh(self) -> None:
+        try:
+            await self.refresh()
+        except Exception:
+            pass  # counted in errors; readers keep the previous snapshot
+        finally:
+            self._pending = None
+
+    async def _refresh_loop(self, interval: float) -> None:
+        failures = 0
+        while True:
+            age = self.age_seconds()
+            if age is not None and age < interval:
+                await asyncio.sleep(interval - age)  # e.g. just filled by warmup
+            try:
+                await self.refresh()
+                failures = 0
+            except Exception:
+                # Counted in errors; readers keep the previous snapshot. The snapshot
+                # is already due, so back off (30s, doubling, at most interval).
+                failures += 1
+                await asyncio.sleep(min(interval, 30.0 * 2 ** min(failures - 1, 10)))
+
+    def start_refresher(self, interval: Optional[float] = None) -> Optional[asyncio.Task]:
+        """Refresh every interval seconds (MACRO_REFRESH_SECONDS) until stop_refresher(); 0 disables."""
+        interval = _get_refresh_seconds() if interval is None else interval
+        if interval <= 0 or self._refresher is not None:
+            return self._refresher
+        self._refresher = asyncio.ensure_future(self._refresh_loop(interval))
+        return self._refresher
+
+    async def stop_refresher(self) -> None:
+        task, self._refresher = self._refresher, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    def stats(self) -> dict:
+        age = self.age_seconds()
+        return {
+            "refreshed_at": self.refreshed_at,
+            "age_s": None if age is None else round(age, 1),
+            "stale": self.stale(),
+            "tickers": len(self._readings),
+            "refreshes": self.refreshes,
+            "errors": self.errors,
+            "last_error": self.last_error,
+        }
+
+
+_snapshot: Optional[MacroSnapshot] = None
+
+
+def get_macro_snapshot() -> MacroSnapshot:
+    """Process-wide macro snapshot."""
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = MacroSnapshot()
+    return _snapshot
+
+
+def set_macro_snapshot(snapshot: Optional[MacroSnapshot]) -> None:
+    global _snapshot
+    _snapshot = snapshot
@@ -0,0 +1,72 @@
+"""Prefetch a MarketDataBundle for a security by running the data tools concurrently.
+
+Tools are called through their memoized wrappers, so analysts asking for the same
+data later in the run are served from memory.
+"""
+import asyncio
+from typing import Iterable, List, Optional
+
+from schemas import MarketDataBundle
+
+from .fundamental_tools import (
+    get_earnings_summary,
+    get_income_statement_summary,
+    get_balance_sheet_summary,
+    get_macro_indicators,
+)
+from .memo import memoized
+from .technical_tools import (
+    get_price_history,
+    get_volume_analysis,
+    get_moving_averages,
+    get_price_summary,
+)
+
+TECHNICAL_FIELDS = ["price_summary", "price_history", "moving_averages", "volume"]
+FUNDAMENTAL_FIELDS = ["earnings", "income_statement", "balance_sheet", "macro"]
+MACRO_INDICATORS = ["TREASURY_YIELD_10Y", "TREASURY_YIELD_2Y", "DXY", "VIX", "SP500"]
+
+
+def _usable(text: str) -> Optional[str]:
+    """Drop failed fetches so the analyst falls back to calling the tool itself."""
+    if not text or text.startswith(("Error", "No ", "Insufficient")):
+        return None
+    return text
+
+
+async def fetch_macro(indicators: Iterable[str] = MACRO_INDICATORS) -> List[str]:
+    """Latest reading for each macro indicator, fetched concurrently."""
+    results = await asyncio.gather(*(memoized(get_macro_indicators)(name) for name in indicators))
+    return [r for r in results if _usable(r)]
+
+
+async def build_market_data_bundle(
+    security: str,
+    fields: Iterable[str],
+    macro: Optional[List[str]] = None,
+) -> MarketDataBundle:
+    """
+    Fetch the requested bundle fields for security concurrently. Pass macro to
+    reuse readings already fetched (e.g. once per batch).
+    """
+    symbol = security.upper()
+    fetchers = {
+        "price_summary": lambda: memoized(get_price_summary)(symbol, "1mo"),
+        "price_history": lambda: memoized(get_price_history)(symbol, "1mo"),
+        "moving_averages": lambda: memoized(get_moving_averages)(symbol, "3mo"),
+        "volume": lambda: memoized(get_volume_analysis)(symbol, "1mo"),
+        "earnings": lambda: memoized(get_earnings_summary)(symbol),
+        "income_statement": lambda: memoized(get_income_statement_summary)(symbol, "yearly"),
+        "balance_sheet": lambda: memoized(get_balance_sheet_summary)(symbol, "yearly"),
+    }
+    fields = list(dict.fromkeys(fields))
+    wanted = [f for f in fields if f in fetchers]
+    fetch_macro_now = "macro" in fields and macro is None
+    results = await asyncio.gather(
+        *(fetchers[f]() for f in wanted),
+        *([fetch_macro()] if fetch_macro_now else []),
+    )
+    data = {f: _usable(r) for f, r in zip(wanted, results)}
+    if "macro" in fields:
+        data["macro"] = results[-1] if fetch_macro_now else macro
+    return MarketDataBundle(security=symbol, **data)
@@ -0,0 +1,414 @@
+"""Pluggable market-data providers behind an async facade.
+
+Providers expose blocking fetches (Yahoo Finance, local fixtures). Tools never call
+them directly: they await AsyncMarketData, which serves price history from the
+shared HistoryCache and runs every blocking fetch in a bounded thread pool, with
+a per-host concurrency limit, so a slow upstream call never stalls the event loop.
+"""
+import asyncio
+import functools
+import os
+import threading
+import weakref
+import zlib
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from .fundamentals_store import get_fundamentals_store
+from .history_cache import PERIOD_DAYS, _slice_period, get_history_cache
+from .singleflight import SingleFlight
+
+
+def _get_provider_name() -> str:
+    return os.getenv("MARKET_DATA_PROVIDER", "yfinance").lower()
+
+
+def _get_max_workers() -> int:
+    return int(os.getenv("MARKET_DATA_MAX_WORKERS", "8"))
+
+
+def _get_per_host_limit() -> int:
+    return int(os.getenv("MARKET_DATA_PER_HOST_LIMIT", "4"))
+
+
+class MarketDataProvider(ABC):
+    """Blocking source of prices and fundamentals. Implementations must be thread-safe."""
+
+    # Upstream host; the async facade limits concurrent calls per host.
+    host: str = "local"
+
+    @abstractmethod
+    def history(self, symbol: str, period: str):
+        """OHLCV DataFrame (Open, High, Low, Close, Volume) indexed by date."""
+
+    @abstractmethod
+    def info(self, symbol: str) -> dict:
+        """Quote/profile fields in Yahoo Finance `info` naming."""
+
+    @abstractmethod
+    def earnings_dates(self, symbol: str):
+        """Recent and upcoming earnings dates DataFrame, most recent first."""
+
+    @abstractmethod
+    def income_statement(self, symbol: str, quarterly: bool = False):
+        """Income statement DataFrame: line items x period end dates, most recent first."""
+
+    @abstractmethod
+    def balance_sheet(self, symbol: str, quarterly: bool = False):
+        """Balance sheet DataFrame: line items x period end dates, most recent first."""
+
+    def bulk_history(self, symbols: list, period: str) -> dict:
+        """OHLCV per symbol in as few upstream calls as possible (default: one call per symbol)."""
+        return {symbol: self.history(symbol, period) for symbol in symbols}
+
+
+class YFinanceProvider(MarketDataProvider):
+    """Yahoo Finance via yfinance."""
+
+    host = "finance.yahoo.com"
+
+    def _ticker(self, symbol: str):
+        try:
+            import yfinance as yf
+        except ImportError:
+            raise RuntimeError("yfinance not installed. pip install yfinance")
+        return yf.Ticker(symbol.upper())
+
+    def history(self, symbol: str, period: str):
+        return self._ticker(symbol).history(period=period)
+
+    def bulk_history(self, symbols: list, period: str) -> dict:
+        """
+        One yf.download request for every symbol, shaped like history(): adjusted
+        closes with dividends and splits, indexed in the exchange's timezone.
+        """
+        try:
+            import yfinance as yf
+        except ImportError:
+            raise RuntimeError("yfinance not installed. pip install yfinance")
+        import pandas as pd
+
+        frame = yf.download(
+            list(symbols), period=period, group_by="ticker", progress=False, threads=True,
+            auto_adjust=True, actions=True, ignore_tz=True,
+        )
+        result = {}
+        for symbol in symbols:
+            if isinstance(frame.columns, pd.MultiIndex):
+                if symbol not in frame.columns.get_level_values(0):
+                    continue
+                part = frame[symbol]
+            else:
+                part = frame
+            # Tickers trade on different calendars; drop the other tickers' days.
+            part = part.dropna(subset=["Close"])
+            if part.index.tz is None:
+                tz = self._exchange_tz(symbol)
+                if tz:
+                    part = part.tz_localize(tz)
+            result[symbol] = part
+        return result
+
+    def _exchange_tz(self, symbol: str) -> Optional[str]:
+        # yfinance caches each ticker's timezone (download just looked it up).
+        try:
+            return self._ticker(symbol).fast_info["timezone"]
+        except Exception:
+            return None
+
+    def info(self, symbol: str) -> dict:
+        info = self._ticker(symbol).info
+        return info if isinstance(info, dict) else {}
+
+    def earnings_dates(self, symbol: str):
+        return self._ticker(symbol).get_earnings_dates()
+
+    def income_statement(self, symbol: str, quarterly: bool = False):
+        t = self._ticker(symbol)
+        return t.quarterly_income_stmt if quarterly else t.income_stmt
+
+    def balance_sheet(self, symbol: str, quarterly: bool = False):
+        t = self._ticker(symbol)
+        return t.quarterly_balance_sheet if quarterly else t.balance_sheet
+
+
+class FixtureProvider(MarketDataProvider):
+    """
+    Deterministic offline provider. Price history is read from
+    <fixture_dir>/<SYMBOL>.csv when present (Date column plus OHLCV), otherwise
+    generated from a random walk seeded by the symbol and anchored at end_date,
+    so the same symbol always yields the same data.
+    """
+
+    host = "fixture"
+    _MAX_BARS = 2520  # ~10 years of trading days
+
+    def __init__(self, fixture_dir: Optional[str] = None, end_date: str = "2024-12-31") -> None:
+        self._fixture_dir = fixture_dir if fixture_dir is not None else os.getenv("MARKET_DATA_FIXTURE_DIR", "")
+        self._end_date = end_date
+        self._frames: dict = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _seed(symbol: str) -> int:
+        return zlib.crc32(symbol.upper().encode())
+
+    def _full_history(self, symbol: str):
+        key = symbol.upper()
+        with self._lock:
+            frame = self._frames.get(key)
+        if frame is not None:
+            return frame
+        frame = self._load_csv(key)
+        if frame is None:
+            frame = self._generate(key)
+        with self._lock:
+            self._frames[key] = frame
+        return frame
+
+    def _load_csv(self, symbol: str):
+        if not self._fixture_dir:
+            return None
+        path = os.path.join(self._fixture_dir, f"{symbol}.csv")
+        if not os.path.exists(path):
+            return None
+        import pandas as pd
+
+        frame = pd.read_csv(path, index_col=0, parse_dates=True)
+        return frame.sort_index()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=8)
+    def _index(end_date: str, periods: int):
+        import pandas as pd
+
+        # Shared by every generated symbol; building it is most of the generation cost.
+        return pd.bdate_range(end=end_date, periods=periods, tz="America/New_York")
+
+    def _generate(self, symbol: str):
+        import numpy as np
+        import pandas as pd
+
+        seed = self._seed(symbol)
+        rng = np.random.default_rng(seed)
+        index = self._index(self._end_date, self._MAX_BARS)
+        start_price = 20.0 + seed % 480
+        drift = rng.normal(0.0003, 0.0002)
+        vol = 0.01 + (seed % 25) / 1000.0
+        close = start_price * np.exp(np.cumsum(rng.normal(drift, vol, len(index))))
+        open_ = close * (1.0 + rng.normal(0.0, vol / 4, len(index)))
+        high = np.maximum(open_, close) * (1.0 + np.abs(rng.normal(0.0, vol / 2, len(index))))
+        low = np.minimum(open_, close) * (1.0 - np.abs(rng.normal(0.0, vol / 2, len(index))))
+        volume = rng.integers(1_000_000, 50_000_000, len(index)).astype(float)
+        return pd.DataFrame(
+            {"Open": open_, "High": high, "Low": low, "Close": close, "Volume": volume},
+            index=index,
+        )
+
+    def history(self, symbol: str, period: str):
+        if period not in PERIOD_DAYS:
+            raise ValueError(f"Unsupported period: {period!r}")
+        return _slice_period(self._full_history(symbol), period).copy()
+
+    def info(self, symbol: str) -> dict:
+        hist = self._full_history(symbol)
+        seed = self._seed(symbol)
+        last = float(hist["Close"].iloc[-1])
+        return {
+            "symbol": symbol.upper(),
+            "regularMarketPrice": round(last, 2),
+            "averageVolume": int(hist["Volume"].tail(63).mean()),
+            "earningsQuarterlyGrowth": round((seed % 61 - 20) / 100.0, 3),
+            "earningsGrowth": round((seed % 41 - 10) / 100.0, 3),
+            "targetMeanPrice": round(last * (1.0 + (seed % 31 - 10) / 100.0), 2),
+        }
+
+    def _period_ends(self, quarterly: bool, count: int = 4):
+        import pandas as pd
+
+        freq = "QE" if quarterly else "YE"
+        try:
+            return list(pd.date_range(end=self._end_date, periods=count, freq=freq)[::-1])
+        except ValueError:  # pandas < 2.2 spells the aliases "Q" / "A"
+            return list(pd.date_range(end=self._end_date, periods=count, freq=freq[0] if quarterly else "A")[::-1])
+
+    def _statement(self, symbol: str, rows: dict, quarterly: bool):
+        import pandas as pd
+
+        seed = self._seed(symbol)
+        scale = (1 + seed % 200) * (1e8 if quarterly else 4e8)
+        ends = self._period_ends(quarterly)
+        data = {
+            end: {label: round(scale * ratio * (1.0 - 0.03 * i), 0) for label, ratio in rows.items()}
+            for i, end in enumerate(ends)
+        }
+        return pd.DataFrame(data)
+
+    def earnings_dates(self, symbol: str):
+        import pandas as pd
+
+        seed = self._seed(symbol)
+        ends = self._period_ends(quarterly=True, count=4)
+        dates = [end + pd.Timedelta(days=28) for end in ends]
+        eps = [round(1.0 + (seed % 300) / 100.0 - 0.05 * i, 2) for i in range(len(dates))]
+        return pd.DataFrame(
+            {
+                "EPS Estimate": [round(e * 0.97, 2) for e in eps],
+                "Reported EPS": eps,
+                "Surprise(%)": [round((e / (e * 0.97) - 1) * 100, 2) for e in eps],
+            },
+            index=pd.DatetimeIndex(dates, name="Earnings Date"),
+        )
+
+    def income_statement(self, symbol: str, quarterly: bool = False):
+        return self._statement(
+            symbol,
+            {"Total Revenue": 1.0, "Gross Profit": 0.42, "Operating Income": 0.25, "Net Income": 0.18},
+            quarterly,
+        )
+
+    def balance_sheet(self, symbol: str, quarterly: bool = False):
+        return self._statement(
+            symbol,
+            {"Total Assets": 3.0, "Total Liabilities Net Minority Interest": 1.8, "Stockholders Equity": 1.2},
+            quarterly,
+        )
+
+
+PROVIDERS: dict[str, Callable[[], MarketDataProvider]] = {
+    "yfinance": YFinanceProvider,
+    "fixture": FixtureProvider,
+}
+
+
+class AsyncMarketData:
+    """
+    Async facade over a MarketDataProvider. Price history goes through the shared
+    HistoryCache (hits are served on the event loop) and fundamentals through the
+    on-disk FundamentalsStore (read in the thread pool); provider calls run
+    in a bounded thread pool with at most per_host_limit calls in flight per host.
+    Concurrent identical fetches share one in-flight call.
+    """
+
+    def __init__(
+        self,
+        provider: MarketDataProvider,
+        max_workers: Optional[int] = None,
+        per_host_limit: Optional[int] = None,
+    ) -> None:
+        self.provider = provider
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or _get_max_workers(),
+            thread_name_prefix="market-data",
+        )
+        self._per_host_limit = per_host_limit or _get_per_host_limit()
+        # asyncio semaphores are bound to one event loop, so keep one set per loop.
+        self._host_slots: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+        self.flights = SingleFlight()
+
+    def _slot(self, loop: asyncio.AbstractEventLoop, host: str) -> asyncio.Semaphore:
+        slots = self._host_slots.setdefault(loop, {})
+        if host not in slots:
+            slots[host] = asyncio.Semaphore(self._per_host_limit)
+        return slots[host]
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Run a blocking provider call in the executor under the provider's host limit."""
+        loop = asyncio.get_running_loop()
+        async with self._slot(loop, self.provider.host):
+            return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    async def run_local(self, fn: Callable, *args):
+        """Run blocking local I/O (e.g. fundamentals store reads) in the executor, outside the host limit."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(fn, *args))
+
+    async def _coalesced(self, key: tuple, fn: Callable, *args):
+        return await self.flights.do(key, lambda: self.run(fn, *args))
+
+    async def history(self, symbol: str, period: str = "1mo"):
+        cache = get_history_cache()
+        cached = cache.peek(symbol, period)
+        if cached is not None:
+            return cached
+        return await self._coalesced(("history", symbol.upper(), period), cache.get_history, symbol, period)
+
+    async def _fundamentals(self, kind: str, symbol: str, fn: Callable, *args):
+        """Serve from the fundamentals store while its period is current; else fetch and store."""
+        source = self.provider.host
+        store = None
+        try:
+            store = get_fundamentals_store()
+            stored = None if store is None else await self.run_local(store.get, source, symbol, kind)
+        except Exception as e:  # unreadable store: fall back to the provider
+            if store is not None:
+                store.record_error("get", e)
+            stored = None
+        if stored is not None:
+            return stored
+
+        def fetch():
+            value = fn(symbol, *args)
+            if store is not None:
+                try:
+                    store.put(source, symbol, kind, value)
+                except Exception as e:
+                    store.record_error("put", e)
+            return value
+
+        return await self._coalesced((kind, symbol.upper()), fetch)
+
+    async def info(self, symbol: str) -> dict:
+        return await self._fundamentals("info", symbol, self.provider.info)
+
+    async def earnings_dates(self, symbol: str):
+        return await self._fundamentals("earnings_dates", symbol, self.provider.earnings_dates)
+
+    async def income_statement(self, symbol: str, quarterly: bool = False):
+        kind = "income_quarterly" if quarterly else "income_yearly"
+        return await self._fundamentals(kind, symbol, self.provider.income_statement, quarterly)
+
+    async def balance_sheet(self, symbol: str, quarterly: bool = False):
+        kind = "balance_quarterly" if quarterly else "balance_yearly"
+        return await self._fundamentals(kind, symbol, self.provider.balance_sheet, quarterly)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+_provider: Optional[MarketDataProvider] = None
+_market_data: Optional[AsyncMarketData] = None
+
+
+def get_provider() -> MarketDataProvider:
+    """Singleton provider selected by MARKET_DATA_PROVIDER (yfinance | fixture)."""
+    global _provider
+    if _provider is None:
+        name = _get_provider_name()
+        if name not in PROVIDERS:
+            raise ValueError(f"Unknown MARKET_DATA_PROVIDER: {name!r}")
+        _provider = PROVIDERS[name]()
+    return _provider
+
+
+def set_provider(provider: MarketDataProvider) -> None:
+    """Swap the provider (e.g. fixtures for offline runs); clears cached history, indicator states and macro readings."""
+    global _provider, _market_data
+    from .incremental import get_indicator_states
+    from .macro_snapshot import get_macro_snapshot
+
+    _provider = provider
+    if _market_data is not None:
+        _market_data.shutdown()
+        _market_data = None
+    get_history_cache().invalidate()
+    get_indicator_states().clear()
+    get_macro_snapshot().clear()
+
+
+def get_market_data() -> AsyncMarketData:
+    """Singleton async facade over the current provider."""
+    global _market_data
+    if _market_data is None:
+        _market_data = AsyncMarketData(get_provider())
+    return _market_data
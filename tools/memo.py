@@ -0,0 +1,187 @@
+"""Per-run memoization of tool calls keyed by (tool, normalized args).
+
+memoized(tool) returns a wrapper with the same signature, so agents can register it
+in place of the tool. Arguments are normalized (symbol/indicator upper-cased,
+period lower-cased, defaults filled in) so get_price_summary("aapl") and
+get_price_summary("AAPL", "1mo") share one result. Results are reused within a
+tool_memo_scope() (one workflow run) and, for TOOL_MEMO_TTL_SECONDS, across runs.
+Error results are never reused. Each call emits tool_call/tool_result trace
+events (with cache_hit) when a trace scope is active.
+"""
+import asyncio
+import functools
+import inspect
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .tracing import payload_bytes, span, tracing_enabled
+from .ttl_cache import TTLCache
+
+_UPPER_ARGS = {"symbol", "indicator"}
+_LOWER_ARGS = {"period"}
+
+_run_scope: ContextVar[Optional[dict]] = ContextVar("tool_memo_run_scope", default=None)
+_wrappers: Dict[Callable, Callable] = {}
+_stats: Dict[str, Dict[str, int]] = {}
+_stats_lock = threading.Lock()
+_cross_run: Optional[TTLCache] = None
+
+
+def _get_ttl_seconds() -> float:
+    return float(os.getenv("TOOL_MEMO_TTL_SECONDS", "60"))
+
+
+def _get_cross_run_cache() -> Optional[TTLCache]:
+    global _cross_run
+    ttl = _get_ttl_seconds()
+    if ttl <= 0:
+        return None
+    if _cross_run is None:
+        _cross_run = TTLCache(maxsize=int(os.getenv("TOOL_MEMO_MAX_ENTRIES", "4096")), ttl_seconds=ttl)
+    return _cross_run
+
+
+def _count(tool: str, outcome: str) -> None:
+    with _stats_lock:
+        counters = _stats.setdefault(tool, {"hits": 0, "misses": 0})
+        counters[outcome] += 1
+
+
+def _cacheable(result) -> bool:
+    return not (isinstance(result, str) and result.startswith("Error"))
+
+
+def _record(end: dict, result, cache_hit: bool) -> None:
+    """Fill the tool_result trace event."""
+    if tracing_enabled():
+        end.update(cache_hit=cache_hit, bytes=payload_bytes(result), result=str(result)[:300])
+
+
+def normalize_args(fn: Callable, args: tuple, kwargs: dict) -> tuple:
+    """Memo key for a call: tool name plus bound, defaulted, case-normalized arguments."""
+    bound = inspect.signature(fn).bind(*args, **kwargs)
+    bound.apply_defaults()
+    items = []
+    for name, value in bound.arguments.items():
+        if isinstance(value, str):
+            value = value.strip()
+            if name in _UPPER_ARGS:
+                value = value.upper()
+            elif name in _LOWER_ARGS:
+                value = value.lower()
+        items.append((name, value))
+    return (fn.__name__, tuple(items))
+
+
+@contextmanager
+def tool_memo_scope():
+    """Share memoized tool results for the duration of one workflow run (and tasks it spawns)."""
+    token = _run_scope.set({})
+    try:
+        yield
+    finally:
+        _run_scope.reset(token)
+
+
+def memoized(fn: Callable) -> Callable:
+    """Memoizing wrapper for a tool function (async or sync); one wrapper per tool."""
+    if fn in _wrappers:
+        return _wrappers[fn]
+    name = fn.__name__
+
+    def lookup(key: tuple):
+        scope = _run_scope.get()
+        if scope is not None and key in scope:
+            return scope, scope[key]
+        cache = _get_cross_run_cache()
+        if cache is not None:
+            hit = cache.get(key)
+            if hit is not None:
+                return scope, hit
+        return scope, None
+
+    def store(scope: Optional[dict], key: tuple, result) -> None:
+        if not _cacheable(result):
+            if scope is not None:
+                scope.pop(key, None)
+            return
+        if scope is not None:
+            scope[key] = result
+        cache = _get_cross_run_cache()
+        if cache is not None:
+            cache.set(key, result)
+
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            key = normalize_args(fn, args, kwargs)
+            with span("tool_call", "tool_result", tool=name, args=dict(key[1])) as end:
+                scope, hit = lookup(key)
+                if hit is not None:
+                    _count(name, "hits")
+                    # Concurrent callers in one run share the in-flight call.
+                    result = await asyncio.shield(hit) if isinstance(hit, asyncio.Future) else hit
+                    _record(end, result, cache_hit=True)
+                    return result
+                _count(name, "misses")
+                task = asyncio.ensure_future(fn(*args, **kwargs))
+                if scope is not None:
+                    scope[key] = task
+                try:
+                    result = await asyncio.shield(task)
+                except BaseException:
+                    if scope is not None and scope.get(key) is task:
+                        scope.pop(key, None)
+                    raise
+                store(scope, key, result)
+                _record(end, result, cache_hit=False)
+                return result
+
+        wrapper = async_wrapper
+    else:
+
+        @functools.wraps(fn)
+        def sync_wrapper(*args, **kwargs):
+            key = normalize_args(fn, args, kwargs)
+            with span("tool_call", "tool_result", tool=name, args=dict(key[1])) as end:
+                scope, hit = lookup(key)
+                if hit is not None and not isinstance(hit, asyncio.Future):
+                    _count(name, "hits")
+                    _record(end, hit, cache_hit=True)
+                    return hit
+                _count(name, "misses")
+                result = fn(*args, **kwargs)
+                store(scope, key, result)
+                _record(end, result, cache_hit=False)
+                return result
+
+        wrapper = sync_wrapper
+
+    _wrappers[fn] = wrapper
+    return wrapper
+
+
+def memoize_tools(tools: Iterable[Callable]) -> List[Callable]:
+    """memoized() applied to each tool, for registering with an agent."""
+    return [memoized(t) for t in tools]
+
+
+def memo_stats() -> dict:
+    """Hit/miss counters per tool plus totals."""
+    with _stats_lock:
+        per_tool = {k: dict(v) for k, v in _stats.items()}
+    hits = sum(v["hits"] for v in per_tool.values())
+    misses = sum(v["misses"] for v in per_tool.values())
+    return {"hits": hits, "misses": misses, "tools": per_tool}
+
+
+def clear_memo() -> None:
+    """Drop cross-run results and reset counters."""
+    if _cross_run is not None:
+        _cross_run.clear()
+    with _stats_lock:
+        _stats.clear()
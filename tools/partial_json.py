@@ -0,0 +1,50 @@
+"""Incremental extraction of top-level fields from a JSON object arriving in chunks.
+
+Used to surface structured LLM output while it streams: each completed
+"key": value pair is reported as soon as its value closes, in document order.
+The final object is still parsed and validated from the full text.
+"""
+import json
+import re
+from typing import Any, Dict, Optional
+
+_KEY_RE = re.compile(r'\s*,?\s*"((?:[^"\\]|\\.)*)"\s*:\s*')
+_decoder = json.JSONDecoder()
+
+
+class PartialJSONObject:
+    """Feed text chunks; feed() returns the fields completed by that chunk."""
+
+    def __init__(self) -> None:
+        self._buf = ""
+        self._pos: Optional[int] = None  # scan position inside the object, once "{" is seen
+        self.fields: Dict[str, Any] = {}
+        self.closed = False
+
+    def feed(self, chunk: str) -> Dict[str, Any]:
+        self._buf += chunk
+        new: Dict[str, Any] = {}
+        if self.closed:
+            return new
+        if self._pos is None:
+            start = self._buf.find("{")
+            if start < 0:
+                return new
+            self._pos = start + 1
+        buf = self._buf
+        while True:
+            match = _KEY_RE.match(buf, self._pos)
+            if match is None:
+                if buf[self._pos:].strip().startswith("}"):
+                    self.closed = True
+                break
+            try:
+                value, end = _decoder.raw_decode(buf, match.end())
+            except json.JSONDecodeError:
+                break  # value still streaming
+            if not isinstance(value, (str, list, dict)) and (end >= len(buf) or buf[end] in ".eE+-"):
+                break  # a number or literal at the buffer edge may still grow ("182." -> 182.5)
+            key = json.loads('"' + match.group(1) + '"')
+            self.fields[key] = new[key] = value
+            self._pos = end
+        return new
@@ -1,11 +1,13 @@
-"""Risk Management Agent tools: volatility, position limits, downside risk."""
-from typing import Annotated
+"""Risk Management Agent tools: volatility, position limits, downside risk, portfolio risk."""
+import asyncio
+import math
+from typing import Annotated, Dict, Mapping, Optional
 from pydantic import Field
 
-try:
-    import yfinance as yf
-except ImportError:
-    yf = None
+from schemas import PortfolioRiskReport, PositionRisk, RiskReport
+
+from .incremental import get_indicator_states
+from .market_data import get_market_data
 
 # Import config for default limits; avoid circular import by reading env in tools if needed
 def _get_max_vol_pct() -> float:
@@ -16,25 +18,116 @@ def _get_max_position_pct() -> float:
     import os
     return float(os.getenv("MAX_POSITION_PCT", "10.0"))
 
+def _get_proposed_position_pct() -> float:
+    import os
+    return float(os.getenv("PROPOSED_POSITION_PCT", "5.0"))
+
+def _get_incremental() -> bool:
+    import os
+    return os.getenv("INCREMENTAL_INDICATORS", "1").strip().lower() in ("1", "true", "yes", "on")
+
+def _get_max_portfolio_var_pct() -> float:
+    import os
+    return float(os.getenv("MAX_PORTFOLIO_VAR_PCT", "3.0"))
+
+def _get_max_risk_contribution_pct() -> float:
+    import os
+    return float(os.getenv("MAX_RISK_CONTRIBUTION_PCT", "25.0"))
+
+
+def _finite(value: Optional[float]) -> Optional[float]:
+    return None if value is None or not math.isfinite(value) else round(value, 4)
+
+
+async def _annualized_volatility_pct(symbol: str, period: str) -> Optional[float]:
+    """Annualized volatility % over period, or None with fewer than 5 bars or no finite value."""
+    hist = await get_market_data().history(symbol, period)
+    if hist is None or len(hist) < 5:
+        return None
+    if _get_incremental():
+        return _finite(get_indicator_states().sync(symbol, period, hist).volatility_pct())
+    from .indicators import IndicatorEngine
+    # Annualized (approx 252 trading days)
+    return _finite(float(IndicatorEngine(hist["Close"].to_numpy()).volatility_pct[0]))
+
+
+async def _max_drawdown_pct(symbol: str, period: str) -> Optional[float]:
+    """Max drawdown % over period (negative), or None with fewer than 2 bars or no finite value."""
+    hist = await get_market_data().history(symbol, period)
+    if hist is None or len(hist) < 2:
+        return None
+    if _get_incremental():
+        return _finite(get_indicator_states().sync(symbol, period, hist).max_drawdown_pct())
+    from .indicators import IndicatorEngine
+    return _finite(float(IndicatorEngine(hist["Close"].to_numpy()).max_drawdown_pct[0]))
+
+
+async def compute_risk_report(
+    symbol: str,
+    proposed_position_pct: Optional[float] = None,
+    volatility_period: str = "1mo",
+    drawdown_period: str = "3mo",
+    max_volatility_pct: Optional[float] = None,
+    max_position_pct: Optional[float] = None,
+) -> RiskReport:
+    """
+    Evaluate volatility, position limit compliance and downside risk natively
+    (same math as the tools below) and return a structured RiskReport.
+    """
+    max_vol = max_volatility_pct if max_volatility_pct is not None else _get_max_vol_pct()
+    max_pos = max_position_pct if max_position_pct is not None else _get_max_position_pct()
+    position = proposed_position_pct if proposed_position_pct is not None else _get_proposed_position_pct()
+    vol, drawdown = await asyncio.gather(
+        _annualized_volatility_pct(symbol, volatility_period),
+        _max_drawdown_pct(symbol, drawdown_period),
+        return_exceptions=True,
+    )
+    breaches = []
+    if isinstance(vol, Exception):
+        breaches.append(f"volatility data unavailable: {vol}")
+        vol = None
+    elif _finite(vol) is None:
+        breaches.append("volatility data unavailable")
+        vol = None
+    if isinstance(drawdown, Exception):
+        breaches.append(f"drawdown data unavailable: {drawdown}")
+        drawdown = None
+    elif _finite(drawdown) is None:
+        breaches.append("drawdown data unavailable")
+        drawdown = None
+    within = None if vol is None else vol <= max_vol
+    if within is False:
+        breaches.append(f"volatility {vol:.1f}% exceeds {max_vol}% limit")
+    compliant = position <= max_pos
+    if not compliant:
+        breaches.append(f"position {position}% exceeds {max_pos}% limit")
+    return RiskReport(
+        security=symbol.upper(),
+        volatility_period=volatility_period,
+        annualized_volatility_pct=_finite(vol),
+        max_volatility_pct=max_vol,
+        volatility_within_limit=within,
+        drawdown_period=drawdown_period,
+        max_drawdown_pct=_finite(drawdown),
+        proposed_position_pct=position,
+        max_position_pct=max_pos,
+        position_compliant=compliant,
+        breaches=breaches,
+        acceptable=bool(within) and compliant,
+    )
 
-def evaluate_volatility(
+
+async def evaluate_volatility(
     symbol: Annotated[str, Field(description="Stock ticker symbol")],
     period: Annotated[str, Field(description="Period for volatility: '1mo', '3mo', '6mo'")] = "1mo",
     max_volatility_pct: Annotated[float, Field(description="Max acceptable annualized volatility % (e.g. 50)")] = None,
 ) -> str:
     """Evaluate volatility (e.g. annualized) vs a limit. Returns assessment for risk compliance."""
-    if not yf:
-        return "Error: yfinance not installed. pip install yfinance"
     max_pct = max_volatility_pct if max_volatility_pct is not None else _get_max_vol_pct()
     try:
-        t = yf.Ticker(symbol.upper())
-        hist = t.history(period=period)
-        if hist is None or len(hist) < 5:
+        vol_annual_pct = await _annualized_volatility_pct(symbol, period)
+        if vol_annual_pct is None:
             return f"Insufficient data for volatility for {symbol}."
-        returns = hist["Close"].pct_change().dropna()
-        vol_daily = returns.std()
-        # Annualized (approx 252 trading days)
-        vol_annual_pct = vol_daily * (252 ** 0.5) * 100
         within = "WITHIN" if vol_annual_pct <= max_pct else "EXCEEDS"
         return (
             f"Volatility assessment for {symbol.upper()} ({period}): "
@@ -60,25 +153,156 @@ def evaluate_position_limit_compliance(
     )
 
 
-def evaluate_downside_risk(
+async def evaluate_downside_risk(
     symbol: Annotated[str, Field(description="Stock ticker symbol")],
     period: Annotated[str, Field(description="Period: '1mo', '3mo', '6mo'")] = "3mo",
 ) -> str:
     """Evaluate downside risk: max drawdown and worst drawdown over the period."""
-    if not yf:
-        return "Error: yfinance not installed. pip install yfinance"
     try:
-        t = yf.Ticker(symbol.upper())
-        hist = t.history(period=period)
-        if hist is None or len(hist) < 2:
+        max_dd_pct = await _max_drawdown_pct(symbol, period)
+        if max_dd_pct is None:
             return f"Insufficient data for downside risk for {symbol}."
-        close = hist["Close"]
-        cummax = close.cummax()
-        drawdown = (close - cummax) / cummax
-        max_dd_pct = drawdown.min() * 100
         return (
             f"Downside risk for {symbol.upper()} ({period}): "
             f"max drawdown = {max_dd_pct:.1f}%."
         )
     except Exception as e:
         return f"Error evaluating downside risk for {symbol}: {e}"
+
+
+def parse_holdings(text: str) -> Dict[str, float]:
+    """Parse 'AAPL:30, MSFT:20, TLT:-10' (percent of portfolio) into {symbol: pct}; repeated symbols add up."""
+    holdings: Dict[str, float] = {}
+    for item in text.replace(";", ",").split(","):
+        if not item.strip():
+            continue
+        symbol, sep, weight = item.replace("=", ":").partition(":")
+        if not sep or not symbol.strip():
+            raise ValueError(f"expected SYMBOL:PCT, got {item.strip()!r}")
+        key = symbol.strip().upper()
+        holdings[key] = holdings.get(key, 0.0) + float(weight.strip().rstrip("%"))
+    if not holdings:
+        raise ValueError("no holdings given")
+    return holdings
+
+
+async def compute_portfolio_risk_report(
+    holdings: Mapping[str, float],
+    period: str = "1y",
+    confidence_pct: float = 95.0,
+    horizon_days: int = 1,
+    max_volatility_pct: Optional[float] = None,
+    max_var_pct: Optional[float] = None,
+    max_position_pct: Optional[float] = None,
+    max_risk_contribution_pct: Optional[float] = None,
+) -> PortfolioRiskReport:
+    """
+    Portfolio-level risk for holdings ({symbol: % of portfolio value}): covariance
+    of daily returns over period, volatility, historical and parametric VaR/CVaR,
+    per-position risk contributions and concentration, checked against limits.
+    Holdings without history are reported and excluded.
+    """
+    import numpy as np
+
+    from .indicators import align_closes, simple_returns
+    from .portfolio_risk import concentration, portfolio_metrics
+
+    max_vol = max_volatility_pct if max_volatility_pct is not None else _get_max_vol_pct()
+    max_var = max_var_pct if max_var_pct is not None else _get_max_portfolio_var_pct()
+    max_pos = max_position_pct if max_position_pct is not None else _get_max_position_pct()
+    max_share = max_risk_contribution_pct if max_risk_contribution_pct is not None else _get_max_risk_contribution_pct()
+    normalized: Dict[str, float] = {}
+    for symbol, weight in holdings.items():
+        key = symbol.strip().upper()
+        normalized[key] = normalized.get(key, 0.0) + float(weight)
+    holdings = normalized
+    symbols = list(holdings)
+    md = get_market_data()
+    histories = await asyncio.gather(*(md.history(s, period) for s in symbols), return_exceptions=True)
+    closes, missing = {}, []
+    for symbol, hist in zip(symbols, histories):
+        if isinstance(hist, Exception) or hist is None or len(hist) < 2:
+            missing.append(symbol)
+        else:
+            closes[symbol] = hist["Close"]
+    weights_pct = np.array([holdings[s] for s in symbols if s in closes], dtype=float)
+    conc = concentration(np.array([holdings[s] for s in symbols], dtype=float))
+
+    breaches = [f"no price history for {s}" for s in missing]
+    positions = []
+    metrics = None
+    if closes:
+        names, prices = align_closes(closes, calendar=True)
+        try:
+            metrics = portfolio_metrics(
+                simple_returns(prices), weights_pct / 100.0, confidence=confidence_pct / 100.0, horizon_days=horizon_days
+            )
+        except ValueError as e:
+            breaches.append(f"risk metrics unavailable: {e}")
+        if metrics is not None:
+            order = np.argsort(-metrics["risk_share"])
+            positions = [
+                PositionRisk(
+                    security=names[i],
+                    weight_pct=round(float(weights_pct[i]), 4),
+                    marginal_volatility_pct=round(float(metrics["marginal"][i]) * 100, 4),
+                    risk_contribution_pct=round(float(metrics["risk_share"][i]) * 100, 4),
+                )
+                for i in order
+            ]
+
+    def pct(key: str) -> Optional[float]:
+        return None if metrics is None else _finite(float(metrics[key]) * 100)
+
+    vol, hist_var = pct("volatility"), pct("historical_var")
+    if vol is not None and vol > max_vol:
+        breaches.append(f"portfolio volatility {vol:.1f}% exceeds {max_vol}% limit")
+    if hist_var is not None and hist_var > max_var:
+        breaches.append(f"{horizon_days}d {confidence_pct:g}% historical VaR {hist_var:.2f}% exceeds {max_var}% limit")
+    for p in positions:
+        if abs(p.weight_pct) > max_pos:
+            breaches.append(f"{p.security} position {p.weight_pct:.1f}% exceeds {max_pos}% limit")
+    for p in positions:
+        if p.risk_contribution_pct > max_share:
+            breaches.append(f"{p.security} contributes {p.risk_contribution_pct:.1f}% of portfolio risk (limit {max_share}%)")
+    weights_all = [holdings[s] for s in symbols]
+    return PortfolioRiskReport(
+        period=period,
+        observations=0 if metrics is None else metrics["observations"],
+        confidence_pct=confidence_pct,
+        horizon_days=horizon_days,
+        gross_exposure_pct=round(sum(abs(w) for w in weights_all), 4),
+        net_exposure_pct=round(sum(weights_all), 4),
+        annualized_volatility_pct=vol,
+        max_volatility_pct=max_vol,
+        historical_var_pct=hist_var,
+        historical_cvar_pct=pct("historical_cvar"),
+        parametric_var_pct=pct("parametric_var"),
+        parametric_cvar_pct=pct("parametric_cvar"),
+        max_var_pct=max_var,
+        max_weight_pct=round(conc["max_weight"], 4),
+        max_position_pct=max_pos,
+        max_risk_contribution_pct=max_share,
+        herfindahl_index=round(conc["hhi"], 4),
+        effective_positions=round(conc["effective_positions"], 2),
+        positions=positions,
+        missing=missing,
+        breaches=breaches,
+        acceptable=metrics is not None and not breaches,
+    )
+
+
+async def evaluate_portfolio_risk(
+    holdings: Annotated[str, Field(description="Holdings as SYMBOL:PCT pairs, % of portfolio value, e.g. 'AAPL:30, MSFT:20, TLT:-10'")],
+    period: Annotated[str, Field(description="Return history window: '3mo', '6mo', '1y', '2y'")] = "1y",
+    confidence_pct: Annotated[float, Field(description="VaR/CVaR confidence level % (e.g. 95 or 99)")] = 95.0,
+    horizon_days: Annotated[int, Field(description="VaR/CVaR horizon in trading days")] = 1,
+) -> str:
+    """Evaluate portfolio-level risk across holdings: correlated volatility, VaR/CVaR, risk contributions and concentration."""
+    try:
+        report = await compute_portfolio_risk_report(
+            parse_holdings(holdings), period=period, confidence_pct=confidence_pct, horizon_days=horizon_days
+        )
+        return report.summary()
+    except Exception as e:
+        return f"Error evaluating portfolio risk: {e}"
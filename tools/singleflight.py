@@ -0,0 +1,77 @@
+"""Single-flight request coalescing for async calls.
+
+Concurrent callers asking for the same key share one in-flight call. With a
+window > 0 the result is also served to callers arriving within that many
+seconds after it completes. Failures are never retained.
+"""
+import asyncio
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class SingleFlight:
+    """Deduplicate concurrent async calls by key, optionally reusing results for a short window."""
+
+    def __init__(self, window: float = 0.0, max_results: int = 1024) -> None:
+        self._window = window
+        self._max_results = max_results
+        # In-flight tasks are bound to their event loop, so keep one table per loop.
+        self._inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Task]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._results: Dict[Hashable, Tuple[float, Any]] = {}
+        self.calls = 0
+        self.shared = 0
+        self.window_hits = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Return fn()'s result, sharing it with every concurrent (or in-window) caller for key."""
+        if self._window > 0:
+            hit = self._results.get(key)
+            if hit is not None:
+                if time.monotonic() < hit[0]:
+                    self.window_hits += 1
+                    return hit[1]
+                self._results.pop(key, None)
+
+        loop = asyncio.get_running_loop()
+        inflight = self._inflight.setdefault(loop, {})
+        task = inflight.get(key)
+        if task is not None:
+            self.shared += 1
+        else:
+            self.calls += 1
+            # The shared call runs as its own task so one subscriber cancelling does not cancel the rest.
+            task = loop.create_task(fn())
+            inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(inflight, key, t))
+        return await asyncio.shield(task)
+
+    def _finish(self, inflight: Dict[Hashable, asyncio.Task], key: Hashable, task: asyncio.Task) -> None:
+        if inflight.get(key) is task:
+            del inflight[key]
+        if self._window <= 0 or task.cancelled() or task.exception() is not None:
+            return
+        if len(self._results) >= self._max_results:
+            now = time.monotonic()
+            self._results = {k: v for k, v in self._results.items() if v[0] > now}
+            if len(self._results) >= self._max_results:
+                self._results.pop(next(iter(self._results)))
+        self._results[key] = (time.monotonic() + self._window, task.result())
+
+    def forget(self, key: Optional[Hashable] = None) -> None:
+        """Drop retained results for key, or all of them."""
+        if key is None:
+            self._results.clear()
+        else:
+            self._results.pop(key, None)
+
+    def stats(self) -> dict:
+        """Calls executed vs. callers served from a shared call or the result window."""
+        return {
+            "calls": self.calls,
+            "shared": self.shared,
+            "window_hits": self.window_hits,
+            "inflight": sum(len(v) for v in self._inflight.values()),
+        }
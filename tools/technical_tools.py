@@ -1,48 +1,43 @@
-"""Technical Analyst tools: price history, volume, moving averages (Yahoo Finance)."""
+"""Technical Analyst tools: price history, volume, moving averages (via the market-data provider)."""
+import asyncio
+import math
+import os
 from typing import Annotated
 from pydantic import Field
 
-try:
-    import yfinance as yf
-except ImportError:
-    yf = None
+from .encoding import encode, encode_ohlcv, output_format
+from .incremental import get_indicator_states
+from .market_data import get_market_data
 
 
-def _get_ticker(symbol: str):
-    if not yf:
-        return None
-    return yf.Ticker(symbol.upper())
+def _get_incremental() -> bool:
+    return os.getenv("INCREMENTAL_INDICATORS", "1").strip().lower() in ("1", "true", "yes", "on")
 
 
-def get_price_history(
+async def get_price_history(
     symbol: Annotated[str, Field(description="Stock ticker symbol")],
     period: Annotated[str, Field(description="Period: '5d', '1mo', '3mo', '6mo', '1y'")] = "1mo",
 ) -> str:
     """Get historical OHLCV price data for technical analysis."""
-    if not yf:
-        return "Error: yfinance not installed. pip install yfinance"
     try:
-        t = _get_ticker(symbol)
-        hist = t.history(period=period)
+        hist = await get_market_data().history(symbol, period)
         if hist is None or hist.empty:
             return f"No price history for {symbol}."
         hist = hist.tail(30)
-        return f"Price history ({period}) for {symbol.upper()} (last {len(hist)} points):\n" + hist[["Open", "High", "Low", "Close", "Volume"]].to_string()
+        body = encode("get_price_history", output_format("get_price_history"), lambda fmt: encode_ohlcv(hist, fmt))
+        return f"Price history ({period}) for {symbol.upper()} (last {len(hist)} points):\n" + body
     except Exception as e:
         return f"Error fetching price history for {symbol}: {e}"
 
 
-def get_volume_analysis(
+async def get_volume_analysis(
     symbol: Annotated[str, Field(description="Stock ticker symbol")],
     period: Annotated[str, Field(description="Period: '5d', '1mo', '3mo'")] = "1mo",
 ) -> str:
     """Analyze trading volume (average volume, recent vs average) for a security."""
-    if not yf:
-        return "Error: yfinance not installed. pip install yfinance"
     try:
-        t = _get_ticker(symbol)
-        hist = t.history(period=period)
-        info = t.info
+        md = get_market_data()
+        hist, info = await asyncio.gather(md.history(symbol, period), md.info(symbol))
         if hist is None or hist.empty:
             return f"No volume data for {symbol}."
         vol = hist["Volume"]
@@ -58,42 +53,42 @@ def get_volume_analysis(
         return f"Error in volume analysis for {symbol}: {e}"
 
 
-def get_moving_averages(
+async def get_moving_averages(
     symbol: Annotated[str, Field(description="Stock ticker symbol")],
     period: Annotated[str, Field(description="Period: '1mo', '3mo', '6mo'")] = "3mo",
 ) -> str:
     """Get simple moving averages (e.g. 20-day, 50-day) for price trend analysis."""
-    if not yf:
-        return "Error: yfinance not installed. pip install yfinance"
     try:
-        t = _get_ticker(symbol)
-        hist = t.history(period=period)
+        hist = await get_market_data().history(symbol, period)
         if hist is None or len(hist) < 50:
             return f"Insufficient history for {symbol} (need ~50 days for 50-day MA)."
-        close = hist["Close"]
-        ma20 = close.rolling(20).mean().iloc[-1] if len(close) >= 20 else None
-        ma50 = close.rolling(50).mean().iloc[-1] if len(close) >= 50 else None
-        current = close.iloc[-1]
+        if _get_incremental():
+            state = get_indicator_states().sync(symbol, period, hist)
+            ma20, ma50, current = state.sma_value(20), state.sma_value(50), state.last_close
+        else:
+            from .indicators import IndicatorEngine
+            close = hist["Close"].to_numpy()
+            engine = IndicatorEngine(close, sma_windows=(20, 50))
+            ma20 = engine.sma[20][0, -1]
+            ma50 = engine.sma[50][0, -1]
+            current = close[-1]
         parts = [f"Moving averages for {symbol.upper()} (period={period}):", f"  Current close: {current:.2f}"]
-        if ma20 is not None:
+        if not math.isnan(ma20):
             parts.append(f"  20-day SMA: {ma20:.2f} ({((current - ma20) / ma20) * 100:+.1f}% vs price)")
-        if ma50 is not None:
+        if not math.isnan(ma50):
             parts.append(f"  50-day SMA: {ma50:.2f} ({((current - ma50) / ma50) * 100:+.1f}% vs price)")
         return "\n".join(parts)
     except Exception as e:
         return f"Error computing moving averages for {symbol}: {e}"
 
 
-def get_price_summary(
+async def get_price_summary(
     symbol: Annotated[str, Field(description="Stock ticker symbol")],
     period: Annotated[str, Field(description="Period: '5d', '1mo', '3mo', '1y'")] = "1mo",
 ) -> str:
     """Get a concise price summary: current, high, low, change over period (for chart/pattern context)."""
-    if not yf:
-        return "Error: yfinance not installed. pip install yfinance"
     try:
-        t = _get_ticker(symbol)
-        hist = t.history(period=period)
+        hist = await get_market_data().history(symbol, period)
         if hist is None or hist.empty:
             return f"No price data for {symbol}."
         close = hist["Close"]
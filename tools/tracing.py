@@ -0,0 +1,119 @@
+"""Workflow trace events: stage, LLM and tool start/end with timings.
+
+A caller that wants events opens trace_scope(sink); everything that runs in that
+context (including tasks it spawns) reports to the sink. Events are plain dicts
+shaped like the dashboard's ThoughtEvents, e.g.
+
+    {"type": "tool_result", "agent": "technical_analyst", "tool": "get_price_summary",
+     "wall_ms": 12.4, "bytes": 311, "cache_hit": False, ...}
+
+Process-wide listeners (add_listener, e.g. the metrics registry) see every event
+regardless of scope. With neither a scope nor a listener, emit() is a no-op, so
+instrumented code costs one ContextVar lookup.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, List, Optional
+
+_sink: ContextVar[Optional[Callable[[dict], None]]] = ContextVar("trace_sink", default=None)
+_agent: ContextVar[str] = ContextVar("trace_agent", default="orchestrator")
+_listeners: List[Callable[[dict], None]] = []
+
+
+def payload_bytes(value: Any) -> int:
+    """Size of a result as the LLM would see it."""
+    if value is None:
+        return 0
+    if not isinstance(value, str):
+        text = getattr(value, "text", None)
+        if isinstance(text, str):
+            value = text
+        elif hasattr(value, "model_dump_json"):
+            value = value.model_dump_json()
+        else:
+            value = str(value)
+    return len(value.encode("utf-8"))
+
+
+def tracing_enabled() -> bool:
+    return bool(_listeners) or _sink.get() is not None
+
+
+def sink_active() -> bool:
+    """True when a caller is consuming this run's events (not just process-wide listeners)."""
+    return _sink.get() is not None
+
+
+def add_listener(listener: Callable[[dict], None]) -> None:
+    """Receive every event in the process (called inline; keep it cheap and thread-safe)."""
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def remove_listener(listener: Callable[[dict], None]) -> None:
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def current_agent() -> str:
+    return _agent.get()
+
+
+def emit(event: dict) -> None:
+    """Send event to listeners and the active sink, tagging it with the current agent. Their errors are swallowed."""
+    sink = _sink.get()
+    if sink is None and not _listeners:
+        return
+    event.setdefault("agent", _agent.get())
+    for listener in list(_listeners):
+        try:
+            listener(event)
+        except Exception:
+            pass
+    if sink is not None:
+        try:
+            sink(event)
+        except Exception:
+            pass
+
+
+@contextmanager
+def trace_scope(sink: Callable[[dict], None]):
+    """Route events emitted in this context (and tasks spawned from it) to sink."""
+    token = _sink.set(sink)
+    try:
+        yield
+    finally:
+        _sink.reset(token)
+
+
+@contextmanager
+def agent_scope(agent: str):
+    """Attribute events emitted in this context to agent."""
+    token = _agent.set(agent)
+    try:
+        yield
+    finally:
+        _agent.reset(token)
+
+
+@contextmanager
+def span(start_type: str, end_type: str, **fields):
+    """
+    Emit start_type on entry and end_type (with wall_ms) on exit. The yielded dict
+    collects end-only fields such as bytes or cache_hit; an exception adds error.
+    """
+    if not tracing_enabled():
+        yield {}
+        return
+    emit({"type": start_type, **fields})
+    end: dict = {}
+    start = time.perf_counter()
+    try:
+        yield end
+    except BaseException as e:
+        end.setdefault("error", repr(e)[:200])
+        raise
+    finally:
+        emit({"type": end_type, **fields, "wall_ms": round((time.perf_counter() - start) * 1000, 2), **end})
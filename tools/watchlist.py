@@ -0,0 +1,327 @@
+"""Background warm-cache scheduler for a watchlist of tickers.
+
+Most queries hit a known set of names. The warmer keeps their price history in
+the shared HistoryCache, their fundamentals current in the FundamentalsStore,
+and their technical tool outputs in the cross-run tool memo, so interactive
+requests on watched names are served locally.
+
+Each cycle:
+  1. refetches history for every name past the refresh-ahead point
+     (WATCHLIST_REFRESH_AHEAD x the history cache TTL) through the provider's
+     bulk_history, WATCHLIST_BATCH_SIZE names per upstream call;
+  2. recomputes the technical tool outputs into the memo (no upstream calls);
+  3. fetches missing or due fundamentals until the cycle's time is used up,
+     carrying the rest over to the next cycle.
+
+Cycles start every WATCHLIST_CYCLE_SECONDS. By default that is 80% of the
+shorter of the refresh-ahead window and the tool memo TTL, so neither goes cold
+between visits. Upstream calls are spread evenly over the cycle, capped at
+WATCHLIST_MAX_FETCHES_PER_SECOND; WATCHLIST_FETCHES_PER_SECOND fixes the rate
+instead. While busy() reports live requests, the spacing is stretched by
+WATCHLIST_BUSY_SLOWDOWN rather than stopping, so warming never starves under
+steady traffic.
+
+Configure with WATCHLIST (comma-separated) or WATCHLIST_FILE (one ticker per
+line, # comments allowed).
+"""
+import asyncio
+import os
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from .tracing import agent_scope
+
+FUNDAMENTAL_KINDS = ("info", "earnings_dates", "income_yearly", "balance_yearly")
+
+# Share of a cycle spent on upstream fetches; the rest absorbs slow calls and throttling.
+_CYCLE_FETCH_SHARE = 0.9
+
+
+def _get_fetches_per_second() -> Optional[float]:
+    """Fixed upstream rate, or None to derive it from each cycle's planned fetches."""
+    value = os.getenv("WATCHLIST_FETCHES_PER_SECOND", "").strip().lower()
+    return None if value in ("", "auto") else float(value)
+
+
+def _get_max_fetches_per_second() -> float:
+    return float(os.getenv("WATCHLIST_MAX_FETCHES_PER_SECOND", "5"))
+
+
+def _get_busy_slowdown() -> float:
+    """Factor the spacing between upstream calls is stretched by while live requests run."""
+    return max(1.0, float(os.getenv("WATCHLIST_BUSY_SLOWDOWN", "4")))
+
+
+def _get_batch_size() -> int:
+    return max(1, int(os.getenv("WATCHLIST_BATCH_SIZE", "50")))
+
+
+def _get_cycle_seconds() -> Optional[float]:
+    value = os.getenv("WATCHLIST_CYCLE_SECONDS", "").strip()
+    return float(value) if value else None
+
+
+def _get_history_period() -> str:
+    return os.getenv("WATCHLIST_HISTORY_PERIOD", "1y")
+
+
+def _get_refresh_ahead() -> float:
+    """Refetch history once it is older than this fraction of the cache TTL."""
+    return float(os.getenv("WATCHLIST_REFRESH_AHEAD", "0.5"))
+
+
+def _derived_cycle_seconds() -> float:
+    """80% of the shorter of the history refresh-ahead window and the tool memo TTL."""
+    from .history_cache import get_history_cache
+    from .memo import _get_ttl_seconds as _get_memo_ttl_seconds
+
+    window = get_history_cache().ttl_seconds * _get_refresh_ahead()
+    memo_ttl = _get_memo_ttl_seconds()
+    if memo_ttl > 0:
+        window = min(window, memo_ttl)
+    return max(5.0, 0.8 * window)
+
+
+def load_watchlist() -> List[str]:
+    """Tickers from WATCHLIST and WATCHLIST_FILE, upper-cased, de-duplicated, in order."""
+    symbols = [s for s in os.getenv("WATCHLIST", "").split(",")]
+    path = os.getenv("WATCHLIST_FILE", "")
+    if path and os.path.exists(path):
+        with open(path) as f:
+            symbols.extend(line.split("#", 1)[0] for line in f)
+    return list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+
+
+class _Pacer:
+    """Spaces upstream calls at most rate per second (0 = unpaced); slowdown stretches the spacing."""
+
+    def __init__(self, rate: float = 0.0) -> None:
+        self.rate = rate
+        self._next = 0.0
+
+    async def wait(self, slowdown: float = 1.0) -> None:
+        now = time.monotonic()
+        if self._next > now:
+            await asyncio.sleep(self._next - now)
+        interval = slowdown / self.rate if self.rate > 0 else 0.0
+        self._next = max(now, self._next) + interval
+
+
+class WatchlistWarmer:
+    """Keeps history, fundamentals and technical tool outputs warm for a list of symbols."""
+
+    def __init__(
+        self,
+        symbols: List[str],
+        busy: Optional[Callable[[], bool]] = None,
+        fetches_per_second: Optional[float] = None,
+        cycle_seconds: Optional[float] = None,
+        history_period: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        max_fetches_per_second: Optional[float] = None,
+        busy_slowdown: Optional[float] = None,
+    ) -> None:
+        self.symbols = [s.upper() for s in symbols]
+        self._busy = busy or (lambda: False)
+        self._fixed_rate = _get_fetches_per_second() if fetches_per_second is None else fetches_per_second
+        self._max_rate = _get_max_fetches_per_second() if max_fetches_per_second is None else max_fetches_per_second
+        self._busy_slowdown = _get_busy_slowdown() if busy_slowdown is None else busy_slowdown
+        self._cycle_seconds = _get_cycle_seconds() if cycle_seconds is None else cycle_seconds
+        self._history_period = history_period or _get_history_period()
+        self._batch_size = batch_size or _get_batch_size()
+        self._pacer = _Pacer()
+        self._fundamentals_due: Dict[str, Set[str]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.cycles = 0
+        self.fetches = 0
+        self.throttled_fetches = 0
+        self.errors = 0
+        self.last_cycle_s: Optional[float] = None
+        self.current: Optional[str] = None
+
+    @property
+    def cycle_seconds(self) -> float:
+        return self._cycle_seconds if self._cycle_seconds is not None else _derived_cycle_seconds()
+
+    def _plan_rate(self, planned: int, cycle_seconds: float) -> None:
+        """Spread this cycle's planned upstream calls evenly over it, within the rate cap."""
+        if self._fixed_rate is not None:
+            self._pacer.rate = self._fixed_rate
+            return
+        rate = planned / (cycle_seconds * _CYCLE_FETCH_SHARE) if planned else 0.0
+        self._pacer.rate = min(rate, self._max_rate) if self._max_rate > 0 else rate
+
+    async def _fetch(self, coro_fn: Callable, *args) -> bool:
+        """One paced upstream call; stretched rather than skipped while live requests run."""
+        busy = self._busy()
+        await self._pacer.wait(self._busy_slowdown if busy else 1.0)
+        self.fetches += 1
+        self.throttled_fetches += busy
+        try:
+            await coro_fn(*args)
+            return True
+        except Exception:
+            self.errors += 1
+            return False
+
+    def _history_due(self) -> List[str]:
+        from .history_cache import get_history_cache
+
+        cache = get_history_cache()
+        limit = cache.ttl_seconds * _get_refresh_ahead()
+        due = []
+        for symbol in self.symbols:
+            age = cache.age(symbol)
+            if age is None or age > limit:
+                due.append(symbol)
+        return due
+
+    async def _plan_fundamentals(self) -> List[Tuple[str, str]]:
+        """(symbol, kind) pairs the fundamentals store cannot serve; one executor call for the whole list."""
+        from .fundamentals_store import get_fundamentals_store
+        from .market_data import get_market_data
+
+        store = get_fundamentals_store()
+        if store is None:
+            return []
+        md = get_market_data()
+        host = md.provider.host
+
+        def plan() -> List[Tuple[str, str]]:
+            return [(s, k) for s in self.symbols for k in FUNDAMENTAL_KINDS if not store.is_current(host, s, k)]
+
+        due = await md.run_local(plan)
+        self._fundamentals_due = {s: set() for s in self.symbols}
+        for symbol, kind in due:
+            self._fundamentals_due[symbol].add(kind)
+        return due
+
+    async def _precompute(self, symbol: str) -> None:
+        """Indicators and summaries from the (now cached) data, into the cross-run tool memo."""
+        from .market_bundle import build_market_data_bundle
+
+        try:
+            await build_market_data_bundle(symbol, ["price_summary", "moving_averages", "volume"])
+        except Exception:
+            self.errors += 1
+
+    async def run_cycle(self) -> None:
+        """One pass over the watchlist: bulk history, tool outputs, then fundamentals as time allows."""
+        from .fundamentals_store import get_fundamentals_store
+        from .history_cache import get_history_cache
+        from .market_data import get_market_data
+
+        start = time.monotonic()
+        cycle_seconds = self.cycle_seconds
+        md = get_market_data()
+        cache = get_history_cache()
+        with agent_scope("watchlist"):
+            due = self._history_due()
+            batches = [due[i:i + self._batch_size] for i in range(0, len(due), self._batch_size)]
+            fundamentals = await self._plan_fundamentals()
+            self._plan_rate(len(batches) + len(fundamentals), cycle_seconds)
+
+            for batch in batches:
+                self.current = batch[0]
+                await self._fetch(md.run, cache.refresh_many, batch, self._history_period, md.provider.bulk_history)
+
+            for symbol in self.symbols:
+                age = cache.age(symbol)
+                if age is None or age > cache.ttl_seconds:
+                    continue  # history fetch failed; computing now would fetch it unpaced
+                self.current = symbol
+                await self._precompute(symbol)
+
+            fetchers = {
+                "info": md.info,
+                "earnings_dates": md.earnings_dates,
+                "income_yearly": md.income_statement,
+                "balance_yearly": md.balance_sheet,
+            }
+            deadline = start + cycle_seconds * _CYCLE_FETCH_SHARE
+            for symbol, kind in fundamentals:
+                if time.monotonic() >= deadline:
+                    break  # the rest stays due and is picked up next cycle
+                self.current = symbol
+                if await self._fetch(fetchers[kind], symbol):
+                    self._fundamentals_due[symbol].discard(kind)
+        if get_fundamentals_store() is None:
+            self._fundamentals_due = {}
+        self.current = None
+        self.cycles += 1
+        self.last_cycle_s = time.monotonic() - start
+
+    async def _loop(self) -> None:
+        while True:
+            start = time.monotonic()
+            try:
+                await self.run_cycle()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.errors += 1
+            await asyncio.sleep(max(0.0, self.cycle_seconds - (time.monotonic() - start)))
+
+    def start(self, busy: Optional[Callable[[], bool]] = None) -> Optional[asyncio.Task]:
+        """
+        Run cycles in the background (no-op for an empty list). While busy()
+        returns True, upstream calls are slowed by WATCHLIST_BUSY_SLOWDOWN.
+        """
+        if busy is not None:
+            self._busy = busy
+        if self.symbols and self._task is None:
+            self._task = asyncio.ensure_future(self._loop())
+        return self._task
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    def stats(self) -> dict:
+        """Warmness of the watchlist plus scheduler counters."""
+        from .history_cache import get_history_cache
+
+        cache = get_history_cache()
+        history_warm = 0
+        for symbol in self.symbols:
+            age = cache.age(symbol)
+            history_warm += age is not None and age <= cache.ttl_seconds
+        fundamentals_warm = sum(1 for s in self.symbols if s in self._fundamentals_due and not self._fundamentals_due[s])
+        n = len(self.symbols)
+        return {
+            "symbols": n,
+            "running": self._task is not None,
+            "history_warm": history_warm,
+            "fundamentals_warm": fundamentals_warm,
+            "fundamentals_pending": sum(len(kinds) for kinds in self._fundamentals_due.values()),
+            "warm_pct": round(100.0 * min(history_warm, fundamentals_warm) / n, 1) if n else 0.0,
+            "cycles": self.cycles,
+            "cycle_seconds": round(self.cycle_seconds, 1),
+            "last_cycle_s": None if self.last_cycle_s is None else round(self.last_cycle_s, 2),
+            "fetches_per_second": round(self._pacer.rate, 3),
+            "current": self.current,
+            "fetches": self.fetches,
+            "throttled_fetches": self.throttled_fetches,
+            "errors": self.errors,
+        }
+
+
+_warmer: Optional[WatchlistWarmer] = None
+
+
+def get_watchlist_warmer() -> WatchlistWarmer:
+    """Process-wide warmer over load_watchlist()."""
+    global _warmer
+    if _warmer is None:
+        _warmer = WatchlistWarmer(load_watchlist())
+    return _warmer
+
+
+def set_watchlist_warmer(warmer: Optional[WatchlistWarmer]) -> None:
+    global _warmer
+    _warmer = warmer